@@ -13,18 +13,34 @@ V4 Enhancements:
 - Session statistics and summaries
 """
 
-import argparse, yaml, sys, json, configparser
-import logging, os
+import argparse, yaml, sys, json, configparser, requests
+import logging, os, glob, time, copy
+from concurrent.futures import ThreadPoolExecutor
 from script_py.xlr_create_template_change.logging import setup_logger, setup_logger_error, setup_logger_detail
 from script_py.xlr_create_template_change.check_yaml_file import check_yaml_file
+from script_py.xlr_create_template_change.load_yaml_file import load_yaml_file
+from script_py.xlr_create_template_change.load_configuration import load_configuration
+from script_py.xlr_create_template_change.watch_yaml_dir import YamlDirectoryWatcher
 
 # Import from V4 enhanced logging architecture
 from xlr_classes.xlr_base import XLRBase
 from xlr_classes.xlr_generic import XLRGeneric
 from xlr_classes.xlr_controlm import XLRControlm
 from xlr_classes.xlr_dynamic_phase import XLRDynamicPhase
+from xlr_classes.xlr_phase_items import skip_deselected
 from xlr_classes.xlr_sun import XLRSun
 from xlr_classes.xlr_task_script import XLRTaskScript
+from xlr_classes.xlr_client import XLRClient, XLRPlanClient
+from xlr_classes.xlr_plan import load_latency_history, summarize_plan, format_plan
+from xlr_classes.xlr_variants import XLRVariants, compiled_objects, template_signature, variant_patches
+from xlr_classes.xlr_export import XLRTemplateImport, build_template_export, write_template_export, read_template_export
+from xlr_classes.xlr_verify import template_drift, format_drift
+from xlr_classes.xlr_cleanup import XLRTemplateCleanup
+from xlr_classes.xlr_script_stage import format_script_report
+from xlr_classes.xlr_critical_path import XLRDurationHistory, critical_path, format_critical_path
+from xlr_classes.xlr_script_bench import bench_release, synthetic_parameters, format_bench
+from xlr_classes.xlr_incremental import (template_fingerprint, phases_to_rebuild, changed_variables, phase_titles,
+                                         load_phase_state, save_phase_state)
 
 
 class XLRCreateTemplate(XLRBase):
@@ -47,7 +63,8 @@ class XLRCreateTemplate(XLRBase):
     - Better testability and maintainability
     """
 
-    def __init__(self, parameters):
+    def __init__(self, parameters, xlr_client=None, log_directory=None, clear_screen=True, use_lookup_cache=True,
+                 existing_template=None):
         """
         Initialize the XLR template creation process with enhanced logging - V4.
 
@@ -58,6 +75,14 @@ class XLRCreateTemplate(XLRBase):
                 - jenkins: Jenkins integration configuration
                 - Phases: Phase-specific deployment sequences
                 - technical_task_list: Pre/post deployment technical tasks
+            xlr_client (XLRClient): Client for XLR API calls (XLRPlanClient for --plan)
+            log_directory (str): Custom log directory (defaults to log/<release_name>)
+            clear_screen (bool): Clear the terminal before generation (off in --batch)
+            use_lookup_cache (bool): Use the persistent folder/template lookup cache
+            existing_template (tuple): (template id, compiled phase titles) of a template
+                whose phases are rebuilt with replace_phases(); the template, its
+                variables and the dynamic_release phase are kept. A full generation
+                is done when the template is gone or its phases differ.
 
         V4 Sets up:
         - Enhanced structured logging with performance tracking
@@ -74,7 +99,7 @@ class XLRCreateTemplate(XLRBase):
 
         # Set up enhanced logging system first
         release_name = self.parameters['general_info']['name_release']
-        self.setup_enhanced_logging(release_name)
+        self.setup_enhanced_logging(release_name, log_directory)
 
         # Start session timing
         self.enhanced_logger.start_timer('session_total')
@@ -90,17 +115,17 @@ class XLRCreateTemplate(XLRBase):
         # Load configuration file for XLR API calls to create template
         self.enhanced_logger.start_timer('load_configuration')
         try:
-            with open('_conf/xlr_create_template_change.ini', 'r') as file:
-                for line in file:
-                    if '=' in line.strip():
-                        key, value = line.strip().split('=', 1)
-                        setattr(self, key, value)
+            for key, value in load_configuration().items():
+                setattr(self, key, value)
 
             self.enhanced_logger.end_timer('load_configuration', "Configuration loaded successfully")
         except Exception as e:
             self.enhanced_logger.error(f"Failed to load configuration: {e}")
             raise
 
+        # XLR API client shared with the delegates (budget, lookup cache, api_call latencies)
+        self.setup_xlr_client(xlr_client, use_lookup_cache)
+
         self.header = {'content-type': 'application/json', 'Accept': 'application/json'}
 
         # Create backward compatibility loggers (for legacy code)
@@ -108,10 +133,14 @@ class XLRCreateTemplate(XLRBase):
         self.logger_detail = self.enhanced_logger.logger_detail
         self.logger_error = self.enhanced_logger.logger_error
 
-        # Initialize list variables to manage XLR task creation for technical actions
-        self.list_technical_task_done = []
-        self.list_technical_sun_task_done = []
-        self.list_xlr_group_task_done = []
+        # Validate the whole YAML file (all errors at once) before any XLR API call
+        check_yaml_file(self)
+
+        # Initialize sets to manage XLR task creation for technical actions
+        self.technical_task_done = set()
+        self.technical_sun_task_done = set()
+        self.xlr_group_task_done = set()
+        self.xlr_group_lanes = {}
 
         # Initialize variables
         self.template_url = ''
@@ -135,21 +164,24 @@ class XLRCreateTemplate(XLRBase):
         # Transfer shared state to delegates
         self._sync_state_to_delegates()
 
-        # Function to validate YAML file
-        check_yaml_file(self)
-        clear = lambda: os.system('clear')
-        clear()
+        if clear_screen:
+            clear = lambda: os.system('clear')
+            clear()
 
         self.logger_cr.info("")
         self.logger_cr.info("BEGIN")
         self.logger_cr.info("")
 
-        # Delete existing template according to YAML variable: name_release
-        self.delete_template()
+        self.attached_template = None
+        if existing_template is not None and self.attach_template(*existing_template):
+            return
 
         # Get folder id defined in YAML and store XLR folder id
         self.find_xlr_folder()
 
+        # Delete existing template of this folder according to YAML variable: name_release
+        self.delete_template()
+
         # Create template and store template id
         self.dict_template, self.XLR_template_id = self.CreateTemplate()
 
@@ -193,12 +225,141 @@ class XLRCreateTemplate(XLRBase):
             delegate.header = getattr(self, 'header', {})
             delegate.ops_username_api = getattr(self, 'ops_username_api', '')
             delegate.ops_password_api = getattr(self, 'ops_password_api', '')
+            delegate.xlr_client = self.xlr_client
             delegate.parameters = getattr(self, 'parameters', {})
             delegate.dict_template = getattr(self, 'dict_template', {})
             delegate.logger_cr = getattr(self, 'logger_cr', None)
             delegate.logger_detail = getattr(self, 'logger_detail', None)
             delegate.logger_error = getattr(self, 'logger_error', None)
 
+            # Share completion tracking and technical task data by reference
+            delegate.technical_task_done = self.technical_task_done
+            delegate.technical_sun_task_done = self.technical_sun_task_done
+            delegate.xlr_group_task_done = self.xlr_group_task_done
+            delegate.xlr_group_lanes = self.xlr_group_lanes
+            delegate.technical_task_index = getattr(self, 'technical_task_index', {})
+            delegate.phase_positions = self.phase_positions
+            delegate.dict_value_for_template_technical_task = getattr(self, 'dict_value_for_template_technical_task', {})
+
+    def log_script_report(self):
+        """
+        Log the script bytes sent for this template against its budget.
+
+        Warns when general_info.script_bytes_budget is exceeded or when
+        several scripts define the same helper function (see XLRScriptStage).
+        """
+        report = self.xlr_client.script_stage.report()
+        for line in format_script_report(report):
+            if report['over_budget'] or report['duplicated_helpers']:
+                self.enhanced_logger.warning(line, operation='script_stage')
+            else:
+                self.enhanced_logger.info(line, operation='script_stage')
+
+    def attach_template(self, template_id, phase_order):
+        """
+        Work on an existing template instead of creating one.
+
+        Args:
+            template_id (str): XLR id of the template generated by the previous run
+            phase_order (list): Phase titles of the compiled template
+
+        Returns:
+            dict: Template JSON (also in self.attached_template), or None when the
+                template no longer exists or its phases differ from the compiled ones
+
+        Computes the same generation state as a full run (template values,
+        technical task index) without creating the template, its variables
+        or the dynamic_release phase.
+        """
+        self.find_xlr_folder()
+        url_get_template = self.url_api_xlr + "templates/" + template_id
+        try:
+            response = self.xlr_client.get(url_get_template, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), verify=False)
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            template = response.json()
+        except requests.exceptions.RequestException as e:
+            self.logger_error.error("Error get template : " + template_id)
+            self.logger_error.error("Error call api : " + url_get_template)
+            self.logger_error.error(e)
+            sys.exit(0)
+        if [phase.get('title') for phase in template.get('phases', [])] != phase_order:
+            return None
+
+        self.XLR_template_id = template_id
+        self.dict_template.setdefault('template', {}).update({'xlr_id': self.XLR_template_id})
+        base_url = self.url_api_xlr.replace('/api/v1/', '')
+        self.template_url = base_url + '/#/templates/' + self.XLR_template_id.replace("Applications/", "").replace('/', '-')
+        self.xlr_client.shadow.reset(self.XLR_template_id, template.get('phases', []), template.get('variables', []))
+
+        self.dict_value_for_template = self.dict_value_for_tempalte()
+        self.dict_value_for_template_technical_task = self.dict_value_for_tempalte_technical_task()
+        self.technical_task_index = self.build_technical_task_index()
+        self._sync_state_to_delegates()
+        self.logger_cr.info("UPDATE TEMPLATE : " + self.parameters['general_info']['name_release'])
+        self.attached_template = template
+        return template
+
+    def replace_phases(self, phases, phase_order):
+        """
+        Delete and recreate phases of the attached template in place.
+
+        Args:
+            phases (list): YAML phases to rebuild, in template order
+            phase_order (list): Phase titles of the compiled template
+
+        Returns:
+            str: Template URL
+
+        Each YAML phase is rebuilt with its CREATE_CHANGE_<phase> companion; the
+        other phases are left untouched.
+        """
+        titles = [title for phase in phases for title in phase_titles(phase)]
+        for phase in self.attached_template.get('phases', []):
+            if phase['title'] in titles:
+                url_delete_phase = self.url_api_xlr + "phases/" + phase['id']
+                try:
+                    response = self.xlr_client.delete(url_delete_phase, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), verify=False)
+                    response.raise_for_status()
+                    self.logger_cr.info("DELETE PHASE : " + phase['title'])
+                except requests.exceptions.RequestException as e:
+                    self.logger_error.error("Error delete phase : " + phase['title'])
+                    self.logger_error.error("Error call api : " + url_delete_phase)
+                    self.logger_error.error(e)
+                    sys.exit(0)
+
+        # Phases are inserted in template order, each one at its final index
+        self.phase_positions.clear()
+        self.phase_positions.update({title: phase_order.index(title) for title in titles})
+        for phase in phases:
+            self.enhanced_logger.start_timer(f'phase_{phase}')
+            self.createphase(phase)
+            self.enhanced_logger.end_timer(f'phase_{phase}', f"Phase {phase} rebuilt")
+        self.phase_positions.clear()
+        return self.template_url
+
+    def update_variables(self, values):
+        """
+        Update variables of the attached template in place.
+
+        Args:
+            values (dict): Variable key -> compiled variable payload
+        """
+        variable_ids = {variable['key']: variable['id'] for variable in self.attached_template.get('variables', [])}
+        for key, payload in values.items():
+            url_update_variable = self.url_api_xlr + "templates/" + self.XLR_template_id + "/variables/" + variable_ids[key]
+            try:
+                response = self.xlr_client.put(url_update_variable, headers=self.header, auth=(self.ops_username_api, self.ops_password_api),
+                                               json=dict(payload, id=variable_ids[key]), verify=False)
+                response.raise_for_status()
+                self.logger_cr.info("UPDATE VARIABLE : " + key)
+            except requests.exceptions.RequestException as e:
+                self.logger_error.error("Error update variable : " + key)
+                self.logger_error.error("Error call api : " + url_update_variable)
+                self.logger_error.error(e)
+                sys.exit(0)
+
     def createphase(self, phase):
         """
         Create a specific deployment phase in the XLR template using clean architecture.
@@ -334,6 +495,7 @@ class XLRCreateTemplate(XLRBase):
         """
         # Create a dictionary variable to manage creation of XLR tasks
         self.dict_value_for_template_technical_task = self.dict_value_for_tempalte_technical_task()
+        self.technical_task_index = self.build_technical_task_index()
 
         # Check if dynamic phase is needed
         if (self.dict_value_for_template_technical_task.get('technical_task') is None and
@@ -351,59 +513,66 @@ class XLRCreateTemplate(XLRBase):
             if hasattr(self, 'name_from_jenkins_value') and self.name_from_jenkins_value == "yes":
                 self.script_ops.task_xlr_if_name_from_jenkins('dynamic_release')
 
+            # Pruning scripts are collected and posted as one script task
+            pruning_sections = []
+
             # Phase deletion management for multiple phases
             if len(self.parameters['general_info']['phases']) > 1:
                 if self.parameters['general_info']['phase_mode'] == 'one_list':
                     if self.parameters['general_info']['template_package_mode'] == 'string':
-                        self.dynamic_ops.XLRJython_delete_phase_one_list_template_package_mode_string('dynamic_release')
+                        self.dynamic_ops.XLRJython_delete_phase_one_list_template_package_mode_string('dynamic_release', pruning_sections)
                     else:
-                        self.dynamic_ops.XLRJython_delete_phase_one_list('dynamic_release')
+                        self.dynamic_ops.XLRJython_delete_phase_one_list('dynamic_release', pruning_sections)
                 elif self.parameters['general_info']['phase_mode'] == 'multi_list':
-                    self.dynamic_ops.XLRJython_delete_phase_list_multi_list('dynamic_release')
+                    self.dynamic_ops.XLRJython_delete_phase_list_multi_list('dynamic_release', pruning_sections)
 
             # Package management for string mode
             if self.parameters['general_info']['template_package_mode'] == 'string':
                 if len(self.parameters['template_liste_package']) > 1:
-                    self.dynamic_ops.script_jython_List_package_string('dynamic_release')
+                    self.dynamic_ops.script_jython_List_package_string('dynamic_release', pruning_sections)
 
             # BENCH environment prefix handling
             if ('BENCH' in self.parameters['general_info']['phases'] and
                 self.parameters.get('XLD_ENV_BENCH') is not None and
                 len(self.parameters['XLD_ENV_BENCH']) >= 2):
-                self.dynamic_ops.script_jython_define_xld_prefix_new('dynamic_release')
+                self.dynamic_ops.script_jython_define_xld_prefix_new('dynamic_release', pruning_sections)
                 self.template_create_variable(key='controlm_prefix_BENCH', typev='StringVariable',
                                             label='controlm_prefix_BENCH', description='', value='B',
                                             requiresValue=False, showOnReleaseStart=False, multiline=False)
 
+            # Jenkins, Control-M and XLD tasks of deselected packages are deleted at runtime,
+            # unless they are skipped by precondition (deselected_task_mode: skip)
+            delete_deselected = not skip_deselected(self)
+
             # Jenkins task deletion management
-            if self.parameters.get('jenkins') is not None:
+            if delete_deselected and self.parameters.get('jenkins') is not None:
                 if len(self.parameters['template_liste_package']) > 1:
                     if ('DEV' in self.parameters['general_info']['phases'] or
                         'BUILD' in self.parameters['general_info']['phases']):
                         if self.parameters['general_info']['template_package_mode'] == 'string':
-                            self.dynamic_ops.script_jython_dynamic_delete_task_jenkins_string('dynamic_release')
+                            self.dynamic_ops.script_jython_dynamic_delete_task_jenkins_string('dynamic_release', pruning_sections)
                         elif self.parameters['general_info']['template_package_mode'] == 'listbox':
-                            self.dynamic_ops.script_jython_dynamic_delete_task_jenkins_listbox('dynamic_release')
+                            self.dynamic_ops.script_jython_dynamic_delete_task_jenkins_listbox('dynamic_release', pruning_sections)
 
             # Control-M task management
-            if (self.dict_value_for_template.get('controlm') is not None and
+            if (delete_deselected and self.dict_value_for_template.get('controlm') is not None and
                 len(self.dict_value_for_template['controlm']) != 0):
                 if (self.parameters.get('XLD_ENV_BENCH') and
                     len(self.parameters['XLD_ENV_BENCH']) > 2):
-                    self.dynamic_ops.script_jython_dynamic_delete_task_controlm_multibench('dynamic_release')
+                    self.dynamic_ops.script_jython_dynamic_delete_task_controlm_multibench('dynamic_release', pruning_sections)
                 else:
-                    self.dynamic_ops.script_jython_dynamic_delete_task_controlm('dynamic_release')
+                    self.dynamic_ops.script_jython_dynamic_delete_task_controlm('dynamic_release', pruning_sections)
 
             # XLD task deletion for multiple packages
-            if len(self.parameters['template_liste_package']) > 1:
+            if delete_deselected and len(self.parameters['template_liste_package']) > 1:
                 # Generic application handling (removed Y88-specific logic)
                 if 'BENCH' in self.parameters['general_info']['phases']:
                     self.template_create_variable(key='BENCH_APP', typev='StringVariable',
                                                 label='BENCH_APP', description='', value='',
                                                 requiresValue=False, showOnReleaseStart=False, multiline=False)
-                    self.dynamic_ops.script_jython_dynamic_delete_task_xld_generic('dynamic_release')
+                    self.dynamic_ops.script_jython_dynamic_delete_task_xld_generic('dynamic_release', pruning_sections)
                 else:
-                    self.dynamic_ops.script_jython_dynamic_delete_task_xld('dynamic_release')
+                    self.dynamic_ops.script_jython_dynamic_delete_task_xld('dynamic_release', pruning_sections)
 
             # Technical task management
             if self.parameters.get('technical_task_list') is not None:
@@ -415,11 +584,15 @@ class XLRCreateTemplate(XLRBase):
                 if (('PRODUCTION' in self.parameters['general_info']['phases'] or
                      'BENCH' in self.parameters['general_info']['phases']) and
                     self.parameters['general_info']['technical_task_mode'] == 'listbox'):
-                    self.dynamic_ops.XLRJythonScript_release_delete_technical_task_ListStringVariable('dynamic_release')
+                    self.dynamic_ops.XLRJythonScript_release_delete_technical_task_ListStringVariable('dynamic_release', pruning_sections)
                 elif (('PRODUCTION' in self.parameters['general_info']['phases'] or
                        'BENCH' in self.parameters['general_info']['phases']) and
                       self.parameters['general_info']['technical_task_mode'] == 'string'):
-                    self.dynamic_ops.XLRJythonScript_dynamic_release_delete_technical_task_StringVariable('dynamic_release')
+                    self.dynamic_ops.XLRJythonScript_dynamic_release_delete_technical_task_StringVariable('dynamic_release', pruning_sections)
+
+            # Lists the generator wrote are inlined; list_package is not a runtime variable
+            static = dict(self.release_Variables_in_progress, list_package=','.join(self.list_package))
+            self.dynamic_ops.script_jython_dynamic_release_pruning('dynamic_release', pruning_sections, static)
 
             # Template type specific handling
             if self.parameters['general_info']['type_template'] == 'FROM_NAME_BRANCH':
@@ -433,6 +606,453 @@ class XLRCreateTemplate(XLRBase):
             return 'done'
 
 
+def generate_template(parameters, xlr_client=None, log_directory=None, clear_screen=True, use_lookup_cache=True,
+                      existing_template=None):
+    """
+    Generate the XLR template described by one YAML configuration.
+
+    Args:
+        parameters (dict): YAML configuration loaded as dictionary
+        xlr_client (XLRClient): Client for XLR API calls (shared pool in --batch)
+        log_directory (str): Custom log directory (defaults to log/<release_name>)
+        clear_screen (bool): Clear the terminal before generation
+        use_lookup_cache (bool): Use the persistent folder/template lookup cache
+        existing_template (tuple): (template id, compiled phase titles), see
+            XLRCreateTemplate; when the template can be attached, no phase is
+            built here (see regenerate_template)
+
+    Returns:
+        tuple: (XLRCreateTemplate instance, template URL)
+    """
+    CreateTemplate = XLRCreateTemplate(parameters, xlr_client=xlr_client, log_directory=log_directory,
+                                       clear_screen=clear_screen, use_lookup_cache=use_lookup_cache,
+                                       existing_template=existing_template)
+    if CreateTemplate.attached_template is not None:
+        return CreateTemplate, CreateTemplate.template_url
+    template_url = None
+
+    # Create each phase defined in the configuration with timing
+    CreateTemplate.enhanced_logger.start_timer('phases_creation')
+    for phase in parameters['general_info']['phases']:
+        CreateTemplate.enhanced_logger.start_timer(f'phase_{phase}')
+        CreateTemplate.enhanced_logger.info(f"Creating phase: {phase}",
+                                          operation='create_phase',
+                                          phase=phase)
+        try:
+            template_url = CreateTemplate.createphase(phase)
+        except Exception as e:
+            CreateTemplate.enhanced_logger.error(f"Template creation failed: {e}",
+                                                operation='template_creation',
+                                                error_type='unexpected_error')
+            raise
+        CreateTemplate.enhanced_logger.end_timer(f'phase_{phase}',
+                                                f"Phase {phase} completed")
+
+    CreateTemplate.enhanced_logger.end_timer('phases_creation',
+                                            "All phases created successfully")
+
+    # End session timing
+    CreateTemplate.enhanced_logger.end_timer('session_total')
+
+    # Log successful completion with same messages for compatibility
+    CreateTemplate.enhanced_logger.info("---------------------------")
+    CreateTemplate.enhanced_logger.info("END CREATION TEMPLATE : OK (V4 Enhanced Logging)")
+    CreateTemplate.enhanced_logger.info("---------------------------")
+    CreateTemplate.enhanced_logger.info(parameters['general_info']['name_release'])
+    CreateTemplate.enhanced_logger.info(template_url)
+
+    # Log session summary
+    CreateTemplate.enhanced_logger.log_session_summary()
+    CreateTemplate.log_script_report()
+
+    return CreateTemplate, template_url
+
+
+def regenerate_template(parameters, phases=None, only_changed=False, xlr_client=None, log_directory=None,
+                        clear_screen=True, use_lookup_cache=True):
+    """
+    Rebuild only some phases of a template generated by a previous run.
+
+    Args:
+        parameters (dict): YAML configuration loaded as dictionary
+        phases (list): YAML phases to rebuild (--phases)
+        only_changed (bool): Also rebuild the phases whose compiled content changed
+            since the previous run (--only-changed)
+        xlr_client (XLRClient): Client for XLR API calls
+        log_directory (str): Custom log directory (defaults to log/<release_name>)
+        clear_screen (bool): Clear the terminal before generation
+        use_lookup_cache (bool): Use the persistent folder/template lookup cache
+
+    Returns:
+        tuple: (XLRCreateTemplate instance, template URL, rebuilt phases or None
+            after a full generation)
+
+    The previous run is described by log/<release>/phase_state.json. Without it,
+    or when the template structure changed, the whole template is generated.
+    """
+    log_directory = log_directory or f"log/{parameters['general_info']['name_release']}"
+    objects = compiled_objects(compile_template(copy.deepcopy(parameters), os.path.join(log_directory, 'plan')).calls)
+    fingerprint = template_fingerprint(objects)
+    previous = load_phase_state(log_directory)
+    rebuild = phases_to_rebuild(previous, fingerprint, parameters['general_info']['phases'], phases, only_changed)
+
+    CreateTemplate, template_url = generate_template(
+        parameters, xlr_client=xlr_client, log_directory=log_directory, clear_screen=clear_screen,
+        use_lookup_cache=use_lookup_cache,
+        existing_template=(previous['template_id'], fingerprint['phase_order']) if rebuild is not None else None)
+    if CreateTemplate.attached_template is None:
+        # First run, structure change, or template gone: generated from scratch
+        save_phase_state(log_directory, CreateTemplate.XLR_template_id, fingerprint)
+        return CreateTemplate, template_url, None
+
+    variables = {position: payload for kind, position, payload in objects if kind == 'variable'}
+    CreateTemplate.update_variables({key: variables[key] for key in changed_variables(previous, fingerprint)})
+    template_url = CreateTemplate.replace_phases(rebuild, fingerprint['phase_order'])
+    CreateTemplate.enhanced_logger.end_timer('session_total')
+    CreateTemplate.enhanced_logger.info("END UPDATE TEMPLATE : OK, rebuilt phases: " + (', '.join(rebuild) or 'none'))
+    CreateTemplate.enhanced_logger.log_session_summary()
+    CreateTemplate.log_script_report()
+    save_phase_state(log_directory, CreateTemplate.XLR_template_id, fingerprint)
+    return CreateTemplate, template_url, rebuild
+
+
+def compile_template(parameters, log_directory=None):
+    """
+    Compile a template without calling XLR.
+
+    Args:
+        parameters (dict): YAML configuration loaded as dictionary
+        log_directory (str): Custom log directory (defaults to log/<release_name>/plan)
+
+    Returns:
+        XLRPlanClient: Client holding the calls the generation would make
+    """
+    plan_client = XLRPlanClient()
+    log_directory = log_directory or f"log/{parameters['general_info']['name_release']}/plan"
+    CreateTemplate = XLRCreateTemplate(parameters, xlr_client=plan_client, log_directory=log_directory,
+                                       clear_screen=False, use_lookup_cache=False)
+    for phase in parameters['general_info']['phases']:
+        CreateTemplate.createphase(phase)
+    return plan_client
+
+
+def export_template(parameters, directory, log_directory=None):
+    """
+    Compile a template and write it as an XLR import file, without calling XLR.
+
+    Args:
+        parameters (dict): YAML configuration loaded as dictionary
+        directory (str): Output directory of <release>.json and <release>.xlr
+        log_directory (str): Custom log directory (defaults to log/<release_name>/plan)
+
+    Returns:
+        list: Paths of the written files
+    """
+    return write_template_export(build_template_export(compile_template(parameters, log_directory).calls), directory)
+
+
+def bench_scripts(parameters, sizes=None, log_directory=None):
+    """
+    Run the script tasks of compiled templates under CPython (see xlr_script_bench).
+
+    Args:
+        parameters (dict): YAML configuration loaded as dictionary
+        sizes (list): (packages, phases) of the synthetic templates built from
+            parameters; None benches the template of parameters itself
+        log_directory (str): Custom log directory (defaults to log/<release_name>/plan)
+
+    Returns:
+        list: (label, bench_release() results) per template
+    """
+    benches = []
+    for size in sizes or [None]:
+        bench_parameters = copy.deepcopy(parameters) if size is None else synthetic_parameters(parameters, *size)
+        label = bench_parameters['general_info']['name_release'] if size is None else '%dx%d' % size
+        calls = compile_template(copy.deepcopy(bench_parameters), log_directory).calls
+        benches.append((label, bench_release(build_template_export(calls), bench_parameters)))
+    return benches
+
+
+def verify_template(CreateTemplate, expected_release):
+    """
+    Compare the generated template with its compiled model (one GET call).
+
+    Args:
+        CreateTemplate (XLRBase): Instance that generated the template
+        expected_release (dict): build_template_export() of the same YAML configuration
+
+    Returns:
+        list: template_drift() records, also written to log/<release>/verify.json
+    """
+    drift = template_drift(expected_release, CreateTemplate.get_template(CreateTemplate.XLR_template_id))
+    for line in format_drift(drift, expected_release['title']):
+        if drift:
+            CreateTemplate.enhanced_logger.warning(line, operation='verify_template')
+        else:
+            CreateTemplate.enhanced_logger.info(line, operation='verify_template')
+    with open(os.path.join(str(CreateTemplate.enhanced_logger.log_dir), 'verify.json'), 'w') as file:
+        json.dump(drift, file, indent=2)
+    return drift
+
+
+def import_template(path, xlr_folder, use_lookup_cache=True):
+    """
+    Import an exported template (.json or .xlr) into an XLR folder.
+
+    Args:
+        path (str): File written by export_template()
+        xlr_folder (str): XLR folder path receiving the template
+        use_lookup_cache (bool): Use the persistent folder/template lookup cache
+
+    Returns:
+        tuple: (XLRTemplateImport instance, template URL)
+    """
+    TemplateImport = XLRTemplateImport(read_template_export(path), xlr_folder, load_configuration(),
+                                       use_lookup_cache=use_lookup_cache)
+    TemplateImport.import_template()
+    return TemplateImport, TemplateImport.template_url
+
+
+def expand_batch(spec):
+    """
+    List the YAML files of a --batch argument.
+
+    Args:
+        spec (str): Directory (all *.yaml / *.yml files in it) or glob pattern
+
+    Returns:
+        list: Sorted YAML file paths
+    """
+    if os.path.isdir(spec):
+        files = glob.glob(os.path.join(spec, '*.yaml')) + glob.glob(os.path.join(spec, '*.yml'))
+    else:
+        files = glob.glob(spec, recursive=True)
+    return sorted(path for path in files if os.path.isfile(path))
+
+
+def generate_batch_item(path, xlr_client_factory, use_cache=True, log_root=None, clone_from=None):
+    """
+    Generate one template of a batch, never raising.
+
+    Args:
+        path (str): YAML file
+        xlr_client_factory (callable): Returns the XLRClient of this release
+        use_cache (bool): Use the YAML parsed-config and XLR lookup caches
+        log_root (str): Directory of the log/<release> folders (default 'log')
+        clone_from (tuple): (canonical template id, variant_patches()) to copy the
+            template from its family canonical template instead of building it
+
+    Returns:
+        dict: file, release, status ('OK' or 'FAILED'), mode ('built' or 'cloned'),
+            template_id, template_url, patches, api_calls, duration, error
+    """
+    start = time.time()
+    result = {'file': path, 'release': None, 'status': 'FAILED', 'mode': 'built', 'template_id': None,
+              'template_url': None, 'patches': None, 'api_calls': 0, 'duration': 0.0, 'error': None}
+    client = xlr_client_factory()
+    try:
+        parameters = load_yaml_file(path, use_cache=use_cache)
+        result['release'] = parameters['general_info']['name_release']
+        log_directory = os.path.join(log_root, result['release']) if log_root else None
+        if clone_from is None:
+            CreateTemplate, result['template_url'] = generate_template(parameters, xlr_client=client,
+                                                                       log_directory=log_directory, clear_screen=False,
+                                                                       use_lookup_cache=use_cache)
+            result['template_id'] = CreateTemplate.XLR_template_id
+        else:
+            canonical_template_id, patches = clone_from
+            result.update(mode='cloned', patches=len(patches))
+            variants = XLRVariants(parameters, load_configuration(), xlr_client=client,
+                                   log_directory=log_directory, use_lookup_cache=use_cache)
+            result['template_id'] = variants.clone_template(canonical_template_id, patches)
+            result['template_url'] = variants.template_url
+        result['status'] = 'OK'
+    except SystemExit as e:
+        # XLR errors are logged by the classes before they exit
+        result['error'] = f"generation stopped (exit code {e.code}), see error.log"
+    except (OSError, yaml.YAMLError) as e:
+        result['error'] = f"cannot load YAML file: {e}"
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    if client.enhanced_logger is not None:
+        result['api_calls'] = client.enhanced_logger.operation_counters['api_calls']
+    result['duration'] = time.time() - start
+    return result
+
+
+def shared_client_factory(workers=4):
+    """
+    Return a factory of XLR clients sharing one connection pool and lookup cache.
+
+    Args:
+        workers (int): Templates generated concurrently (size of the connection pool)
+    """
+    shared_client = XLRClient(pool_size=max(workers, 1))
+    return lambda: XLRClient(session=shared_client.session, lookup_cache=shared_client.lookup_cache)
+
+
+def run_batch(files, workers=4, use_cache=True, xlr_client_factory=None, log_root=None):
+    """
+    Generate many templates in one process with a bounded worker pool.
+
+    Args:
+        files (list): YAML files
+        workers (int): Number of templates generated concurrently
+        use_cache (bool): Use the YAML parsed-config and XLR lookup caches
+        xlr_client_factory (callable): Returns one client per release; by default
+            clients share one connection pool and lookup cache
+        log_root (str): Directory of the log/<release> folders (default 'log')
+
+    Returns:
+        list: generate_batch_item() results, in the order of files
+
+    Each release keeps its own loggers; a failed template is reported in the
+    results and does not stop the batch.
+    """
+    if xlr_client_factory is None:
+        xlr_client_factory = shared_client_factory(workers)
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        return list(executor.map(lambda path: generate_batch_item(path, xlr_client_factory, use_cache, log_root),
+                                 files))
+
+
+def watch_templates(directory, workers=4, use_cache=True, debounce=1.0):
+    """
+    Regenerate the templates of a directory each time their YAML file changes.
+
+    Args:
+        directory (str): Directory containing the template YAML files
+        workers (int): Templates regenerated concurrently
+        use_cache (bool): Use the YAML parsed-config and XLR lookup caches
+        debounce (float): Quiet time in seconds before regenerating after an edit
+
+    Runs until interrupted (Ctrl+C). Imports, the XLR connection pool, folder
+    lookups, configuration and parsed YAML stay warm between regenerations.
+    """
+    watcher = YamlDirectoryWatcher(directory, debounce=debounce)
+    xlr_client_factory = shared_client_factory(workers)
+    print(f"Watching {watcher.directory} ({watcher.mode}), Ctrl+C to stop")
+    try:
+        while True:
+            files = watcher.wait_for_changes()
+            if not files:
+                continue
+            start = time.time()
+            results = run_batch(files, workers=workers, use_cache=use_cache, xlr_client_factory=xlr_client_factory)
+            for line in format_batch_summary(results, time.time() - start):
+                print(line)
+    except KeyboardInterrupt:
+        print("Watch stopped")
+    finally:
+        watcher.close()
+
+
+def run_batch_variants(files, workers=4, use_cache=True, xlr_client_factory=None, log_root=None):
+    """
+    Generate many templates, cloning the variants of a family server-side.
+
+    Args:
+        files (list): YAML files
+        workers (int): Number of templates generated concurrently
+        use_cache (bool): Use the YAML parsed-config and XLR lookup caches
+        xlr_client_factory (callable): Returns one client per release (see run_batch)
+        log_root (str): Directory of the log/<release> folders (default 'log')
+
+    Returns:
+        list: generate_batch_item() results, in the order of files
+
+    Every file is compiled without calling XLR, and files in the same XLR folder
+    with the same template structure form a family. The first file of each
+    family is built as usual; the others are copied from it and only their
+    differing variables and tasks are patched. A variant whose canonical
+    template failed is built from scratch.
+    """
+    if xlr_client_factory is None:
+        xlr_client_factory = shared_client_factory(workers)
+
+    def compile_file(path):
+        try:
+            parameters = load_yaml_file(path, use_cache=use_cache)
+            log_directory = os.path.join(log_root or 'log', parameters['general_info']['name_release'], 'plan')
+            return parameters, compiled_objects(compile_template(parameters, log_directory).calls)
+        except (SystemExit, Exception):
+            # Reported by the full build of the file
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        compiled = dict(zip(files, executor.map(compile_file, files)))
+
+        families = {}
+        for path in files:
+            if compiled[path] is not None:
+                parameters, objects = compiled[path]
+                family = (parameters['general_info']['xlr_folder'], template_signature(objects))
+                families.setdefault(family, []).append(path)
+
+        canonicals = [path for path in files
+                      if compiled[path] is None or any(family[0] == path for family in families.values())]
+        results = dict(zip(canonicals, executor.map(
+            lambda path: generate_batch_item(path, xlr_client_factory, use_cache, log_root), canonicals)))
+
+        def clone_file(path, canonical):
+            if results[canonical]['status'] != 'OK':
+                return generate_batch_item(path, xlr_client_factory, use_cache, log_root)
+            patches = variant_patches(compiled[canonical][1], compiled[path][1])
+            return generate_batch_item(path, xlr_client_factory, use_cache, log_root,
+                                       clone_from=(results[canonical]['template_id'], patches))
+
+        variants = [(path, family[0]) for family in families.values() for path in family[1:]]
+        results.update(zip([path for path, _ in variants],
+                           executor.map(lambda variant: clone_file(*variant), variants)))
+
+    return [results[path] for path in files]
+
+
+def sweep_templates(files, pattern='*', apply=False, workers=4, use_cache=True):
+    """
+    Find, and optionally delete, the orphan templates of the XLR folders used by YAML files.
+
+    Args:
+        files (list): YAML files declaring the templates to keep
+        pattern (str): fnmatch pattern of the template titles owned by the generator
+        apply (bool): Delete the orphans; only list them when False
+        workers (int): Folders searched and templates deleted concurrently
+        use_cache (bool): Use the YAML parsed-config and XLR lookup caches
+
+    Returns:
+        list: (folder path, template) of every orphan
+
+    Raises:
+        OSError, yaml.YAMLError, KeyError: If a YAML file cannot be read; a
+            partial list of templates to keep must never drive a deletion
+    """
+    folders = {}
+    for path in files:
+        general_info = load_yaml_file(path, use_cache=use_cache)['general_info']
+        folders.setdefault(general_info['xlr_folder'], set()).add(general_info['name_release'])
+    cleanup = XLRTemplateCleanup(folders, load_configuration(), use_lookup_cache=use_cache)
+    return cleanup.sweep(pattern=pattern, apply=apply, workers=workers)
+
+
+def format_batch_summary(results, duration):
+    """Render the combined summary of a batch as printable lines."""
+    failed = [result for result in results if result['status'] != 'OK']
+    lines = [f"BATCH SUMMARY : {len(results)} template(s), {len(results) - len(failed)} OK, "
+             f"{len(failed)} FAILED ({duration:.1f}s)"]
+    for result in results:
+        name = result['release'] or os.path.basename(result['file'])
+        if result['status'] == 'OK':
+            cloned = f", cloned with {result['patches']} patch(es)" if result.get('mode') == 'cloned' else ''
+            lines.append(f"  OK      {name} ({result['duration']:.1f}s, {result['api_calls']} API calls{cloned}) "
+                         f"{result['template_url']}")
+    if failed:
+        lines.append("  Failures :")
+        for result in failed:
+            lines.append(f"  FAILED  {result['file']} : {result['error']}")
+    return lines
+
+
 if __name__ == "__main__":
     """
     Main execution block for XLR template generation - V4 Enhanced Logging.
@@ -444,55 +1064,219 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Generate XLR deployment templates from YAML configuration (V4 Enhanced Logging)"
     )
-    parser.add_argument('--infile', nargs=1,
-                        help="YAML file to be processed",
-                        type=argparse.FileType('r'),
-                        required=True)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--infile', nargs=1,
+                        help="YAML file to be processed")
+    source.add_argument('--batch', metavar='DIR|GLOB',
+                        help="Generate every YAML file of a directory or glob pattern in one process")
+    source.add_argument('--watch', metavar='DIR',
+                        help="Regenerate the templates of a directory each time their YAML file changes")
+    source.add_argument('--sweep', metavar='DIR|GLOB',
+                        help="List the templates of the XLR folders used by these YAML files that no "
+                             "YAML file declares anymore (--apply to delete them)")
+    source.add_argument('--import', dest='import_file', metavar='FILE',
+                        help="Import a template written by --export (.json or .xlr) with one XLR call")
+    parser.add_argument('--variants', action='store_true',
+                        help="In --batch mode, build one template per family of identical structure "
+                             "and copy the others from it, patching only what differs")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="Templates generated concurrently in --batch/--watch mode (default: 4)")
+    parser.add_argument('--debounce', type=float, default=1.0,
+                        help="Seconds without change before regenerating in --watch mode (default: 1.0)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignore the caches: re-parse the YAML file (persistent YAML cache) and "
+                             "look XLR folders/templates up again (persistent lookup cache)")
+    parser.add_argument('--plan', action='store_true',
+                        help="Compile the template without calling XLR and print the API cost estimate")
+    parser.add_argument('--bench', nargs='?', const='', metavar='NxM[,NxM...]',
+                        help="Run the script tasks of the compiled template under CPython with fake XLR APIs "
+                             "and print their API calls and runtime; NxM benches synthetic templates of "
+                             "N packages and M phases built from --infile instead")
+    parser.add_argument('--critical-path', metavar='HISTORY',
+                        help="Estimate the release duration and critical path of the compiled template from "
+                             "the task durations of an exported XLR release (.json) or a type,title,seconds CSV")
+    parser.add_argument('--verify', action='store_true',
+                        help="After the generation, fetch the template once and report any difference "
+                             "with the compiled model (exit code 1 on drift)")
+    parser.add_argument('--phases', type=lambda value: [phase.strip() for phase in value.split(',') if phase.strip()],
+                        help="Rebuild only these phases (e.g. PRODUCTION,BENCH) of the template generated "
+                             "by the previous --phases/--only-changed run, in place")
+    parser.add_argument('--only-changed', action='store_true',
+                        help="Rebuild only the phases whose content changed since the previous "
+                             "--phases/--only-changed run")
+    parser.add_argument('--export', metavar='DIR',
+                        help="Compile the template(s) without calling XLR and write XLR import files "
+                             "(<release>.json and <release>.xlr) in DIR")
+    parser.add_argument('--push', action='store_true',
+                        help="With --export and --infile, also generate the template in XLR")
+    parser.add_argument('--folder', metavar='XLR_FOLDER',
+                        help="XLR folder path receiving the template in --import mode")
+    parser.add_argument('--match', metavar='PATTERN', default='*',
+                        help="In --sweep mode, only template titles matching this pattern are orphans (default: *)")
+    parser.add_argument('--apply', action='store_true',
+                        help="In --sweep mode, delete the orphan templates")
     arguments = parser.parse_args()
 
-    # Load and validate YAML configuration
+    if arguments.plan and arguments.infile is None:
+        parser.error("--plan is only available with --infile")
+    if arguments.bench is not None and (arguments.infile is None or arguments.plan or arguments.export):
+        parser.error("--bench is only available with --infile, without --plan/--export")
+    if arguments.critical_path is not None and (arguments.infile is None or arguments.plan or arguments.export
+                                                or arguments.bench is not None):
+        parser.error("--critical-path is only available with --infile, without --plan/--export/--bench")
+    if arguments.variants and arguments.batch is None:
+        parser.error("--variants is only available with --batch")
+    if arguments.export is not None and arguments.infile is None and arguments.batch is None:
+        parser.error("--export is only available with --infile or --batch")
+    if arguments.push and (arguments.export is None or arguments.infile is None):
+        parser.error("--push is only available with --export and --infile")
+    if arguments.verify and (arguments.infile is None or arguments.plan or (arguments.export and not arguments.push)):
+        parser.error("--verify is only available when --infile generates the template in XLR")
+    if (arguments.import_file is None) != (arguments.folder is None):
+        parser.error("--import and --folder go together")
+
+    incremental = arguments.phases is not None or arguments.only_changed
+    if incremental and (arguments.infile is None or arguments.plan or arguments.export):
+        parser.error("--phases/--only-changed are only available when --infile generates the template in XLR")
+    if arguments.apply and arguments.sweep is None:
+        parser.error("--apply is only available with --sweep")
+
+    if arguments.sweep is not None:
+        files = expand_batch(arguments.sweep)
+        if not files:
+            print('No YAML file found for:', arguments.sweep)
+            sys.exit(10)
+        try:
+            orphans = sweep_templates(files, pattern=arguments.match, apply=arguments.apply,
+                                      workers=arguments.workers, use_cache=not arguments.no_cache)
+        except (OSError, yaml.YAMLError, KeyError) as e:
+            print('Sweep cancelled, cannot read every YAML file:', e)
+            sys.exit(10)
+        for xlr_folder, template in orphans:
+            print(f"  {'DELETED' if arguments.apply else 'ORPHAN '} {xlr_folder} / {template['title']} ({template['id']})")
+        print(f"SWEEP : {len(orphans)} orphan template(s)" + ("" if arguments.apply or not orphans else ", --apply to delete them"))
+        sys.exit(0)
+
+    if arguments.import_file is not None:
+        try:
+            TemplateImport, template_url = import_template(arguments.import_file, arguments.folder,
+                                                           use_lookup_cache=not arguments.no_cache)
+        except (OSError, ValueError, KeyError) as e:
+            print('Not a template export file:', arguments.import_file, e)
+            sys.exit(10)
+        print(f"🔗 Template URL: {template_url}")
+        sys.exit(0)
+
+    if arguments.watch is not None:
+        if not os.path.isdir(arguments.watch):
+            print('Not a directory:', arguments.watch)
+            sys.exit(10)
+        watch_templates(arguments.watch, workers=arguments.workers,
+                        use_cache=not arguments.no_cache, debounce=arguments.debounce)
+        sys.exit(0)
+
+    if arguments.batch is not None:
+        files = expand_batch(arguments.batch)
+        if not files:
+            print('No YAML file found for:', arguments.batch)
+            sys.exit(10)
+
+        if arguments.export is not None:
+            # Build step: every file is compiled and exported, nothing is sent to XLR
+            failed = 0
+            for path in files:
+                try:
+                    for export_path in export_template(load_yaml_file(path, use_cache=not arguments.no_cache),
+                                                       arguments.export):
+                        print('EXPORT :', export_path)
+                except (SystemExit, Exception) as e:
+                    failed += 1
+                    print('EXPORT FAILED :', path, e)
+            sys.exit(1 if failed else 0)
+
+        batch_start = time.time()
+        batch = run_batch_variants if arguments.variants else run_batch
+        results = batch(files, workers=arguments.workers, use_cache=not arguments.no_cache)
+        for line in format_batch_summary(results, time.time() - batch_start):
+            print(line)
+        sys.exit(1 if any(result['status'] != 'OK' for result in results) else 0)
+
+    # Load and validate YAML configuration (C loader + parsed-config cache)
     try:
-        parameters_yaml = yaml.safe_load(arguments.infile[0])
+        parameters = load_yaml_file(arguments.infile[0], use_cache=not arguments.no_cache)
+    except OSError as e:
+        print('Error opening file:', e)
+        sys.exit(10)
     except yaml.YAMLError as e:
         print('Error Loading file, it s not yaml reading format:', e)
         print('Please change your file defintion.')
         sys.exit(10)
 
-    # Convert YAML to JSON and back to ensure proper data structure
-    json_data = json.dumps(parameters_yaml)
-    parameters = json.loads(json_data)
-
-    try:
-        # Create XLR template instance using enhanced logging architecture
-        CreateTemplate = XLRCreateTemplate(parameters)
-        template_url = None
-
-        # Create each phase defined in the configuration with timing
-        CreateTemplate.enhanced_logger.start_timer('phases_creation')
-        for phase in parameters['general_info']['phases']:
-            CreateTemplate.enhanced_logger.start_timer(f'phase_{phase}')
-            CreateTemplate.enhanced_logger.info(f"Creating phase: {phase}",
-                                              operation='create_phase',
-                                              phase=phase)
-            template_url = CreateTemplate.createphase(phase)
-            CreateTemplate.enhanced_logger.end_timer(f'phase_{phase}',
-                                                    f"Phase {phase} completed")
+    if arguments.plan:
+        # Dry run: every XLR call is recorded by XLRPlanClient instead of being sent
+        name_release = parameters['general_info']['name_release']
+        plan_client = compile_template(parameters)
 
-        CreateTemplate.enhanced_logger.end_timer('phases_creation',
-                                                "All phases created successfully")
+        latency, samples = load_latency_history('log')
+        for line in format_plan(summarize_plan(plan_client.calls, latency), name_release, samples):
+            print(line)
+        for line in format_script_report(plan_client.script_stage.report()):
+            print('  ' + line)
+        sys.exit(0)
 
-        # End session timing
-        CreateTemplate.enhanced_logger.end_timer('session_total')
-
-        # Log successful completion with same messages for compatibility
-        CreateTemplate.enhanced_logger.info("---------------------------")
-        CreateTemplate.enhanced_logger.info("END CREATION TEMPLATE : OK (V4 Enhanced Logging)")
-        CreateTemplate.enhanced_logger.info("---------------------------")
-        CreateTemplate.enhanced_logger.info(parameters['general_info']['name_release'])
-        CreateTemplate.enhanced_logger.info(template_url)
+    if arguments.critical_path is not None:
+        try:
+            history = XLRDurationHistory.load(arguments.critical_path)
+        except (OSError, ValueError, KeyError) as e:
+            print('Not a duration history file:', arguments.critical_path, e)
+            sys.exit(10)
+        release = build_template_export(compile_template(parameters).calls)
+        for line in format_critical_path(critical_path(release, history), release['title']):
+            print(line)
+        sys.exit(0)
+
+    if arguments.bench is not None:
+        try:
+            sizes = [tuple(int(value) for value in size.lower().split('x')) for size in arguments.bench.split(',') if size.strip()]
+            benches = bench_scripts(parameters, sizes)
+        except ValueError as e:
+            print('Invalid --bench size (NxM expected):', arguments.bench, e)
+            sys.exit(10)
+        for label, results in benches:
+            for line in format_bench(results, label):
+                print(line)
+        sys.exit(1 if any(result['status'] != 'OK' for _, results in benches for result in results) else 0)
+
+    if arguments.export is not None:
+        try:
+            for export_path in export_template(parameters, arguments.export):
+                print('EXPORT :', export_path)
+        except ValueError as e:
+            print('❌ Template export failed:', e)
+            sys.exit(1)
+        if not arguments.push:
+            sys.exit(0)
+
+    if arguments.verify:
+        # Compiled before the generation, which may update the parameters in place
+        expected_release = build_template_export(compile_template(copy.deepcopy(parameters)).calls)
+
+    if incremental:
+        unknown = [phase for phase in arguments.phases or [] if phase not in parameters['general_info']['phases']]
+        if unknown:
+            print('Unknown phase(s) for this template:', ', '.join(unknown))
+            sys.exit(10)
 
-        # Log session summary
-        CreateTemplate.enhanced_logger.log_session_summary()
+    try:
+        # Create XLR template instance using enhanced logging architecture
+        if incremental:
+            CreateTemplate, template_url, rebuilt = regenerate_template(parameters, phases=arguments.phases,
+                                                                        only_changed=arguments.only_changed,
+                                                                        use_lookup_cache=not arguments.no_cache)
+            print("🔁 Rebuilt phases: " + (', '.join(rebuilt) or 'none') if rebuilt is not None
+                  else "🔁 No usable previous run: full generation")
+        else:
+            CreateTemplate, template_url = generate_template(parameters, use_lookup_cache=not arguments.no_cache)
 
         print(f"\n🎉 Template creation completed successfully!")
         print(f"📊 Check logs in: log/{parameters['general_info']['name_release']}/")
@@ -500,8 +1284,8 @@ if __name__ == "__main__":
 
     except Exception as e:
         print(f"❌ Template creation failed: {e}")
-        if 'CreateTemplate' in locals() and CreateTemplate.enhanced_logger:
-            CreateTemplate.enhanced_logger.error(f"Template creation failed: {e}",
-                                                operation='template_creation',
-                                                error_type='unexpected_error')
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+    if arguments.verify:
+        drift = verify_template(CreateTemplate, expected_release)
+        sys.exit(1 if drift else 0)
@@ -1,9 +1,310 @@
 """
 YAML file validation utilities for XLR template creation
+
+The template YAML format (see DOCUMENTATION_YAML_CONFLUENCE_FR.md) is
+described by TEMPLATE_SCHEMA. The schema is compiled once into nested
+validator functions, and validate_parameters() reports every error of a file
+in a single pass, before any XLR API call is made.
 """
-import yaml
 import sys
 
+PHASES = ['BUILD', 'DEV', 'UAT', 'BENCH', 'PRODUCTION']
+TECHNICAL_TASK_CATEGORIES = ['before_deployment', 'before_xldeploy', 'after_xldeploy',
+                             'after_deployment', 'before_action', 'after_action']
+TECHNICAL_TASK_TYPES = ['task_ops', 'task_dba_other', 'task_dba_factor']
+
+# Phase item keys handled directly by XLRCreateTemplate.createphase
+NOTIFICATION_ITEMS = ['email_close_release', 'email_end_release']
+
+STRING = {'type': str}
+STRING_LIST = {'type': list, 'items': STRING}
+
+TEMPLATE_SCHEMA = {
+    'type': dict,
+    'required': ['general_info', 'template_liste_package'],
+    'fields': {
+        'general_info': {
+            'type': dict,
+            'required': ['type_template', 'xlr_folder', 'iua', 'name_release', 'phases', 'template_package_mode'],
+            'fields': {
+                'type_template': STRING,
+                'xlr_folder': STRING,
+                'iua': STRING,
+                'appli_name': STRING,
+                'name_release': STRING,
+                'phases': {'type': list, 'min_length': 1, 'unique': True, 'items': {'type': str, 'enum': PHASES}},
+                'SUN_approuver': STRING,
+                'technical_task_mode': {'type': str, 'enum': ['string', 'listbox']},
+                'template_package_mode': {'type': str, 'enum': ['string', 'listbox']},
+                'phase_mode': {'type': str, 'enum': ['one_list', 'multi_list']},
+                'option_latest': {'type': bool},
+                'xld_group': {'type': bool},
+                'deselected_task_mode': {'type': str, 'enum': ['delete', 'skip']},
+                'script_minify': {'type': bool},
+                'parallel_groups': {'type': bool},
+                'xld_version_lookup': {'type': str, 'enum': ['per_package', 'consolidated']},
+                'script_bytes_budget': {'type': int},
+            },
+        },
+        'technical_task_list': {
+            'type': dict,
+            'keys': {'type': str, 'enum': TECHNICAL_TASK_CATEGORIES},
+            'values': {'type': list, 'nullable': True, 'items': {'type': str, 'enum': TECHNICAL_TASK_TYPES}},
+        },
+        'template_liste_package': {
+            'type': dict,
+            'min_length': 1,
+            'values': {
+                'type': dict,
+                'required': ['package_build_name', 'controlm_mode', 'XLD_application_path', 'XLD_environment_path'],
+                'fields': {
+                    'package_build_name': STRING,
+                    'controlm_mode': {'type': str, 'enum': ['master', 'Independant']},
+                    'XLD_application_path': STRING,
+                    'XLD_environment_path': STRING,
+                    'auto_undeploy': {'type': (bool, list), 'items': STRING},
+                    'mode': {'type': str, 'enum': ['CHECK_XLD', 'name_from_jenkins']},
+                },
+            },
+        },
+        'jenkins': {
+            'type': dict,
+            'fields': {
+                'jenkinsServer': STRING,
+                'taskType': STRING,
+                'username': STRING,
+                'jenkinsjob': {
+                    'type': dict,
+                    'values': {
+                        'type': dict,
+                        'required': ['jobName'],
+                        'fields': {
+                            'jobName': STRING,
+                            'parameters': STRING_LIST,
+                        },
+                    },
+                },
+            },
+        },
+        'Phases': {
+            'type': dict,
+            'keys': {'type': str, 'enum': PHASES},
+            'values': {'type': list, 'items': {'type': dict, 'min_length': 1, 'max_length': 1}},
+        },
+    },
+}
+
+# Schema of the content of each phase item kind
+PHASE_ITEM_SCHEMAS = {
+    'xldeploy': {'type': dict, 'min_length': 1, 'values': {'type': list, 'min_length': 1, 'items': STRING}},
+    'controlm': {
+        'type': dict,
+        'values': {
+            'type': (dict, str),
+            'fields': {
+                'type_group': {'type': str, 'enum': ['SequentialGroup', 'ParallelGroup']},
+                'folder': {
+                    'type': list,
+                    'items': {
+                        'type': (str, dict),
+                        'values': {
+                            'type': dict,
+                            'nullable': True,
+                            'fields': {'hold': {'type': bool}, 'case': STRING_LIST},
+                        },
+                    },
+                },
+            },
+        },
+    },
+    'controlmspec': {'type': dict, 'fields': {'mode': {'type': str, 'enum': ['profil', 'free']}}},
+    'email_end_release': {'type': dict, 'required': ['destinataire'], 'fields': {'destinataire': STRING_LIST}},
+    'email_close_release': {'type': dict, 'nullable': True, 'fields': {'cc': STRING_LIST}},
+}
+
+
+def _type_name(expected):
+    if isinstance(expected, tuple):
+        return ' or '.join(t.__name__ for t in expected)
+    return expected.__name__
+
+
+def compile_schema(schema):
+    """
+    Compile a schema node into a validator function.
+
+    Args:
+        schema (dict): Schema node (type, required, fields, keys, values,
+            items, enum, min_length, max_length, unique, nullable)
+
+    Returns:
+        callable: validator(value, path, errors) appending messages to errors
+    """
+    expected = schema.get('type')
+    nullable = schema.get('nullable', False)
+    enum = schema.get('enum')
+    enum_set = frozenset(enum) if enum is not None else None
+    required = tuple(schema.get('required', ()))
+    min_length = schema.get('min_length')
+    max_length = schema.get('max_length')
+    unique = schema.get('unique', False)
+    fields = {name: compile_schema(node) for name, node in schema.get('fields', {}).items()}
+    validate_key = compile_schema(schema['keys']) if 'keys' in schema else None
+    validate_value = compile_schema(schema['values']) if 'values' in schema else None
+    validate_item = compile_schema(schema['items']) if 'items' in schema else None
+
+    def validator(value, path, errors):
+        if value is None:
+            if not nullable:
+                errors.append(f"{path}: value is missing")
+            return
+        # bool is a subclass of int: only accept it where bool is expected
+        if expected is not None and (not isinstance(value, expected) or
+                                     (isinstance(value, bool) and bool not in
+                                      (expected if isinstance(expected, tuple) else (expected,)))):
+            errors.append(f"{path}: expected {_type_name(expected)}, got {type(value).__name__}")
+            return
+        if enum_set is not None and value not in enum_set:
+            errors.append(f"{path}: '{value}' is not one of {enum}")
+            return
+        if isinstance(value, (dict, list)):
+            if min_length is not None and len(value) < min_length:
+                errors.append(f"{path}: at least {min_length} entries expected")
+            if max_length is not None and len(value) > max_length:
+                errors.append(f"{path}: at most {max_length} entries expected")
+
+        if isinstance(value, dict):
+            for name in required:
+                if name not in value:
+                    errors.append(f"{path}: missing required key '{name}'")
+            for key, item in value.items():
+                item_path = f"{path}.{key}" if path else str(key)
+                if validate_key is not None:
+                    validate_key(key, item_path, errors)
+                field_validator = fields.get(key)
+                if field_validator is not None:
+                    field_validator(item, item_path, errors)
+                elif validate_value is not None:
+                    validate_value(item, item_path, errors)
+        elif isinstance(value, list):
+            if unique and len(set(map(repr, value))) != len(value):
+                errors.append(f"{path}: duplicated entries")
+            if validate_item is not None:
+                for index, item in enumerate(value):
+                    validate_item(item, f"{path}[{index}]", errors)
+
+    return validator
+
+
+_validate_template = compile_schema(TEMPLATE_SCHEMA)
+_validate_phase_items = {kind: compile_schema(node) for kind, node in PHASE_ITEM_SCHEMAS.items()}
+
+
+def _check_consistency(parameters, errors):
+    """Cross-section rules that a per-node schema cannot express."""
+    general_info = parameters.get('general_info') or {}
+    phases = general_info.get('phases') if isinstance(general_info.get('phases'), list) else []
+    packages = parameters.get('template_liste_package')
+    packages = packages if isinstance(packages, dict) else {}
+
+    if len(phases) > 1 and 'phase_mode' not in general_info:
+        errors.append("general_info: missing required key 'phase_mode' (more than one phase)")
+    if parameters.get('technical_task_list') is not None and 'technical_task_mode' not in general_info:
+        errors.append("general_info: missing required key 'technical_task_mode' (technical_task_list is defined)")
+
+    for package, package_value in packages.items():
+        if isinstance(package_value, dict) and isinstance(package_value.get('auto_undeploy'), list):
+            for index, undeploy in enumerate(package_value['auto_undeploy']):
+                if undeploy not in packages:
+                    errors.append(f"template_liste_package.{package}.auto_undeploy[{index}]: "
+                                  f"'{undeploy}' is not in template_liste_package")
+
+    jenkinsjob = (parameters.get('jenkins') or {}).get('jenkinsjob') if isinstance(parameters.get('jenkins'), dict) else None
+    if isinstance(jenkinsjob, dict):
+        for package in jenkinsjob:
+            if package not in packages:
+                errors.append(f"jenkins.jenkinsjob.{package}: '{package}' is not in template_liste_package")
+
+    for key in parameters:
+        if isinstance(key, str) and key.startswith('XLD_ENV_'):
+            path = key
+            if key[len('XLD_ENV_'):] not in PHASES:
+                errors.append(f"{path}: unknown phase '{key[len('XLD_ENV_'):]}'")
+            value = parameters[key]
+            if not isinstance(value, list) or not value or not all(isinstance(env, str) for env in value):
+                errors.append(f"{path}: expected a non-empty list of environment names")
+
+    phases_section = parameters.get('Phases')
+    if not isinstance(phases_section, dict):
+        if any(phase != 'BUILD' for phase in phases):
+            errors.append("Phases: missing section (required for " + ', '.join(p for p in phases if p != 'BUILD') + ")")
+        return
+
+    for phase in phases:
+        if phase != 'BUILD' and phase not in phases_section:
+            errors.append(f"Phases: missing phase '{phase}' declared in general_info.phases")
+    for phase in phases_section:
+        if phase not in phases:
+            errors.append(f"Phases.{phase}: phase is not declared in general_info.phases")
+
+    # Imported here: check_yaml_file must stay importable without the XLR classes
+    from xlr_classes.xlr_phase_items import PHASE_ITEM_REGISTRY
+
+    for phase, items in phases_section.items():
+        if not isinstance(items, list):
+            continue
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or len(item) != 1:
+                continue
+            key = next(iter(item))
+            path = f"Phases.{phase}[{index}].{key}"
+            if key in NOTIFICATION_ITEMS:
+                _validate_phase_items[key](item[key], path, errors)
+                continue
+            handler = PHASE_ITEM_REGISTRY.resolve(key)
+            if handler is None:
+                errors.append(f"{path}: unknown phase item kind")
+                continue
+            validate_item = _validate_phase_items.get(handler.kind)
+            if validate_item is None:
+                continue
+            before = len(errors)
+            validate_item(item[key], path, errors)
+            if handler.kind == 'xldeploy' and len(errors) == before:
+                for title, xld_value in item[key].items():
+                    if xld_value[0] not in packages:
+                        errors.append(f"{path}.{title}[0]: '{xld_value[0]}' is not in template_liste_package")
+            elif handler.kind == 'controlm' and len(errors) == before:
+                for title, group in item[key].items():
+                    folders = group.get('folder', []) if isinstance(group, dict) else []
+                    for folder in folders:
+                        if isinstance(folder, dict):
+                            for folder_name, folder_value in folder.items():
+                                for case in (folder_value or {}).get('case', []) or []:
+                                    if case not in packages:
+                                        errors.append(f"{path}.{title}.folder.{folder_name}.case: "
+                                                      f"'{case}' is not in template_liste_package")
+
+
+def validate_parameters(parameters):
+    """
+    Validate a whole template configuration.
+
+    Args:
+        parameters (dict): YAML configuration loaded as dictionary
+
+    Returns:
+        list: Error messages (empty when the configuration is valid)
+    """
+    errors = []
+    if not isinstance(parameters, dict):
+        return ["template: expected a mapping at the top level of the YAML file"]
+
+    _validate_template(parameters, '', errors)
+    _check_consistency(parameters, errors)
+    return errors
+
+
 def check_yaml_file(template_instance):
     """
     Validate YAML configuration file for XLR template creation.
@@ -11,28 +312,16 @@ def check_yaml_file(template_instance):
     Args:
         template_instance: XLRCreateTemplate instance with parameters to validate
 
-    Performs basic validation of required YAML structure and logs results.
+    Validates the full YAML structure against TEMPLATE_SCHEMA, logs every
+    error found and exits before any template is deleted or created.
     """
-    try:
-        parameters = template_instance.parameters
-
-        # Basic validation
-        required_sections = ['general_info', 'template_liste_package']
-        for section in required_sections:
-            if section not in parameters:
-                template_instance.logger_error.error(f"Missing required section: {section}")
-                sys.exit(1)
-
-        # Validate general_info
-        general_info = parameters['general_info']
-        required_fields = ['name_release', 'phases']
-        for field in required_fields:
-            if field not in general_info:
-                template_instance.logger_error.error(f"Missing required field in general_info: {field}")
-                sys.exit(1)
-
-        template_instance.logger_cr.info("YAML file validation: PASSED")
-
-    except Exception as e:
-        template_instance.logger_error.error(f"YAML validation error: {e}")
-        sys.exit(1)
\ No newline at end of file
+    errors = validate_parameters(template_instance.parameters)
+
+    if errors:
+        template_instance.logger_error.error(f"YAML validation: {len(errors)} error(s)")
+        for error in errors:
+            template_instance.logger_error.error(error)
+            print("YAML ERROR : " + error)
+        sys.exit(1)
+
+    template_instance.logger_cr.info("YAML file validation: PASSED")
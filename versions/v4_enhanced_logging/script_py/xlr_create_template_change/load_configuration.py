@@ -0,0 +1,51 @@
+"""
+XLR API configuration loading for XLR template creation
+
+Reads _conf/xlr_create_template_change.ini (key=value lines). The file is
+looked up in the current directory first, then next to DYNAMIC_template.py,
+so the generator can run from any directory. Parsed files are kept in memory:
+--batch and --watch read the configuration once per process.
+"""
+import os
+
+CONFIGURATION_FILE = os.path.join('_conf', 'xlr_create_template_change.ini')
+
+# Directory of DYNAMIC_template.py (script_py/xlr_create_template_change/../..)
+GENERATOR_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# In-process cache: absolute path -> {key: value}
+_configuration_cache = {}
+
+
+def configuration_path(path=None):
+    """Return the absolute path of the configuration file to use."""
+    if path is not None:
+        return os.path.abspath(path)
+    if os.path.exists(CONFIGURATION_FILE):
+        return os.path.abspath(CONFIGURATION_FILE)
+    return os.path.join(GENERATOR_DIR, CONFIGURATION_FILE)
+
+
+def load_configuration(path=None):
+    """
+    Load the XLR API configuration.
+
+    Args:
+        path (str): Configuration file, see configuration_path() when None
+
+    Returns:
+        dict: Configuration keys (url_api_xlr, ops_username_api, ops_password_api)
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    path = configuration_path(path)
+    if path not in _configuration_cache:
+        configuration = {}
+        with open(path, 'r') as file:
+            for line in file:
+                if '=' in line.strip() and not line.strip().startswith('#'):
+                    key, value = line.strip().split('=', 1)
+                    configuration[key] = value
+        _configuration_cache[path] = configuration
+    return dict(_configuration_cache[path])
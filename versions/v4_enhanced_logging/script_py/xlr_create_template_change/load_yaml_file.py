@@ -0,0 +1,164 @@
+"""
+YAML loading utilities for XLR template creation
+
+Parses template YAML files with the C-accelerated loader when PyYAML was
+built with libyaml, normalizes the result in a single pass and caches it as
+JSON in the user cache directory ($XLR_YAML_CACHE, or
+xlr_template_generator/yaml in $XDG_CACHE_HOME or ~/.cache), one file per
+absolute YAML path. Nothing is written next to the YAML file and the cache
+only ever holds JSON, so a writable template directory cannot inject code.
+
+The cache is keyed by file size/mtime and by the SHA-256 of the file content:
+an unchanged file is served from the cache without re-parsing, and a file
+whose mtime changed but whose content did not (git checkout, touch) is only
+hashed. Batch and watch modes also keep an in-process copy.
+XLR_YAML_CACHE=off disables the persistent cache.
+"""
+import datetime
+import hashlib
+import json
+import os
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+ENV_YAML_CACHE = 'XLR_YAML_CACHE'
+CACHE_FORMAT = 2
+
+# In-process cache: absolute path -> (size, mtime_ns, sha256, JSON parameters)
+_memory_cache = {}
+
+
+def _normalize_key(key):
+    """Convert a mapping key the way json.dumps does."""
+    if isinstance(key, str):
+        return key
+    if key is True:
+        return 'true'
+    if key is False:
+        return 'false'
+    if key is None:
+        return 'null'
+    return str(key)
+
+
+def normalize_yaml(value):
+    """
+    Normalize parsed YAML to plain JSON-compatible types in one pass.
+
+    Replaces the former json.dumps/json.loads round-trip: mapping keys become
+    strings, tuples become lists and dates become ISO strings.
+    """
+    if isinstance(value, dict):
+        return {_normalize_key(key): normalize_yaml(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_yaml(item) for item in value]
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def default_cache_dir():
+    """Return $XLR_YAML_CACHE, or the yaml directory of the user cache directory (None when disabled)."""
+    if os.environ.get(ENV_YAML_CACHE):
+        return None if os.environ[ENV_YAML_CACHE].lower() == 'off' else os.environ[ENV_YAML_CACHE]
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'xlr_template_generator', 'yaml')
+
+
+def _cache_path(path):
+    """Return the cache file of an absolute YAML path, or None when the cache is disabled."""
+    cache_dir = default_cache_dir()
+    if cache_dir is None:
+        return None
+    return os.path.join(cache_dir, hashlib.sha256(path.encode('utf-8')).hexdigest() + '.json')
+
+
+def _read_cache(cache_path, path):
+    if cache_path is None:
+        return None
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as file:
+            entry = json.load(file)
+        if isinstance(entry, dict) and entry.get('format') == CACHE_FORMAT and entry.get('path') == path:
+            return entry
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _write_cache(cache_path, entry):
+    if cache_path is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = cache_path + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(entry, file)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # An unwritable cache directory only loses the cache, never the run
+        pass
+
+
+def load_yaml_file(path, use_cache=True):
+    """
+    Load and normalize a template YAML file.
+
+    Args:
+        path (str): YAML file path
+        use_cache (bool): Use the in-process and persistent caches
+
+    Returns:
+        dict: Normalized parameters
+
+    Raises:
+        yaml.YAMLError: If the file is not valid YAML
+        OSError: If the file cannot be read
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+
+    if use_cache:
+        cached = _memory_cache.get(path)
+        if cached is not None and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return json.loads(cached[3])
+
+    with open(path, 'rb') as file:
+        content = file.read()
+    sha256 = hashlib.sha256(content).hexdigest()
+
+    cache_path = _cache_path(path) if use_cache else None
+    entry = _read_cache(cache_path, path)
+
+    if entry is not None and entry.get('sha256') == sha256 and isinstance(entry.get('parameters'), str):
+        payload = entry['parameters']
+        if entry.get('size') != stat.st_size or entry.get('mtime_ns') != stat.st_mtime_ns:
+            entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            _write_cache(cache_path, entry)
+    else:
+        parameters = normalize_yaml(yaml.load(content, Loader=SafeLoader))
+        payload = json.dumps(parameters)
+        _write_cache(cache_path, {'format': CACHE_FORMAT,
+                                  'path': path,
+                                  'size': stat.st_size,
+                                  'mtime_ns': stat.st_mtime_ns,
+                                  'sha256': sha256,
+                                  'parameters': payload})
+
+    if use_cache:
+        _memory_cache[path] = (stat.st_size, stat.st_mtime_ns, sha256, payload)
+
+    return json.loads(payload)
+
+
+def clear_yaml_cache(path=None):
+    """Drop the in-process cache for one file, or for all files."""
+    if path is None:
+        _memory_cache.clear()
+    else:
+        _memory_cache.pop(os.path.abspath(path), None)
@@ -0,0 +1,188 @@
+"""
+YAML directory watcher for XLR template creation (--watch)
+
+Waits for template YAML files of a directory to change. On Linux the
+directory is watched with inotify (through libc, no extra package); elsewhere,
+or when inotify is unavailable, the directory is polled. Bursts of events
+(editor save, git checkout) are debounced, and a file is only reported when
+its content actually changed since it was last reported.
+"""
+import ctypes
+import ctypes.util
+import glob
+import hashlib
+import os
+import select
+import struct
+import time
+
+YAML_EXTENSIONS = ('.yaml', '.yml')
+
+# inotify event masks (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _is_yaml(path):
+    return path.endswith(YAML_EXTENSIONS)
+
+
+def _content_digest(path):
+    try:
+        with open(path, 'rb') as file:
+            return hashlib.sha256(file.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class _InotifyBackend:
+    """Directory events read from an inotify file descriptor."""
+
+    mode = 'inotify'
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.directory = directory
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, 'inotify_add_watch failed: ' + directory)
+
+    def poll(self, timeout):
+        """Return the paths written or moved into the directory within timeout seconds."""
+        ready, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        paths = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name:
+                paths.add(os.path.join(self.directory, os.fsdecode(name)))
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _PollingBackend:
+    """Directory changes found by comparing size/mtime snapshots."""
+
+    mode = 'polling'
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.snapshot = self._snapshot()
+
+    def _snapshot(self):
+        snapshot = {}
+        for path in glob.glob(os.path.join(self.directory, '*')):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def poll(self, timeout):
+        """Return the paths created or modified since the previous poll."""
+        time.sleep(max(timeout, 0))
+        snapshot = self._snapshot()
+        paths = {path for path, state in snapshot.items() if self.snapshot.get(path) != state}
+        self.snapshot = snapshot
+        return paths
+
+    def close(self):
+        pass
+
+
+class YamlDirectoryWatcher:
+    """
+    Report the template YAML files of a directory whose content changed.
+
+    Attributes:
+        directory (str): Watched directory (not recursive)
+        mode (str): 'inotify' or 'polling'
+        debounce (float): Quiet time in seconds that ends a burst of changes
+        poll_interval (float): Seconds between two polls of the backend
+    """
+
+    def __init__(self, directory, debounce=1.0, poll_interval=1.0, use_inotify=True):
+        """
+        Args:
+            directory (str): Directory containing the template YAML files
+            debounce (float): Quiet time in seconds that ends a burst of changes
+            poll_interval (float): Seconds between two polls of the backend
+            use_inotify (bool): Try inotify before falling back to polling
+        """
+        self.directory = os.path.abspath(directory)
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+
+        self.backend = None
+        if use_inotify:
+            try:
+                self.backend = _InotifyBackend(self.directory)
+            except (OSError, AttributeError):
+                # No inotify (not Linux, watch limit reached): poll instead
+                self.backend = None
+        if self.backend is None:
+            self.backend = _PollingBackend(self.directory)
+        self.mode = self.backend.mode
+
+        # Content already generated: path -> sha256
+        self._digests = {path: _content_digest(path)
+                         for path in glob.glob(os.path.join(self.directory, '*')) if _is_yaml(path)}
+
+    def _yaml_paths(self, timeout):
+        return {path for path in self.backend.poll(timeout) if _is_yaml(path)}
+
+    def wait_for_changes(self, timeout=None):
+        """
+        Wait for a debounced burst of YAML changes.
+
+        Args:
+            timeout (float): Maximum seconds to wait for a first change, forever if None
+
+        Returns:
+            list: Sorted paths whose content changed (empty on timeout, or when the
+                burst only touched files without changing them)
+        """
+        start = time.time()
+        changed = set()
+        while not changed:
+            if timeout is not None and time.time() - start >= timeout:
+                return []
+            wait = self.poll_interval if timeout is None else min(self.poll_interval, timeout - (time.time() - start))
+            changed = self._yaml_paths(wait)
+
+        quiet_since = time.time()
+        while time.time() - quiet_since < self.debounce:
+            more = self._yaml_paths(self.debounce - (time.time() - quiet_since))
+            if more:
+                changed |= more
+                quiet_since = time.time()
+
+        paths = []
+        for path in sorted(changed):
+            digest = _content_digest(path)
+            if digest is not None and self._digests.get(path) != digest:
+                self._digests[path] = digest
+                paths.append(path)
+        return paths
+
+    def close(self):
+        """Release the inotify file descriptor."""
+        self.backend.close()
@@ -5,6 +5,7 @@ Test script for V4 Enhanced Logging XLR Template Generator
 
 import sys
 import os
+import time
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from xlr_classes.xlr_base import XLRBase
@@ -113,6 +114,1112 @@ def test_v4_functionality():
         print(f"❌ Enhanced logging test failed: {e}")
         return False
 
+    # Test 6: Technical task index
+    print("\n6️⃣ Testing technical task index...")
+    try:
+        base = XLRBase()
+        base.parameters = {'general_info': {'phases': ['BENCH', 'PRODUCTION'], 'appli_name': 'App'}}
+        base.dict_value_for_template_technical_task = {
+            'technical_task': {'after_xldeploy': ['task_ops', 'task_ops', 'task_dba_factor']}
+        }
+        index = base.build_technical_task_index()
+        entries = index[('PRODUCTION', 'after_xldeploy')]
+        assert [entry['name'] for entry in entries] == ['task_ops_1', 'task_ops_2', 'task_dba_factor_1']
+        assert entries[1]['xlr_sun_task_variable_name'] == 'after_xldeploy_task_sun_task_ops_2_PRODUCTION'
+        assert entries[0]['sun_title'] == 'Action OPS 1 after XLD'
+        assert ('BENCH', 'before_deployment') not in index
+        assert isinstance(base.technical_task_done, set)
+        print("   ✅ Technical tasks indexed by (phase, category)")
+
+    except Exception as e:
+        print(f"❌ Technical task index test failed: {e}")
+        return False
+
+    # Test 7: Phase item registry
+    print("\n7️⃣ Testing phase item registry...")
+    try:
+        from xlr_classes.xlr_phase_items import PHASE_ITEM_REGISTRY, XLRPhaseItemHandler, XLRPhaseItemRegistry
+        from xlr_classes import xlr_phase_items
+
+        assert PHASE_ITEM_REGISTRY.resolve('seq_xldeploy').kind == 'xldeploy'
+        assert PHASE_ITEM_REGISTRY.resolve('XLR_task_controlm').kind == 'controlm'
+        assert PHASE_ITEM_REGISTRY.resolve('controlm_resource').kind == 'controlm_resource'
+        assert PHASE_ITEM_REGISTRY.resolve('seq_controlmspec').kind == 'controlmspec'
+        assert PHASE_ITEM_REGISTRY.resolve('email_end_release') is None
+
+        registry = XLRPhaseItemRegistry()
+
+        class CustomHandler(XLRPhaseItemHandler):
+            kind = 'custom_task'
+
+        registry.register(CustomHandler())
+        resolved = registry.resolve_phase([{'custom_task': 1}, {'other': 2}, {'custom_task': 3}])
+        assert [item.index for handler, item in resolved] == [0, 2]
+        assert [item.is_last_of_kind for handler, item in resolved] == [False, True]
+
+        # dispatch() resolves the generator hooks once per phase, not per item
+        class HookHandler(XLRPhaseItemHandler):
+            kind = 'hook_task'
+
+            def generic(self, ops, phase, item):
+                context = xlr_phase_items.phase_context(ops, item)
+                context.hook('add_task_hook')(phase, item.value, item.value in context.list_package)
+
+        class CountingOps:
+            list_package = ['B']
+
+            def __init__(self):
+                self.lookups, self.created = 0, []
+
+            def __getattribute__(self, name):
+                if name == 'add_task_hook':
+                    object.__getattribute__(self, '__dict__')['lookups'] += 1
+                return object.__getattribute__(self, name)
+
+            def add_task_hook(self, phase, value, known):
+                self.created.append((phase, value, known))
+
+        registry.register(HookHandler())
+        ops = CountingOps()
+        registry.dispatch(ops, 'DEV', [{'hook_task': 'A'}, {'hook_task': 'B'}, {'hook_task': 'C'}])
+        assert ops.created == [('DEV', 'A', False), ('DEV', 'B', True), ('DEV', 'C', False)]
+        assert ops.lookups == 1, ops.lookups
+        print("   ✅ Phase items resolved through the registry, generator hooks resolved once per phase")
+
+    except Exception as e:
+        print(f"❌ Phase item registry test failed: {e}")
+        return False
+
+    # Test 8: YAML loading with parsed-config cache
+    print("\n8️⃣ Testing YAML loading cache...")
+    try:
+        import json
+        import tempfile
+        from unittest import mock
+        from script_py.xlr_create_template_change.load_yaml_file import load_yaml_file, clear_yaml_cache
+
+        with tempfile.TemporaryDirectory() as tmp_dir, tempfile.TemporaryDirectory() as cache_dir, \
+                mock.patch.dict(os.environ, {'XLR_YAML_CACHE': cache_dir}):
+            yaml_path = os.path.join(tmp_dir, 'template.yaml')
+            with open(yaml_path, 'w') as file:
+                file.write("general_info:\n  name_release: TEST\n  phases: [DEV]\n1: one\n")
+
+            first = load_yaml_file(yaml_path)
+            assert first == {'general_info': {'name_release': 'TEST', 'phases': ['DEV']}, '1': 'one'}
+            assert os.listdir(tmp_dir) == ['template.yaml']
+            cache_files = os.listdir(cache_dir)
+            assert len(cache_files) == 1 and cache_files[0].endswith('.json')
+            with open(os.path.join(cache_dir, cache_files[0])) as file:
+                assert json.load(file)['path'] == os.path.abspath(yaml_path)
+
+            clear_yaml_cache()
+            assert load_yaml_file(yaml_path) == first
+
+            # A cache file of another path or a corrupt cache file is ignored, never executed
+            with open(os.path.join(cache_dir, cache_files[0]), 'wb') as file:
+                file.write(b'\x80\x04garbage')
+            clear_yaml_cache()
+            assert load_yaml_file(yaml_path) == first
+
+            with open(yaml_path, 'w') as file:
+                file.write("general_info:\n  name_release: CHANGED\n")
+            assert load_yaml_file(yaml_path)['general_info']['name_release'] == 'CHANGED'
+        print("   ✅ YAML parsed once and served from cache until it changes")
+
+    except Exception as e:
+        print(f"❌ YAML loading cache test failed: {e}")
+        return False
+
+    # Test 9: Full-schema YAML validation
+    print("\n9️⃣ Testing full-schema YAML validation...")
+    try:
+        from script_py.xlr_create_template_change.check_yaml_file import validate_parameters
+        from script_py.xlr_create_template_change.load_yaml_file import load_yaml_file
+
+        template_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'template.yaml')
+        parameters = load_yaml_file(template_path, use_cache=False)
+        assert validate_parameters(parameters) == []
+
+        del parameters['template_liste_package']['App']['controlm_mode']
+        parameters['general_info']['phase_mode'] = 'single'
+        parameters['Phases']['DEV'][1]['seq_xldeploy']['XLD App'] = ['Unknown']
+        errors = validate_parameters(parameters)
+        assert len(errors) == 3, errors
+        assert any('controlm_mode' in error for error in errors)
+        assert any("'Unknown' is not in template_liste_package" in error for error in errors)
+        print("   ✅ All schema errors reported in one pass")
+
+    except Exception as e:
+        print(f"❌ YAML validation test failed: {e}")
+        return False
+
+    # Test 10: --plan API cost estimate
+    print("\n🔟 Testing --plan API cost estimate...")
+    try:
+        import tempfile
+        from xlr_classes.xlr_client import XLRPlanClient, endpoint_of
+        from xlr_classes.xlr_plan import load_latency_history, summarize_plan
+        from xlr_classes.xlr_logger import XLRLogger
+
+        assert endpoint_of('POST', 'https://xlr/api/v1/tasks/Applications/F/R1/Phase2/tasks') == 'POST tasks'
+        assert endpoint_of('GET', 'https://xlr/api/v1/folders/find?byPath=A') == 'GET folders/find'
+        assert endpoint_of('POST', 'https://xlr/api/v1/templates/Applications/F/R1/variables') == 'POST variables'
+
+        client = XLRPlanClient()
+        url = 'https://xlr/api/v1/'
+        template_id = client.post(url + 'templates/?folderId=F', json={'type': 'xlrelease.Release'}).json()['id']
+        phase_id = client.post(url + 'phases/' + template_id + '/phase', json={'title': 'DEV'}).json()['id']
+        task = client.post(url + 'tasks/' + template_id + '/' + phase_id + '/tasks',
+                           json={'type': 'xlrelease.ScriptTask', 'script': 'print 1'}).json()
+        assert task['id'].startswith(template_id + '/' + phase_id + '/Task')
+        client.post(url + 'templates/' + template_id + '/variables', json={'key': 'k', 'type': 'StringVariable'})
+        assert [call['section'] for call in client.calls] == ['template', 'template', 'DEV', 'template']
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            plan_logger = XLRLogger('plan_test', os.path.join(tmp_dir, 'plan_test'))
+            plan_logger.log_api_call('POST tasks', 0.5, 200)
+            latency, samples = load_latency_history(tmp_dir)
+        assert samples == 1 and latency == {'POST tasks': 0.5}
+
+        summary = summarize_plan(client.calls, latency)
+        assert (summary['tasks'], summary['scripts'], summary['variables']) == (1, 1, 1)
+        assert summary['calls_per_phase'] == {'template': 3, 'DEV': 1}
+        assert summary['estimated_from_history'] == 1
+        assert abs(summary['estimated_seconds'] - 2.0) < 1e-9
+        print("   ✅ Calls recorded without XLR and priced from logged latencies")
+
+    except Exception as e:
+        print(f"❌ Plan test failed: {e}")
+        return False
+
+    # Test 11: --batch generation with a worker pool
+    print("\n1️⃣1️⃣ Testing --batch generation...")
+    try:
+        import tempfile
+        import shutil
+        from DYNAMIC_template import expand_batch, run_batch
+        from xlr_classes.xlr_client import XLRPlanClient
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            shutil.copy(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'template.yaml'),
+                        os.path.join(tmp_dir, 'a_template.yaml'))
+            with open(os.path.join(tmp_dir, 'b_broken.yml'), 'w') as file:
+                file.write("general_info:\n  name_release: BROKEN\n  phases: [DEV]\ntemplate_liste_package: {}\n")
+            files = expand_batch(tmp_dir)
+            assert [os.path.basename(path) for path in files] == ['a_template.yaml', 'b_broken.yml']
+
+            results = run_batch(files, workers=2, xlr_client_factory=XLRPlanClient,
+                                log_root=os.path.join(tmp_dir, 'log'))
+            assert [result['status'] for result in results] == ['OK', 'FAILED']
+            assert results[1]['release'] == 'BROKEN' and 'exit code 1' in results[1]['error']
+            assert os.path.exists(os.path.join(tmp_dir, 'log', 'BROKEN', 'error.log'))
+        print("   ✅ Batch continues past failures and keeps one log folder per release")
+
+    except Exception as e:
+        print(f"❌ Batch test failed: {e}")
+        return False
+
+    # Test 12: YAML directory watcher
+    print("\n1️⃣2️⃣ Testing YAML directory watcher...")
+    try:
+        import tempfile
+        from script_py.xlr_create_template_change.watch_yaml_dir import YamlDirectoryWatcher
+
+        for use_inotify in (True, False):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                yaml_path = os.path.join(tmp_dir, 'template.yaml')
+                with open(yaml_path, 'w') as file:
+                    file.write("general_info: {}\n")
+                watcher = YamlDirectoryWatcher(tmp_dir, debounce=0.2, poll_interval=0.05, use_inotify=use_inotify)
+                try:
+                    time.sleep(0.02)
+                    for content in ("general_info: {a: 1}\n", "general_info: {a: 2}\n"):
+                        with open(yaml_path, 'w') as file:
+                            file.write(content)
+                    with open(os.path.join(tmp_dir, 'notes.txt'), 'w') as file:
+                        file.write("not a template")
+                    assert watcher.wait_for_changes(timeout=5) == [yaml_path]
+
+                    # Rewriting the same content does not trigger a regeneration
+                    time.sleep(0.02)
+                    with open(yaml_path, 'w') as file:
+                        file.write("general_info: {a: 2}\n")
+                    assert watcher.wait_for_changes(timeout=1) == []
+                finally:
+                    watcher.close()
+            print(f"   ✅ Debounced content changes reported ({watcher.mode})")
+
+    except Exception as e:
+        print(f"❌ YAML watcher test failed: {e}")
+        return False
+
+    # Test 13: Host-wide XLR call budget
+    print("\n1️⃣3️⃣ Testing host-wide XLR call budget...")
+    try:
+        import tempfile
+        import threading
+        from xlr_classes.xlr_budget import XLRBudget
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Two budget objects on the same directory behave like two processes
+            budgets = [XLRBudget(tmp_dir, max_concurrent_calls=2), XLRBudget(tmp_dir, max_concurrent_calls=2)]
+            in_flight = []
+            peak = []
+            lock = threading.Lock()
+
+            def call(budget):
+                with budget.acquire():
+                    with lock:
+                        in_flight.append(1)
+                        peak.append(len(in_flight))
+                    time.sleep(0.05)
+                    with lock:
+                        in_flight.pop()
+
+            threads = [threading.Thread(target=call, args=(budgets[index % 2],)) for index in range(6)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert max(peak) == 2, peak
+
+            rate_budget = XLRBudget(os.path.join(tmp_dir, 'rate'), max_calls_per_second=20)
+            start = time.time()
+            for _ in range(25):
+                with rate_budget.acquire():
+                    pass
+            assert time.time() - start >= 0.2
+
+        assert XLRBudget.from_settings('https://xlr/api/v1/') is None
+        print("   ✅ Concurrency slots and call rate shared through lock files")
+
+    except Exception as e:
+        print(f"❌ XLR call budget test failed: {e}")
+        return False
+
+    # Test 14: Persistent XLR lookup cache
+    print("\n1️⃣4️⃣ Testing persistent XLR lookup cache...")
+    try:
+        import logging
+        import tempfile
+        from xlr_classes.xlr_client import XLRPlanClient, XLRPlanResponse
+        from xlr_classes.xlr_lookup_cache import XLRLookupCache
+
+        class DeletedTemplateClient(XLRPlanClient):
+            def request(self, method, url, **kwargs):
+                response = super().request(method, url, **kwargs)
+                return XLRPlanResponse(None, 404) if method == 'DELETE' else response
+
+        def generator(store, client_class=XLRPlanClient):
+            base = XLRBase()
+            base.url_api_xlr = 'https://xlr/api/v1/'
+            base.header = {}
+            base.ops_username_api = base.ops_password_api = ''
+            base.logger_cr = base.logger_error = logging.getLogger('test_lookup_cache')
+            base.parameters = {'general_info': {'xlr_folder': 'Applications/Team', 'name_release': 'REL'}}
+            base.xlr_client = client_class()
+            base.xlr_client.lookup_store = store
+            return base
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = XLRLookupCache(os.path.join(tmp_dir, 'lookup.sqlite'))
+            first = generator(store)
+            first.delete_template()
+            first.find_xlr_folder()
+            first.CreateTemplate()
+            assert [call['endpoint'] for call in first.xlr_client.calls] == ['GET templates', 'GET folders/find', 'POST templates']
+
+            second = generator(store)
+            second.delete_template()
+            second.find_xlr_folder()
+            assert [call['endpoint'] for call in second.xlr_client.calls] == ['DELETE templates', 'GET templates']
+
+            # A template of the same title created outside this cache (UI copy, other host) is deleted as well
+            class CopiedTemplateClient(XLRPlanClient):
+                def request(self, method, url, **kwargs):
+                    if method == 'GET' and 'templates?' in url and 'page=0' in url:
+                        return XLRPlanResponse([{'id': 'Applications/Team/Release9', 'title': 'REL'},
+                                                {'id': 'Applications/Team/Release12', 'title': 'REL'}])
+                    return super().request(method, url, **kwargs)
+
+            store.set('https://xlr/api/v1/', 'template', 'REL', ['Applications/Team/Release9'], 60)
+            copied = generator(store, CopiedTemplateClient)
+            copied.delete_template()
+            assert [call['url'] for call in copied.xlr_client.calls if call['method'] == 'DELETE'] == \
+                ['https://xlr/api/v1/templates/Applications/Team/Release9', 'https://xlr/api/v1/templates/Applications/Team/Release12']
+
+            store.set('https://xlr/api/v1/', 'template', 'REL', ['Applications/Team/Release9'], 60)
+            third = generator(store, DeletedTemplateClient)
+            third.delete_template()
+            assert [call['endpoint'] for call in third.xlr_client.calls] == ['DELETE templates', 'GET templates']
+            assert store.get('https://xlr/api/v1/', 'template', 'REL') is None
+
+            store.set('https://xlr/api/v1/', 'folder', 'expired', 'id', -1)
+            assert store.get('https://xlr/api/v1/', 'folder', 'expired') is None
+            store.close()
+        print("   ✅ Folder and template lookups served from SQLite, 404 invalidates")
+
+    except Exception as e:
+        print(f"❌ Lookup cache test failed: {e}")
+        return False
+
+    # Test 15: Template variants cloned from a canonical template
+    print("\n1️⃣5️⃣ Testing template variant cloning...")
+    try:
+        import tempfile
+        import yaml
+        from DYNAMIC_template import run_batch_variants
+        from script_py.xlr_create_template_change.load_yaml_file import load_yaml_file
+        from xlr_classes.xlr_client import XLRPlanClient, XLRPlanResponse
+
+        class TemplateTreeClient(XLRPlanClient):
+            def request(self, method, url, **kwargs):
+                response = super().request(method, url, **kwargs)
+                if method == 'GET' and '/templates/' in url:
+                    return XLRPlanResponse({'phases': [], 'variables': [{'key': 'IUA', 'id': 'VariableIUA'}]})
+                return response
+
+        clients = []
+
+        def client_factory():
+            clients.append(TemplateTreeClient())
+            return clients[-1]
+
+        parameters = load_yaml_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'template.yaml'))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for index, iua in enumerate(['AA01', 'BB02', 'CC03']):
+                parameters['general_info']['name_release'] = 'FAMILY_' + iua
+                parameters['general_info']['iua'] = iua
+                with open(os.path.join(tmp_dir, f'{index}.yaml'), 'w') as file:
+                    yaml.safe_dump(parameters, file)
+            parameters['general_info']['phases'] = ['DEV']
+            parameters['Phases'] = {'DEV': parameters['Phases']['DEV']}
+            parameters['general_info']['name_release'] = 'OTHER_STRUCTURE'
+            with open(os.path.join(tmp_dir, '3.yaml'), 'w') as file:
+                yaml.safe_dump(parameters, file)
+
+            files = sorted(os.path.join(tmp_dir, name) for name in os.listdir(tmp_dir))
+            results = run_batch_variants(files, workers=2, xlr_client_factory=client_factory,
+                                         log_root=os.path.join(tmp_dir, 'log'))
+            assert [result['mode'] for result in results] == ['built', 'cloned', 'cloned', 'built'], results
+            assert all(result['status'] == 'OK' for result in results)
+            assert results[1]['patches'] == 1
+
+            clone_calls = [client.calls for client in clients
+                           if any(call['url'].endswith('/copy') for call in client.calls)]
+            assert len(clone_calls) == 2
+            assert [call['method'] for call in clone_calls[0] if call['method'] in ('POST', 'PUT')] == ['POST', 'PUT']
+        print("   ✅ One build per family, variants copied and patched")
+
+    except Exception as e:
+        print(f"❌ Template variant test failed: {e}")
+        return False
+
+    print("\n1️⃣6️⃣ Testing offline template export and import...")
+    try:
+        import tempfile
+        from DYNAMIC_template import export_template
+        from script_py.xlr_create_template_change.load_configuration import load_configuration
+        from script_py.xlr_create_template_change.load_yaml_file import load_yaml_file
+        from xlr_classes.xlr_client import XLRPlanClient
+        from xlr_classes.xlr_export import XLRTemplateImport, read_template_export
+
+        parameters = load_yaml_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'template.yaml'))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            json_path, xlr_path = export_template(parameters, os.path.join(tmp_dir, 'export'),
+                                                  log_directory=os.path.join(tmp_dir, 'log'))
+            release = read_template_export(xlr_path)
+            assert release == read_template_export(json_path)
+            assert release['title'] == parameters['general_info']['name_release']
+            assert 'scriptUserPassword' not in release
+            assert [phase['title'] for phase in release['phases']][:3] == ['dynamic_release', 'DEV', 'UAT']
+            assert all(phase['id'].startswith(release['id'] + '/Phase') for phase in release['phases'])
+            assert len({variable['id'] for variable in release['variables']}) == len(release['variables'])
+
+            client = XLRPlanClient()
+            TemplateImport = XLRTemplateImport(release, parameters['general_info']['xlr_folder'], load_configuration(),
+                                               xlr_client=client, log_directory=os.path.join(tmp_dir, 'log'),
+                                               use_lookup_cache=False)
+            TemplateImport.import_template()
+            posts = [call for call in client.calls if call['method'] == 'POST']
+            assert len(posts) == 1 and '/templates/import?folderId=' in posts[0]['url']
+        print("   ✅ Template exported to .json/.xlr and imported with one call")
+
+    except Exception as e:
+        print(f"❌ Template export test failed: {e}")
+        return False
+
+    print("\n1️⃣7️⃣ Testing post-build template verification...")
+    try:
+        import copy
+        import tempfile
+        from DYNAMIC_template import compile_template
+        from script_py.xlr_create_template_change.load_yaml_file import load_yaml_file
+        from xlr_classes.xlr_export import build_template_export
+        from xlr_classes.xlr_verify import template_drift
+
+        parameters = load_yaml_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'template.yaml'))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            expected = build_template_export(compile_template(parameters, os.path.join(tmp_dir, 'log')).calls)
+        assert template_drift(expected, copy.deepcopy(expected)) == []
+
+        actual = copy.deepcopy(expected)
+        actual['phases'][1], actual['phases'][2] = actual['phases'][2], actual['phases'][1]
+        actual['variables'].pop()
+        script_task = next(task for phase in actual['phases'] for task in phase['tasks'] if 'script' in task)
+        script_task['script'] += '\n# rewritten'
+        group = next(task for phase in actual['phases'] for task in phase['tasks'] if task.get('tasks'))
+        group['tasks'].pop()
+        kinds = sorted({record['kind'] for record in template_drift(expected, actual)})
+        assert kinds == ['groups', 'phases', 'scripts', 'variables'], kinds
+        print("   ✅ Phase order, group sizes, variables and script hashes compared")
+
+    except Exception as e:
+        print(f"❌ Template verification test failed: {e}")
+        return False
+
+    print("\n1️⃣8️⃣ Testing paged template cleanup and orphan sweep...")
+    try:
+        import logging
+        import tempfile
+        from urllib.parse import urlsplit, parse_qs
+        from xlr_classes.xlr_client import XLRPlanClient, XLRPlanResponse
+        from xlr_classes.xlr_cleanup import XLRTemplateCleanup
+
+        server_templates = [{'id': 'Applications/Team/Release%d' % index, 'title': 'REL_OLD_%d' % index, 'status': 'TEMPLATE'}
+                            for index in range(5)]
+        server_templates += [{'id': 'Applications/Team/Release10', 'title': 'REL', 'status': 'TEMPLATE'},
+                             {'id': 'Applications/Team/Release11', 'title': 'REL_2', 'status': 'TEMPLATE'},
+                             {'id': 'Applications/Other/Release12', 'title': 'REL', 'status': 'TEMPLATE'},
+                             {'id': 'Applications/Team/Release13', 'title': 'MANUAL', 'status': 'TEMPLATE'}]
+
+        class PagedTemplateClient(XLRPlanClient):
+            def request(self, method, url, **kwargs):
+                response = super().request(method, url, **kwargs)
+                query = {key: values[0] for key, values in parse_qs(urlsplit(url).query).items()}
+                if method == 'GET' and 'resultsPerPage' in query:
+                    found = [template for template in server_templates
+                             if query.get('title', '') in template['title'] and
+                             ('/folders/' not in url or template['id'].startswith('Applications/Team/'))]
+                    start = int(query['page']) * int(query['resultsPerPage'])
+                    return XLRPlanResponse(found[start:start + int(query['resultsPerPage'])])
+                return response
+
+        base = XLRBase()
+        base.url_api_xlr = 'https://xlr/api/v1/'
+        base.header = {}
+        base.ops_username_api = base.ops_password_api = ''
+        base.logger_cr = base.logger_error = logging.getLogger('test_cleanup')
+        base.parameters = {'general_info': {'xlr_folder': 'Applications/Team', 'name_release': 'REL'}}
+        base.dict_template = {'template': {'xlr_folder': 'Applications/Team'}}
+        base.xlr_client = PagedTemplateClient()
+        found = list(base.search_templates(title='REL', folder_id='Applications/Team', page_size=2))
+        assert [template['id'] for template in found] == ['Applications/Team/Release10']
+        assert len([call for call in base.xlr_client.calls if call['method'] == 'GET']) == 5
+        base.delete_template()
+        assert [call['url'] for call in base.xlr_client.calls if call['method'] == 'DELETE'] == \
+            ['https://xlr/api/v1/templates/Applications/Team/Release10']
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cleanup = XLRTemplateCleanup({'Applications/Team': {'REL', 'REL_2'}},
+                                         {'url_api_xlr': 'https://xlr/api/v1/', 'ops_username_api': '', 'ops_password_api': ''},
+                                         xlr_client=PagedTemplateClient(), log_directory=os.path.join(tmp_dir, 'log'),
+                                         use_lookup_cache=False)
+            cleanup.xlr_client.lookup_cache[('folder', 'https://xlr/api/v1/folders/find?byPath=Applications/Team')] = 'Applications/Team'
+            orphans = cleanup.sweep(pattern='REL*', apply=True, workers=3)
+            assert sorted(template['title'] for _, template in orphans) == ['REL_OLD_%d' % index for index in range(5)]
+            assert len([call for call in cleanup.xlr_client.calls if call['method'] == 'DELETE']) == 5
+        print("   ✅ Exact folder matches paged, orphans swept with bounded parallelism")
+
+    except Exception as e:
+        print(f"❌ Template cleanup test failed: {e}")
+        return False
+
+    print("\n1️⃣9️⃣ Testing template shadow model...")
+    try:
+        import logging
+        from xlr_classes.xlr_client import XLRPlanClient
+
+        class PhasesInResponseClient(XLRPlanClient):
+            def _answer(self, method, url, endpoint, payload):
+                answer = super()._answer(method, url, endpoint, payload)
+                if endpoint == 'POST templates':
+                    answer['phases'] = [{'id': answer['id'] + '/Phase0', 'title': 'New Phase'}]
+                return answer
+
+        def generator(client):
+            base = XLRBase()
+            base.url_api_xlr = 'https://xlr/api/v1/'
+            base.header = {}
+            base.ops_username_api = base.ops_password_api = ''
+            base.logger_cr = base.logger_error = logging.getLogger('test_shadow')
+            base.parameters = {'general_info': {'xlr_folder': 'Applications/Team', 'name_release': 'REL'}}
+            base.xlr_client = client
+            base.find_xlr_folder()
+            base.CreateTemplate()
+            for phase in ['DEV', 'UAT', 'PRODUCTION']:
+                base.delete_phase_default_in_template()
+                base.add_phase_tasks(phase)
+            return client
+
+        endpoints = [call['endpoint'] for call in generator(XLRPlanClient()).calls]
+        assert endpoints.count('GET phases/search') == 1 and endpoints.count('DELETE phases') == 1, endpoints
+        client = generator(PhasesInResponseClient())
+        endpoints = [call['endpoint'] for call in client.calls]
+        assert 'GET phases/search' not in endpoints and endpoints.count('DELETE phases') == 1, endpoints
+        assert sorted(client.shadow.phases.values()) == ['DEV', 'PRODUCTION', 'UAT']
+        assert XLRPlanClient().shadow.phase_ids('New Phase') is None
+        print("   ✅ Default phase existence answered from the local template shadow")
+
+    except Exception as e:
+        print(f"❌ Template shadow test failed: {e}")
+        return False
+
+    print("\n2️⃣0️⃣ Testing per-phase incremental regeneration...")
+    try:
+        import copy
+        import tempfile
+        from DYNAMIC_template import regenerate_template
+        from script_py.xlr_create_template_change.load_yaml_file import load_yaml_file
+        from xlr_classes.xlr_client import XLRPlanClient, XLRPlanResponse
+        from xlr_classes.xlr_incremental import load_phase_state
+
+        class ExistingTemplateClient(XLRPlanClient):
+            def __init__(self, state):
+                super().__init__()
+                self.state = state
+
+            def request(self, method, url, **kwargs):
+                response = super().request(method, url, **kwargs)
+                if method == 'GET' and url.endswith('/templates/' + self.state['template_id']):
+                    return XLRPlanResponse({
+                        'id': self.state['template_id'],
+                        'phases': [{'id': self.state['template_id'] + '/Phase%d' % index, 'title': title}
+                                   for index, title in enumerate(self.state['phase_order'])],
+                        'variables': [{'id': 'Variable' + key, 'key': key} for key in self.state['variables']]})
+                return response
+
+        parameters = load_yaml_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'template.yaml'))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            log_directory = os.path.join(tmp_dir, 'log')
+            _, _, rebuilt = regenerate_template(copy.deepcopy(parameters), only_changed=True, xlr_client=XLRPlanClient(),
+                                                log_directory=log_directory, clear_screen=False, use_lookup_cache=False)
+            assert rebuilt is None
+            state = load_phase_state(log_directory)
+
+            changed = copy.deepcopy(parameters)
+            for item in changed['Phases']['PRODUCTION']:
+                if 'email_end_release' in item:
+                    item['email_end_release']['destinataire'].append('new.owner@company.com')
+            client = ExistingTemplateClient(state)
+            _, _, rebuilt = regenerate_template(changed, only_changed=True, xlr_client=client,
+                                                log_directory=log_directory, clear_screen=False, use_lookup_cache=False)
+            assert rebuilt == ['PRODUCTION'], rebuilt
+            assert not [call for call in client.calls if call['endpoint'] in ('POST templates', 'DELETE templates', 'POST variables')]
+            deleted = [call['url'].rsplit('/', 1)[1] for call in client.calls if call['method'] == 'DELETE']
+            assert deleted == ['Phase%d' % state['phase_order'].index(title) for title in ('CREATE_CHANGE_PRODUCTION', 'PRODUCTION')]
+            created = [call['payload']['title'] for call in client.calls if call['endpoint'] == 'POST phases']
+            assert created == ['CREATE_CHANGE_PRODUCTION', 'PRODUCTION']
+            assert all('position=' in call['url'] for call in client.calls if call['endpoint'] == 'POST phases')
+
+            client = ExistingTemplateClient(load_phase_state(log_directory))
+            _, _, rebuilt = regenerate_template(changed, phases=['DEV'], only_changed=True, xlr_client=client,
+                                                log_directory=log_directory, clear_screen=False, use_lookup_cache=False)
+            assert rebuilt == ['DEV'], rebuilt
+        print("   ✅ Only the changed phase and its CREATE_CHANGE companion rebuilt in place")
+
+    except Exception as e:
+        print(f"❌ Incremental regeneration test failed: {e}")
+        return False
+
+    print("\n2️⃣1️⃣ Testing merged dynamic_release pruning script...")
+    try:
+        import re
+        import tempfile
+        from DYNAMIC_template import compile_template
+        from script_py.xlr_create_template_change.load_yaml_file import load_yaml_file
+        from xlr_classes import xlr_dynamic_phase
+        from xlr_classes.xlr_dynamic_phase import PRUNING_TASK_TITLE, merge_pruning_sections
+
+        parameters = load_yaml_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'template.yaml'))
+        parameters['general_info']['script_minify'] = False  # keep the section banners
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            calls = compile_template(parameters, os.path.join(tmp_dir, 'log')).calls
+        dynamic_id = next(call['response_id'] for call in calls
+                          if call['endpoint'] == 'POST phases' and call['payload']['title'] == 'dynamic_release')
+        scripts = [call['payload'] for call in calls if call['endpoint'] == 'POST tasks'
+                   and call['url'].endswith(dynamic_id + '/tasks') and call['payload'].get('script')]
+        assert [script['title'] for script in scripts] == [PRUNING_TASK_TITLE], [script['title'] for script in scripts]
+        script = scripts[0]['script']
+        for section in ('DELETE PHASE', 'PACKAGE Variable for the RELEASE', 'XLD VARIABLE : Defnition Value if MULTIBENCH'):
+            assert '## ---- ' + section + '\n' in script
+        assert script.count("releaseVariables['release_Variables_in_progress']") == 2
+        assert script.count('releaseApi.getRelease') == 1 and 'searchTasksByTitle' not in script
+        compile(re.sub(r'\$\{[^}]*\}', '[]', script), PRUNING_TASK_TITLE, 'exec')
+        assert 'template_liste_phase' not in script and "if releaseVariables['env_PRODUCTION'] != '':" in script
+        assert "bench_prefixes = {'MCO': 'Q', 'PRJ': 'B'}" in script
+        assert "split_lists['list_package'] = " + repr(list(parameters['template_liste_package'])) in script
+
+        merged = merge_pruning_sections([('A', "import json\nx = releaseVariables['release_Variables_in_progress']['a']\n"),
+                                         ('B', "import json,sys\ny = ${release_Variables_in_progress}['b']\n")])
+        assert merged.count('import ') == 1 and 'import json,sys\n' in merged
+        assert "x = release_variables_in_progress['a']" in merged and "y = release_variables_in_progress['b']" in merged
+
+        # Lists split once at the top: sets for membership, lists for iteration, written keys untouched
+        merged = merge_pruning_sections([('A', "for p in releaseVariables['release_Variables_in_progress']['l'].split(','):\n"
+                                                "    if p in ${Choice_ENV} and p in releaseVariables['release_Variables_in_progress']['l'].split(','):\n"
+                                                "        release_variables_in_progress['w'] = p\n"
+                                                "ok = 'X' in release_variables_in_progress['w'].split(',')\n")])
+        assert "for p in split_lists['l']:" in merged and "if p in variable_sets['Choice_ENV'] and p in split_sets['l']:" in merged
+        assert "variable_sets = {'Choice_ENV': set(${Choice_ENV})}" in merged and "'X' in release_variables_in_progress['w'].split(',')" in merged
+
+        # Only membership tests become sets: indexing, join, comprehensions and for clauses keep the list
+        merged = merge_pruning_sections([('A', "first = releaseVariables['release_Variables_in_progress']['l'].split(',')[0]\n"
+                                                "text = ','.join(releaseVariables['release_Variables_in_progress']['l'].split(','))\n"
+                                                "kept = [p for p in releaseVariables['release_Variables_in_progress']['l'].split(',') if p in ${Choice_ENV}]\n"
+                                                "for phase in ${Choice_ENV}:\n"
+                                                "    gone = phase not in releaseVariables['release_Variables_in_progress']['l'].split(',')\n")])
+        assert "first = split_lists['l'][0]" in merged and "text = ','.join(split_lists['l'])" in merged
+        assert "kept = [p for p in split_lists['l'] if p in variable_sets['Choice_ENV']]" in merged
+        assert "for phase in ${Choice_ENV}:" in merged and "gone = phase not in split_sets['l']" in merged
+        namespace = {'releaseVariables': {'release_Variables_in_progress': {'l': 'UAT,DEV,PRODUCTION'}}, 'getCurrentRelease': lambda: None,
+                     'releaseApi': type('Api', (), {'getRelease': lambda self, release_id: type('R', (), {'phases': []})()})()}
+        exec(merged.replace('${Choice_ENV}', "['DEV', 'PRODUCTION']").replace('getCurrentRelease().id', 'None'), namespace)
+        assert (namespace['first'], namespace['text'], namespace['kept']) == ('UAT', 'UAT,DEV,PRODUCTION', ['DEV', 'PRODUCTION'])
+
+        # Phases resolved at generation time: one runtime test per phase on the user's choice
+        generator = type('Generator', (), {'parameters': {'general_info': {'phases': ['DEV', 'UAT', 'PRODUCTION']}},
+                                           'url_api_xlr': '', 'dict_template': {'dynamic_release': {'xlr_id_phase': 'Phase1'}}})()
+        sections = []
+        xlr_dynamic_phase.XLRDynamicPhase.XLRJython_delete_phase_one_list(generator, 'dynamic_release', sections)
+        in_progress = {}
+        exec(sections[0][1].replace('${Choice_ENV}', "['UAT']"), {'releaseVariables': {'release_Variables_in_progress': in_progress}})
+        assert in_progress == {'xlr_list_phase': 'UAT', 'xlr_list_phase_selection': 'UAT', 'xlr_list_phase_to_delete': 'PRODUCTION',
+                               'xlr_list_phase_selection_to_delete': 'CREATE_CHANGE_PRODUCTION,PRODUCTION'}, in_progress
+
+        # Deletion pass against a fake release: one getRelease, deletions from the in-memory index
+        class Node:
+            def __init__(self, id, title, tasks=()):
+                self.id, self.title, self.tasks = id, title, list(tasks)
+
+        class Api:
+            def __init__(self):
+                self.calls = []
+
+            def __getattr__(self, name):
+                return lambda *args: self.calls.append((name,) + args) or release
+
+        release = Node('Release1', 'R', [Node('Release1/Phase1', 'DEV', [Node('Release1/Phase1/Task1', 'OLD', [Node('Release1/Phase1/Task1/Task1', 'OLD')])]),
+                                          Node('Release1/Phase2', 'UAT', [Node('Release1/Phase2/Task1', 'OLD')])])
+        release.phases = release.tasks
+        api = Api()
+        merged = merge_pruning_sections([('S', "tasks_to_delete.append('OLD')\n")])
+        exec(merged, {'releaseVariables': {'release_Variables_in_progress': {'xlr_list_phase_selection_to_delete': 'UAT'}},
+                      'getCurrentRelease': lambda: release, 'releaseApi': api, 'phaseApi': api, 'taskApi': api})
+        assert api.calls == [('getRelease', 'Release1'), ('deletePhase', 'Release1/Phase2'), ('delete', 'Release1/Phase1/Task1')], api.calls
+        print("   ✅ One pruning script task, one release fetch, one deletion pass")
+
+    except Exception as e:
+        print(f"❌ Merged pruning script test failed: {e}")
+        return False
+
+    print("\n2️⃣2️⃣ Testing skip mode for deselected package tasks...")
+    try:
+        import tempfile
+        from DYNAMIC_template import compile_template
+        from script_py.xlr_create_template_change.check_yaml_file import validate_parameters
+        from script_py.xlr_create_template_change.load_yaml_file import load_yaml_file
+        from xlr_classes.xlr_dynamic_phase import PRUNING_TASK_TITLE
+        from xlr_classes.xlr_export import build_template_export
+        from xlr_classes import xlr_phase_items, xlr_script_bench
+
+        def groups_and_pruning(parameters):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                calls = compile_template(parameters, os.path.join(tmp_dir, 'log')).calls
+            groups = [call['payload'] for call in calls if call['endpoint'] == 'POST tasks' and 'Group' in call['payload']['type']]
+            pruning = next(call['payload']['script'] for call in calls if call['endpoint'] == 'POST tasks'
+                           and call['payload']['title'] == PRUNING_TASK_TITLE)
+            return groups, pruning
+
+        parameters = load_yaml_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'template.yaml'))
+        parameters['general_info']['script_minify'] = False  # keep the section banners
+        groups, pruning = groups_and_pruning(parameters)
+        assert all(group['precondition'] == '' for group in groups)
+        assert '## ---- XLD Generic Task Cleanup' in pruning
+
+        parameters['general_info']['deselected_task_mode'] = 'skip'
+        assert validate_parameters(parameters) == []
+        groups, pruning = groups_and_pruning(parameters)
+        xld = next(group['precondition'] for group in groups if group['title'] == 'XLD DEPLOY')
+        stop = next(group['precondition'] for group in groups if group['title'] == 'CONTROLM : STOP')
+        selected = "releaseVariables['release_Variables_in_progress']['list_package_manage'].split(',')"
+        assert xld.count('list_package_manage') == 6 and "'DICTIONNAIRE' in " + selected in xld
+        assert stop == " or ".join("'" + package + "' in " + selected
+                                   for package in ('App', 'Scripts', 'SDK', 'Interfaces', 'Interface_external')), stop
+        assert 'Task Cleanup' not in pruning and '## ---- DELETE PHASE' in pruning
+
+        # String mode: App, Scripts and SDK keep the placeholder, the pruning script leaves them out of list_package_manage
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            release = build_template_export(compile_template(parameters, os.path.join(tmp_dir, 'log')).calls)
+        variables = xlr_script_bench.release_variables(release, parameters)
+        for package in ('App', 'Scripts', 'SDK'):
+            variables[package + '_version'] = variables['release_Variables_in_progress']['package_title_choice']
+        result = xlr_script_bench.run_script(pruning, variables, xlr_script_bench.FakeNode(release, children='phases'))
+        assert result['status'] == 'OK', result['status']
+        environment = {'releaseVariables': variables}
+        assert eval(stop, environment) is True
+
+        # The STOP group still runs for Interfaces, the folder of App, Scripts and SDK is skipped inside it
+        bench_stop = next(task for phase in release['phases'] if phase['title'] == 'BENCH'
+                          for task in phase['tasks'] if task['title'] == 'CONTROLM : STOP')
+        folders = {folder['title']: eval(folder['precondition'], environment) for folder in bench_stop['tasks']}
+        assert folders == {'BDCP_OSTOP_${controlm_prefix_BENCH}APPCODE_XLR': False,
+                           'BDCP_OSTOP_${controlm_prefix_BENCH}APPCODE_INTRADAYS_XLR': True,
+                           'BDCP_OSTOP_${controlm_prefix_BENCH}APPCODE_EXTERNAL_XLR': True}, folders
+
+        # Listbox mode keeps the <package>_version test
+        parameters['general_info']['template_package_mode'] = 'listbox'
+        groups, _ = groups_and_pruning(parameters)
+        stop = next(group['precondition'] for group in groups if group['title'] == 'CONTROLM : STOP')
+        assert stop == " or ".join("releaseVariables['" + package + "_version'] != ''"
+                                   for package in ('App', 'Scripts', 'SDK', 'Interfaces', 'Interface_external')), stop
+        assert eval(stop, {'releaseVariables': dict.fromkeys(['App_version', 'Scripts_version', 'SDK_version', 'Interfaces_version',
+                                                              'Interface_external_version'], '')}) is False
+
+        # A single package has no selection (no <package>_version in a listbox DEV-only template): always run
+        single = type('Generator', (), {'parameters': {'general_info': {'template_package_mode': 'listbox', 'deselected_task_mode': 'skip',
+                                                                        'phases': ['DEV']},
+                                                       'template_liste_package': {'App': {}}}})()
+        assert xlr_phase_items.package_precondition(single, ['App']) == ''
+        print("   ✅ XLD and Control-M groups and folders skipped by precondition, no runtime deletion")
+
+    except Exception as e:
+        print(f"❌ Skip mode test failed: {e}")
+        return False
+
+    print("\n2️⃣3️⃣ Testing the release-start script benchmark...")
+    try:
+        from DYNAMIC_template import bench_scripts
+        from xlr_classes import xlr_script_bench
+        from script_py.xlr_create_template_change.load_yaml_file import load_yaml_file
+
+        release = {'id': 'Release', 'title': 'R', 'variables': [{'key': 'to_delete', 'value': ['T1']}],
+                   'phases': [{'id': 'Release/Phase1', 'title': 'P1', 'tasks': [
+                       {'id': 'Release/Phase1/Task1', 'title': 'T1', 'type': 'xlrelease.CustomScriptTask'},
+                       {'id': 'Release/Phase1/Task2', 'title': 'S', 'type': 'xlrelease.ScriptTask',
+                        'script': "for title in ${to_delete}:\n"
+                                  "    for task in taskApi.searchTasksByTitle(title, 'P1', getCurrentRelease().id):\n"
+                                  "        taskApi.delete(task.id)\n"
+                                  "releaseVariables['done'] = title.encode('utf-8')\n"}]}]}
+        parameters = {'general_info': {'phases': ['P1']}, 'template_liste_package': {}}
+        results = xlr_script_bench.bench_release(release, parameters, latency=0.5)
+        assert len(results) == 1 and results[0]['status'] == 'OK', results
+        assert dict(results[0]['calls']) == {'taskApi.searchTasksByTitle': 1, 'taskApi.delete': 1}
+        assert results[0]['simulated_seconds'] == 1.0
+        failing = xlr_script_bench.run_script("  x = 1\n", {}, xlr_script_bench.FakeNode(release, children='phases'))
+        assert failing['status'].startswith('IndentationError')
+
+        synthetic = xlr_script_bench.synthetic_parameters({'general_info': {'name_release': 'R', 'phases': ['DEV']},
+                                                           'template_liste_package': {'A': {'mode': 'CHECK_XLD'}}}, 3, 4)
+        assert list(synthetic['template_liste_package']) == ['PKG01', 'PKG02', 'PKG03']
+        assert [list(item)[0] for item in synthetic['Phases']['BENCH']] == ['XLR_task_controlm'] + ['seq_xldeploy'] * 3 + ['XLR_task_controlm']
+        assert len(synthetic['Phases']['DEV']) == 3
+
+        base = load_yaml_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'template.yaml'))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            results = bench_scripts(base, None, os.path.join(tmp_dir, 'log'))[0][1]
+            benches = bench_scripts(base, [(4, 4), (12, 4)], os.path.join(tmp_dir, 'log'))
+        assert results and all(result['status'] == 'OK' for result in results), [(result['title'], result['status']) for result in results]
+        assert [label for label, _ in benches] == ['4x4', '12x4']
+        for label, results in benches:
+            assert all(result['status'] == 'OK' for result in results), [(result['title'], result['status']) for result in results]
+            pruning = next(result for result in results if result['title'] == PRUNING_TASK_TITLE)
+            assert pruning['calls']['releaseApi.getRelease'] == 1, pruning['calls']
+        assert xlr_script_bench.format_bench(benches[0][1], '4x4')[-1].startswith('  TOTAL : ')
+        print("   ✅ Scripts run against counting fake APIs, synthetic templates scale packages and phases")
+
+    except Exception as e:
+        print(f"❌ Script benchmark test failed: {e}")
+        return False
+
+    print("\n2️⃣4️⃣ Testing the script stage (minification and byte budget)...")
+    try:
+        from xlr_classes import xlr_script_stage
+
+        script = """
+        ##script_banner
+        # -*- comment only -*-
+        import json
+        text = '# not a comment'   # trailing comment
+        for item in ${list_items}:
+
+            print(item)
+        import json
+        doc = \"\"\"
+        # kept inside a string
+
+        \"\"\"
+        """
+        minified = xlr_script_stage.minify_script(script)
+        assert minified == ("import json\ntext = '# not a comment'\nfor item in ${list_items}:\n    print(item)\n"
+                            "doc = \"\"\"\n# kept inside a string\n\n\"\"\"\n"), minified
+        compile(minified.replace('${list_items}', '[]'), 'minified', 'exec')
+
+        stage = xlr_script_stage.XLRScriptStage(budget=100)
+        helper = "def delete_task(title):\n    taskApi.delete(title)\n"
+        for title in ('A', 'B'):
+            payload = {'type': 'xlrelease.ScriptTask', 'title': title, 'script': "# helper\n" + helper + "delete_task('x')\n"}
+            assert stage.prepare(payload)['script'] == helper + "delete_task('x')\n"
+        assert stage.prepare({'type': 'xlrelease.GateTask', 'title': 'G'}) == {'type': 'xlrelease.GateTask', 'title': 'G'}
+        report = stage.report()
+        assert report['scripts'] == 2 and report['raw_bytes'] > report['script_bytes'] > report['budget'] and report['over_budget']
+        assert report['duplicated_helpers'] == {'delete_task': ['A', 'B']}
+        assert xlr_script_stage.format_script_report(report)[1] == "  HELPER delete_task DEFINED IN 2 SCRIPTS : A, B"
+
+        parameters = load_yaml_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'template.yaml'))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            plan_client = compile_template(parameters, os.path.join(tmp_dir, 'log'))
+        scripts = [call['payload']['script'] for call in plan_client.calls if (call['payload'] or {}).get('type') == 'xlrelease.ScriptTask']
+        assert scripts and not any(line.lstrip().startswith('#') for script in scripts for line in script.split('\n'))
+        report = plan_client.script_stage.report()
+        assert report['script_bytes'] == sum(len(script) for script in scripts) < report['raw_bytes']
+        print("   ✅ Scripts dedented and stripped, bytes reported against the budget")
+
+    except Exception as e:
+        print(f"❌ Script stage test failed: {e}")
+        return False
+
+    print("\n2️⃣5️⃣ Testing dependency-aware ParallelGroups...")
+    try:
+        from xlr_classes import xlr_phase_items
+
+        class LaneOps:
+            def __init__(self, parameters):
+                self.parameters = parameters
+                self.xlr_group_lanes = {}
+                self.groups = []
+
+            def XLR_group_task(self, ID_XLR_task, type_group, title_group, precondition):
+                self.groups.append((ID_XLR_task, type_group, title_group))
+                return 'Group' + str(len(self.groups))
+
+        packages = {'App': {'controlm_mode': 'master', 'auto_undeploy': False},
+                    'Scripts': {'controlm_mode': 'master', 'auto_undeploy': False},
+                    'SDK': {'controlm_mode': 'Independant', 'auto_undeploy': ['Batch']},
+                    'Batch': {'controlm_mode': 'Independant', 'auto_undeploy': False},
+                    'Interfaces': {'controlm_mode': 'Independant', 'auto_undeploy': False}}
+        ops = LaneOps({'general_info': {'parallel_groups': True}, 'template_liste_package': packages})
+        units = [(package, [package]) for package in ('Interfaces', 'App', 'Batch', 'Scripts', 'SDK')]
+        assert xlr_phase_items.dependency_lanes(ops, units) == [['Interfaces'], ['App', 'Scripts'], ['Batch', 'SDK']]
+        assert xlr_phase_items.dependency_lanes(ops, [('F1', ['Interfaces']), ('F2', []), ('F3', ['SDK'])]) == [['F1', 'F2', 'F3']]
+
+        group_id = xlr_phase_items.create_lane_group(ops, 'Phase1', 'XLD DEPLOY', units, '')
+        assert ops.groups == [('Phase1', 'ParallelGroup', 'XLD DEPLOY')]
+        assert xlr_phase_items.lane_parent(ops, group_id, 'Interfaces') == group_id
+        lane = xlr_phase_items.lane_parent(ops, group_id, 'Scripts')
+        assert xlr_phase_items.lane_parent(ops, group_id, 'App') == lane != group_id
+        assert ops.groups[-1] == (group_id, 'SequentialGroup', 'XLD DEPLOY : App, Scripts') and len(ops.groups) == 2
+
+        ops.parameters['general_info']['parallel_groups'] = False
+        group_id = xlr_phase_items.create_lane_group(ops, 'Phase1', 'XLD DEPLOY', units, '')
+        assert ops.groups[-1][1] == 'SequentialGroup' and xlr_phase_items.lane_parent(ops, group_id, 'App') == group_id
+
+        parameters = load_yaml_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'template.yaml'))
+        parameters['general_info']['parallel_groups'] = True
+        assert validate_parameters(parameters) == []
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            calls = compile_template(parameters, os.path.join(tmp_dir, 'log')).calls
+        group_types = {(call['section'], call['payload']['title']): call['payload']['type'] for call in calls
+                       if call['endpoint'] == 'POST tasks' and 'Group' in call['payload']['type']}
+        assert group_types[('PRODUCTION', 'CONTROLM : STOP')] == 'xlrelease.ParallelGroup'
+        assert group_types[('DEV', 'XLD DEPLOY')] == 'xlrelease.ParallelGroup'
+        assert group_types[('PRODUCTION', 'Action OPS 1 before XLD')] == 'xlrelease.SequentialGroup'
+        print("   ✅ Independent packages and folders in ParallelGroups, dependent ones in sequence")
+
+    except Exception as e:
+        print(f"❌ ParallelGroup test failed: {e}")
+        return False
+
+    print("\n2️⃣6️⃣ Testing the critical-path and duration estimator...")
+    try:
+        from xlr_classes import xlr_critical_path
+
+        def gate(title):
+            return {'type': 'xlrelease.GateTask', 'title': title}
+
+        release = {'title': 'R', 'phases': [
+            {'title': 'P1', 'tasks': [
+                {'type': 'xlrelease.ParallelGroup', 'title': 'PAR', 'tasks': [gate('XLD A'), gate('XLD B')]},
+                {'type': 'xlrelease.SequentialGroup', 'title': 'SEQ', 'tasks': [gate('STOP 1'), gate('STOP 2'), gate('STOP 3')]},
+                {'type': 'xlrelease.SequentialGroup', 'title': 'EMPTY'}]},
+            {'title': 'P2', 'tasks': [{'type': 'xlrelease.CustomScriptTask', 'title': 'Mail',
+                                       'pythonScript': {'type': 'nxs.Mail'}}]}]}
+        history = xlr_critical_path.XLRDurationHistory(default_seconds=5)
+        history.add_releases({'releases': [{'phases': [{'tasks': [
+            {'type': 'xlrelease.GateTask', 'title': 'XLD B', 'startDate': '2024-05-01T10:00:00.000+0200', 'endDate': '2024-05-01T10:10:00.000+0200'},
+            {'type': 'xlrelease.GateTask', 'title': 'XLD B', 'startDate': '2024-05-02T10:00:00Z', 'endDate': '2024-05-02T10:20:00Z'},
+            {'type': 'xlrelease.GateTask', 'title': 'Other', 'startDate': '2024-05-02T10:00:00Z'}]}]}]})
+        history.add_csv_rows([{'type': '*', 'title': 'STOP *', 'seconds': '120'}])
+
+        assert history.estimate(gate('XLD B')) == (900.0, 'title')
+        assert history.estimate(gate('STOP 9')) == (120.0, 'pattern')
+        assert history.estimate(gate('XLD A')) == (900.0, 'type')
+        assert history.estimate({'type': 'xlrelease.CustomScriptTask', 'title': 'Mail', 'pythonScript': {'type': 'nxs.Mail'}}) == (5, 'default')
+
+        result = xlr_critical_path.critical_path(release, history)
+        assert result['total_seconds'] == 900 + 360 + 5 and result['phases'] == [('P1', 1260.0), ('P2', 5)]
+        assert [leaf[0] for leaf in result['path']] == ['P1 / PAR / XLD A', 'P1 / SEQ / STOP 1', 'P1 / SEQ / STOP 2',
+                                                        'P1 / SEQ / STOP 3', 'P2 / Mail']
+        assert [(group['location'], group['tasks']) for group in result['groups']] == [('P1 / SEQ', 3)]
+        lines = xlr_critical_path.format_critical_path(result, 'R')
+        assert lines[0] == "CRITICAL PATH for R : 0h21m05s expected (1 by default, 3 by pattern, 1 by title, 1 by type)", lines[0]
+        assert lines[-1] == "    0h06m00s (28%)  P1 / SEQ : 3 tasks in sequence", lines[-1]
+        print("   ✅ Durations matched by title, pattern and type; parallel lanes folded to their longest task")
+
+    except Exception as e:
+        print(f"❌ Critical path test failed: {e}")
+        return False
+
+    print("\n2️⃣7️⃣ Testing the consolidated XLD version lookup...")
+    try:
+        import io
+        import json
+        import types
+        from xlr_classes import xlr_script_bench
+        from xlr_classes.xlr_export import build_template_export
+
+        def lookup_tasks(mode):
+            parameters = load_yaml_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'template.yaml'))
+            parameters['template_liste_package']['App']['auto_undeploy'] = True
+            if mode is not None:
+                parameters['general_info']['xld_version_lookup'] = mode
+            assert validate_parameters(parameters) == []
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                calls = compile_template(parameters, os.path.join(tmp_dir, 'log')).calls
+            variables = [call['payload']['key'] for call in calls if call['endpoint'] == 'POST variables'
+                         and call['payload']['key'].startswith('version_deployed_')]
+            tasks = [(call['section'], call['payload']) for call in calls if call['endpoint'] == 'POST tasks'
+                     and ('version' in call['payload']['title'].lower())]
+            return variables, tasks, parameters, build_template_export(calls)
+
+        variables, tasks, _, _ = lookup_tasks(None)
+        assert variables == [] and tasks == []
+
+        variables, tasks, _, _ = lookup_tasks('per_package')
+        expected = ['version_deployed_' + package + '_' + phase + '_BEFORE'
+                    for phase in ('DEV', 'UAT', 'BENCH', 'PRODUCTION') for package in ('App', 'SDK')]
+        assert variables == expected, variables
+        dev = [payload for section, payload in tasks if section == 'DEV']
+        assert [payload['type'] for payload in dev] == ['xlrelease.ParallelGroup'] + ['xlrelease.CustomScriptTask'] * 2
+        assert dev[1]['variableMapping'] == {'pythonScript.applicationId': '${version_deployed_App_DEV_BEFORE}'}
+        assert dev[1]['pythonScript']['environmentId'].endswith('/${env_DEV}/APP/DAPPCODE_APP_${env_DEV}_ENV')
+
+        variables, tasks, parameters, release = lookup_tasks('consolidated')
+        assert variables == expected
+        assert [(section, payload['type']) for section, payload in tasks] == [
+            (phase, 'xlrelease.ScriptTask') for phase in ('DEV', 'UAT', 'BENCH', 'PRODUCTION')]
+        script = tasks[2][1]['script']
+        assert "'_BENCH_BEFORE'" in script and script.count('opener.open') == 1
+        assert "${controlm_prefix_BENCH}APPCODE_SDK_${env_BENCH}_ENV" in script
+
+        # Run the BENCH script under the bench harness, XLD answered by a fake urllib2
+        class URLError(Exception):
+            pass
+
+        class Request:
+            def __init__(self, url, data=None, headers=None):
+                self.url, self.data = url, data
+
+        class Opener:
+            def open(self, request):
+                assert request.url == 'http://xld:4516/deployit/repository/cis/read'
+                ci_ids = json.loads(request.data)
+                assert all(ci_id.startswith('Environments/') and '${' not in ci_id for ci_id in ci_ids), ci_ids
+                reads.append(len(ci_ids))
+                names = [ci_id.rsplit('/', 1)[1] for ci_id in ci_ids]
+                if any(name not in answers for name in names):
+                    raise URLError(request.url)
+                return io.StringIO(json.dumps([dict(answers[name], id=ci_id) for name, ci_id in zip(names, ci_ids)]))
+
+        class Server:
+            def getProperty(self, name):
+                return 'http://xld:4516/'
+
+        class ConfigurationApi:
+            def getConfiguration(self, name):
+                return Server()
+
+        credentials = []
+        urllib2 = types.ModuleType('urllib2')
+        urllib2.URLError, urllib2.HTTPError, urllib2.Request = URLError, type('HTTPError', (URLError,), {}), Request
+        urllib2.HTTPPasswordMgrWithDefaultRealm = lambda: types.SimpleNamespace(add_password=lambda *args: credentials.append(args))
+        urllib2.HTTPBasicAuthHandler = lambda manager: manager
+        urllib2.build_opener = lambda handler: Opener()
+
+        fake_release = xlr_script_bench.FakeNode(release, children='phases')
+        fake_release.passwordVariableValues['${BENCH_password_xldeploy}'] = 'secret'
+        release_variables = xlr_script_bench.release_variables(release, parameters)
+        release_variables['BENCH_username_xldeploy'] = 'deployer'
+        # One read for every package; one read per package when XLD fails it on an absent one
+        app_deployed = {'version': 'App/1.2.0'}
+        for answers, expected_reads, versions in (
+                ({}, [2, 1, 1], ('Not Deploy', 'Not Deploy')),
+                ({'APPCODE_APP_APPLICATION_76': {}}, [2, 1, 1], ('Not Deploy', 'Not Deploy')),
+                ({'APPCODE_APP_APPLICATION_76': app_deployed}, [2, 1, 1], ('App/1.2.0', 'Not Deploy')),
+                ({'APPCODE_APP_APPLICATION_76': app_deployed, 'APPCODE_SDK_APPLICATION': {'version': 'SDK/3.0'}},
+                 [2], ('App/1.2.0', 'SDK/3.0'))):
+            reads = []
+            result = xlr_script_bench.run_script(script, release_variables, fake_release,
+                                                 extra_globals={'configurationApi': ConfigurationApi()},
+                                                 modules={'urllib2': urllib2})
+            assert result['status'] == 'OK', result['status']
+            assert reads == expected_reads, reads
+            assert (release_variables['version_deployed_App_BENCH_BEFORE'],
+                    release_variables['version_deployed_SDK_BENCH_BEFORE']) == versions
+        assert credentials[-1][2:] == ('deployer', 'secret'), credentials
+
+        # option_latest: CREATE_CHANGE_<phase> reads every XLD package of the phase, credentials asked once
+        parameters['general_info']['option_latest'] = True
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            calls = compile_template(parameters, os.path.join(tmp_dir, 'log')).calls
+        change = [(call['section'], call['payload']['title']) for call in calls if call['endpoint'] == 'POST tasks'
+                  and call['section'] in ('CREATE_CHANGE_BENCH', 'BENCH')
+                  and ('XLD' in call['payload']['title'] or 'xldeploy' in call['payload']['title'])]
+        assert change[:2] == [('CREATE_CHANGE_BENCH', 'Please enter user password for xldeploy on BENCH'),
+                              ('CREATE_CHANGE_BENCH', 'Check Version package in XLD CHANGE')], change
+        assert ('BENCH', 'Check Version package in XLD BEFORE') in change
+        assert sum(title.startswith('Please enter user password') for _, title in change) == 1
+        keys = [call['payload']['key'] for call in calls if call['endpoint'] == 'POST variables']
+        assert 'version_deployed_App_BENCH_CHANGE' in keys and 'version_deployed_SDK_PRODUCTION_CHANGE' in keys
+        print("   ✅ One version lookup script per phase, one XLD read for all its packages, also in CREATE_CHANGE with option_latest")
+
+    except Exception as e:
+        print(f"❌ XLD version lookup test failed: {e}")
+        return False
+
+    print("\n2️⃣8️⃣ Testing the SUN technical task groups...")
+    try:
+        def sun_groups(parameters):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                calls = compile_template(parameters, os.path.join(tmp_dir, 'log')).calls
+            return [(call['section'], call['payload']['title']) for call in calls if call['endpoint'] == 'POST tasks'
+                    and call['payload']['title'].startswith('SUN Technical Tasks: ')]
+
+        parameters = load_yaml_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'template.yaml'))
+        categories = ['before_deployment', 'before_xldeploy', 'after_xldeploy', 'after_deployment']
+        assert sun_groups(parameters) == [('CREATE_CHANGE_' + phase, 'SUN Technical Tasks: ' + category)
+                                          for phase in ('BENCH', 'PRODUCTION') for category in categories]
+
+        # One group per (phase, category), none for a category without task
+        del parameters['technical_task_list']['after_deployment']
+        assert sun_groups(parameters) == [('CREATE_CHANGE_' + phase, 'SUN Technical Tasks: ' + category)
+                                          for phase in ('BENCH', 'PRODUCTION') for category in categories[:3]]
+        print("   ✅ One SUN technical task group per phase and category with tasks")
+
+    except Exception as e:
+        print(f"❌ SUN technical task group test failed: {e}")
+        return False
+
     print("\n" + "=" * 60)
     print("🎉 ALL V4 TESTS PASSED SUCCESSFULLY!")
     print("✅ V4 Enhanced Logging version is fully functional")
@@ -11,6 +11,14 @@ Classes:
     XLRDynamicPhase: Dynamic phase management (inherits from XLRBase)
     XLRSun: ServiceNow workflows (inherits from XLRBase)
     XLRTaskScript: Script generation (inherits from XLRBase)
+    XLRPhaseItemRegistry: Registry of YAML phase item kinds and their handlers
+    XLRClient: HTTP client used for every XLR API call
+    XLRPlanClient: Dry-run client recording calls for --plan
+    XLRBudget: Host-wide concurrency/rate budget of XLR calls
+    XLRLookupCache: Persistent cache of XLR folder/template lookups
+    XLRVariants: Template variants copied from a canonical template (inherits from XLRBase)
+    XLRTemplateImport: One-call import of an offline template export (inherits from XLRBase)
+    XLRTemplateCleanup: Sweep of orphan templates in XLR folders (inherits from XLRBase)
 
 Architecture Benefits:
 - No circular dependencies
@@ -29,6 +37,13 @@ from .xlr_controlm import XLRControlm
 from .xlr_dynamic_phase import XLRDynamicPhase
 from .xlr_sun import XLRSun
 from .xlr_task_script import XLRTaskScript
+from .xlr_phase_items import XLRPhaseItemHandler, XLRPhaseItemRegistry, XLRPhaseContext, PHASE_ITEM_REGISTRY, register_phase_item
+from .xlr_client import XLRClient, XLRPlanClient
+from .xlr_budget import XLRBudget
+from .xlr_lookup_cache import XLRLookupCache
+from .xlr_variants import XLRVariants
+from .xlr_export import XLRTemplateImport
+from .xlr_cleanup import XLRTemplateCleanup
 
 __all__ = [
     'XLRBase',
@@ -36,7 +51,19 @@ __all__ = [
     'XLRControlm',
     'XLRDynamicPhase',
     'XLRSun',
-    'XLRTaskScript'
+    'XLRTaskScript',
+    'XLRPhaseItemHandler',
+    'XLRPhaseItemRegistry',
+    'XLRPhaseContext',
+    'PHASE_ITEM_REGISTRY',
+    'register_phase_item',
+    'XLRClient',
+    'XLRPlanClient',
+    'XLRBudget',
+    'XLRLookupCache',
+    'XLRVariants',
+    'XLRTemplateImport',
+    'XLRTemplateCleanup'
 ]
 
 __version__ = '3.0.0-clean-architecture'
@@ -7,9 +7,27 @@ shared across all specialized classes.
 
 import os, sys, requests, urllib3, inspect
 import urllib3
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
 from .xlr_logger import XLRLogger
+from .xlr_client import XLRClient
+from .xlr_script_stage import XLRScriptStage
+from .xlr_budget import XLRBudget
+from .xlr_lookup_cache import XLRLookupCache, FOLDER_TTL, TEMPLATE_TTL
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Templates per page of the XLR template searches
+TEMPLATE_PAGE_SIZE = 100
+
+# Concurrent DELETE calls when several templates are removed
+CLEANUP_WORKERS = 4
+
+# XLD server configuration used by the version lookups
+XLD_SERVER = 'Configuration/Custom/XLDeploy PFI PROD'
+
+# Environment directory and prefix of the XLD environment path per phase
+XLD_PHASE_ENVIRONMENT = {'DEV': ('DEV', 'D'), 'UAT': ('UAT', 'U'), 'BENCH': ('BCH', 'B'), 'PRODUCTION': ('PRD', 'P')}
+
 class XLRBase:
     """
     Base class providing core XLR functionality for all specialized classes - V4 Enhanced Logging.
@@ -22,6 +40,7 @@ class XLRBase:
     - Phase and task management
     - Enhanced logging and error handling with performance tracking
     - Folder operations
+    - XLD user inputs and deployed version lookups
 
     V4 Enhancements:
     - Structured logging with JSON output for monitoring
@@ -42,6 +61,7 @@ class XLRBase:
         parameters (dict): YAML configuration parameters
         dict_template (dict): Template metadata and IDs
         enhanced_logger (XLRLogger): Enhanced logging system
+        xlr_client (XLRClient): HTTP client used for every XLR API call
         logger_cr: Creation report logger (backward compatibility)
         logger_detail: Detailed information logger (backward compatibility)
         logger_error: Error logger (backward compatibility)
@@ -57,14 +77,34 @@ class XLRBase:
         self.logger_detail = None
         self.logger_error = None
 
-    def setup_enhanced_logging(self, release_name: str):
+        # Completion tracking for technical tasks and XLR groups (shared by delegates)
+        self.technical_task_done = set()
+        self.technical_sun_task_done = set()
+        self.xlr_group_task_done = set()
+        # Lanes of the ParallelGroups (group id -> lanes), see dependency_lanes
+        self.xlr_group_lanes = {}
+
+        # Technical tasks indexed by (phase, category), see build_technical_task_index
+        self.technical_task_index = {}
+
+        # XLR API client (pooled session, replaced by XLRPlanClient for --plan)
+        self.xlr_client = XLRClient()
+
+        # True when the folder id comes from a lookup cache (re-checked on 404)
+        self.folder_id_from_cache = False
+
+        # Phase title -> index, for phases recreated in place in an existing template
+        self.phase_positions = {}
+
+    def setup_enhanced_logging(self, release_name: str, log_directory: str = None):
         """
         Set up enhanced logging system for this instance.
 
         Args:
             release_name: Name of the release for log organization
+            log_directory: Custom log directory (defaults to log/<release_name>)
         """
-        self.enhanced_logger = XLRLogger(release_name)
+        self.enhanced_logger = XLRLogger(release_name, log_directory)
 
         # Set up backward compatibility
         self.logger_cr = self.enhanced_logger.logger_cr
@@ -74,9 +114,39 @@ class XLRBase:
         # Add context about the class
         self.enhanced_logger.add_context(
             class_name=self.__class__.__name__,
-            module='xlr_base'
+            source_module='xlr_base'
         )
 
+    def setup_xlr_client(self, xlr_client=None, use_lookup_cache=True):
+        """
+        Set up the XLR API client of this instance.
+
+        Args:
+            xlr_client (XLRClient): Client to use (shared pool in --batch), a new one if None
+            use_lookup_cache (bool): Attach the persistent folder/template lookup cache
+
+        The client reports api_call latencies to this release log and gets the
+        host-wide call budget configured for url_api_xlr and the script stage of
+        this template. Dry-run clients never get the persistent lookup cache.
+        """
+        self.xlr_client = xlr_client or XLRClient()
+        if self.xlr_client.enhanced_logger is None:
+            self.xlr_client.enhanced_logger = self.enhanced_logger
+
+        # Host-wide XLR call budget shared by all generator processes
+        if self.xlr_client.budget is None:
+            self.xlr_client.budget = XLRBudget.from_settings(getattr(self, 'url_api_xlr', ''),
+                                                             getattr(self, 'xlr_max_concurrent_calls', None),
+                                                             getattr(self, 'xlr_max_calls_per_second', None))
+
+        # Minification and size accounting of the Jython scripts of this template
+        if self.xlr_client.script_stage is None:
+            self.xlr_client.script_stage = XLRScriptStage.from_parameters(getattr(self, 'parameters', None))
+
+        # Persistent folder/template lookups (never filled by dry runs)
+        if use_lookup_cache and not self.xlr_client.dry_run and self.xlr_client.lookup_store is None:
+            self.xlr_client.lookup_store = XLRLookupCache.default()
+
     def template_create_variable(self, key, typev, label, description, value, requiresValue, showOnReleaseStart, multiline):
         """
         Create a variable in the XLR template with enhanced logging.
@@ -98,6 +168,10 @@ class XLRBase:
         - Approval workflow data
         - Runtime customization
         """
+        if key in self.xlr_client.shadow.existing_variables:
+            # Phase rebuilt in an existing template: the variable is kept (updated if it changed)
+            return
+
         if self.enhanced_logger:
             self.enhanced_logger.start_timer(f"create_variable_{key}")
             self.enhanced_logger.increment_counter('variable_operations')
@@ -105,10 +179,7 @@ class XLRBase:
         url_create_template_variable = self.url_api_xlr + "templates/" + self.dict_template['template']['xlr_id'] + "/variables"
 
         try:
-            if self.enhanced_logger:
-                self.enhanced_logger.increment_counter('api_calls')
-
-            response_create_template_variable = requests.post(url_create_template_variable, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response_create_template_variable = self.xlr_client.post(url_create_template_variable, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": "null",
                 "key": key,
                 "type": typev,
@@ -180,10 +251,7 @@ class XLRBase:
         url_createtemplate = self.url_api_xlr + "templates/?folderId=" + self.dict_template['template']['xlr_folder']
 
         try:
-            if self.enhanced_logger:
-                self.enhanced_logger.increment_counter('api_calls')
-
-            response_createtemplate = requests.post(url_createtemplate, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response_createtemplate = self.xlr_client.post(url_createtemplate, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": None,
                 "type": "xlrelease.Release",
                 "title": template_name,
@@ -192,51 +260,57 @@ class XLRBase:
                 "scriptUsername": self.ops_username_api,
                 "scriptUserPassword": self.ops_password_api
             }, verify=False)
+            if response_createtemplate.status_code == 404 and self.folder_id_from_cache:
+                # The cached folder id no longer exists in XLR: look the folder up again
+                self.invalidate_folder_lookup()
+                self.find_xlr_folder()
+                return self.CreateTemplate()
             response_createtemplate.raise_for_status()
 
-            if 'template' not in self.dict_template:
-                try:
-                    self.XLR_template_id = response_createtemplate.json()['id']
-                    self.dict_template.update({'template': {'xlr_id': response_createtemplate.json()['id']}})
-
-                    # Same messages as original for compatibility
-                    folder_msg = "CREATE TEMPLATE in XLR FOLDER : " + self.parameters['general_info']['xlr_folder']
-                    template_msg = template_name
-
-                    if self.enhanced_logger:
-                        self.enhanced_logger.info(folder_msg,
-                                                operation='create_template',
-                                                template_name=template_name,
-                                                template_id=self.XLR_template_id,
-                                                folder=self.parameters['general_info']['xlr_folder'])
-                        self.enhanced_logger.info(template_msg)
-                        self.enhanced_logger.end_timer('create_template', f"Template {template_name} created successfully")
-                    else:
-                        self.logger_cr.info(folder_msg)
-                        self.logger_cr.info(template_msg)
-
-                    # Generate template URL (generalized from original)
-                    if hasattr(self, 'url_api_xlr'):
-                        base_url = self.url_api_xlr.replace('/api/v1/', '')
-                        self.template_url = base_url + '/#/templates/' + self.XLR_template_id.replace("Applications/", "").replace('/', '-')
-                    else:
-                        self.template_url = 'Template created with ID: ' + self.XLR_template_id
-
-                except (TypeError, Exception) as e:
-                    error_context = {
-                        'error_type': 'template_creation_failed',
-                        'operation': 'create_template',
-                        'template_name': template_name
-                    }
+            try:
+                self.XLR_template_id = response_createtemplate.json()['id']
+                # find_xlr_folder already stored the folder id in dict_template['template']
+                self.dict_template.setdefault('template', {}).update({'xlr_id': self.XLR_template_id})
+                self.lookup_store_set('template', template_name, [self.XLR_template_id], TEMPLATE_TTL)
+
+                # Same messages as original for compatibility
+                folder_msg = "CREATE TEMPLATE in XLR FOLDER : " + self.parameters['general_info']['xlr_folder']
+                template_msg = template_name
+
+                if self.enhanced_logger:
+                    self.enhanced_logger.info(folder_msg,
+                                            operation='create_template',
+                                            template_name=template_name,
+                                            template_id=self.XLR_template_id,
+                                            folder=self.parameters['general_info']['xlr_folder'])
+                    self.enhanced_logger.info(template_msg)
+                    self.enhanced_logger.end_timer('create_template', f"Template {template_name} created successfully")
+                else:
+                    self.logger_cr.info(folder_msg)
+                    self.logger_cr.info(template_msg)
+
+                # Generate template URL (generalized from original)
+                if hasattr(self, 'url_api_xlr'):
+                    base_url = self.url_api_xlr.replace('/api/v1/', '')
+                    self.template_url = base_url + '/#/templates/' + self.XLR_template_id.replace("Applications/", "").replace('/', '-')
+                else:
+                    self.template_url = 'Template created with ID: ' + self.XLR_template_id
 
-                    if self.enhanced_logger:
-                        self.enhanced_logger.error("Update Dico 'dict_template' in error", **error_context)
-                        self.enhanced_logger.error(str(e))
-                    else:
-                        self.logger_error.error("File: " + os.path.basename(inspect.currentframe().f_code.co_filename) + " --Class: " + self.__class__.__name__ + " --Function : " + inspect.currentframe().f_code.co_name + " --Line : " + str(inspect.currentframe().f_lineno))
-                        self.logger_error.error("Update Dico 'dict_template' in error")
-                        self.logger_error.error(str(e))
-                    sys.exit(0)
+            except (TypeError, Exception) as e:
+                error_context = {
+                    'error_type': 'template_creation_failed',
+                    'operation': 'create_template',
+                    'template_name': template_name
+                }
+
+                if self.enhanced_logger:
+                    self.enhanced_logger.error("Update Dico 'dict_template' in error", **error_context)
+                    self.enhanced_logger.error(str(e))
+                else:
+                    self.logger_error.error("File: " + os.path.basename(inspect.currentframe().f_code.co_filename) + " --Class: " + self.__class__.__name__ + " --Function : " + inspect.currentframe().f_code.co_name + " --Line : " + str(inspect.currentframe().f_lineno))
+                    self.logger_error.error("Update Dico 'dict_template' in error")
+                    self.logger_error.error(str(e))
+                sys.exit(0)
 
             return self.dict_template, self.XLR_template_id
 
@@ -259,6 +333,115 @@ class XLRBase:
                 self.logger_error.error(str(e))
             sys.exit(0)
 
+    def lookup_store_get(self, kind, key):
+        """Return a persistent lookup (see XLRLookupCache), None if not cached."""
+        store = getattr(self.xlr_client, 'lookup_store', None)
+        return store.get(self.url_api_xlr, kind, key) if store is not None else None
+
+    def lookup_store_set(self, kind, key, value, ttl):
+        """Store a persistent lookup for ttl seconds."""
+        store = getattr(self.xlr_client, 'lookup_store', None)
+        if store is not None:
+            store.set(self.url_api_xlr, kind, key, value, ttl)
+
+    def lookup_store_invalidate(self, kind, key):
+        """Drop a persistent lookup."""
+        store = getattr(self.xlr_client, 'lookup_store', None)
+        if store is not None:
+            store.invalidate(self.url_api_xlr, kind, key)
+
+    def invalidate_folder_lookup(self):
+        """Forget the cached id of the YAML folder (XLR answered 404 for it)."""
+        url_find_xlr_folder = self.url_api_xlr + "folders/find?byPath=" + self.parameters['general_info']['xlr_folder']
+        self.xlr_client.lookup_cache.pop(('folder', url_find_xlr_folder), None)
+        self.lookup_store_invalidate('folder', self.parameters['general_info']['xlr_folder'])
+        self.folder_id_from_cache = False
+
+    def get_template(self, template_id):
+        """
+        Fetch a template with its phases, task tree and variables in one call.
+
+        Args:
+            template_id (str): XLR id of the template
+
+        Returns:
+            dict: Template JSON (GET templates/<id>)
+        """
+        url_get_template = self.url_api_xlr + "templates/" + template_id
+        try:
+            response_get_template = self.xlr_client.get(url_get_template, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), verify=False)
+            response_get_template.raise_for_status()
+            return response_get_template.json()
+        except requests.exceptions.RequestException as e:
+            self.logger_error.error("File: " + os.path.basename(inspect.currentframe().f_code.co_filename) + " --Class: " + self.__class__.__name__ + " --Function : " + inspect.currentframe().f_code.co_name + " --Line : " + str(inspect.currentframe().f_lineno))
+            self.logger_error.error("Error get template : " + template_id)
+            self.logger_error.error("Error call api : " + url_get_template)
+            self.logger_error.error(e)
+            sys.exit(0)
+
+    def search_templates(self, title=None, folder_id=None, page_size=TEMPLATE_PAGE_SIZE):
+        """
+        Page through the templates with an exact title and/or stored directly in a folder.
+
+        Args:
+            title (str): Exact template title (the XLR title search matches substrings)
+            folder_id (str): XLR folder id; sub-folders are not included
+            page_size (int): Templates requested per page
+
+        Yields:
+            dict: Matching templates (status TEMPLATE)
+
+        Raises:
+            requests.exceptions.RequestException: On API errors
+        """
+        if title is not None:
+            url_search_template = self.url_api_xlr + "templates?title=" + quote(title) + "&"
+        else:
+            url_search_template = self.url_api_xlr + "folders/" + folder_id + "/templates?depth=1&"
+        page = 0
+        while True:
+            response_search_template = self.xlr_client.get(url_search_template + "page=" + str(page) + "&resultsPerPage=" + str(page_size),
+                                                           headers=self.header, auth=(self.ops_username_api, self.ops_password_api), verify=False)
+            response_search_template.raise_for_status()
+            templates = response_search_template.json() or []
+            for template in templates:
+                if title is not None and template.get('title') != title:
+                    continue
+                if folder_id is not None and template['id'].rsplit('/', 1)[0] != folder_id:
+                    continue
+                if template.get('status', 'TEMPLATE') == 'TEMPLATE':
+                    yield template
+            if len(templates) < page_size:
+                return
+            page += 1
+
+    def delete_templates(self, templates, workers=CLEANUP_WORKERS):
+        """
+        Delete templates with bounded parallelism.
+
+        Args:
+            templates (list): Templates returned by search_templates()
+            workers (int): Maximum concurrent DELETE calls
+
+        Returns:
+            list: Deleted templates; a template already gone (404) counts as deleted
+
+        Raises:
+            requests.exceptions.RequestException: On API errors
+        """
+        def delete(template):
+            url_delete_template = self.url_api_xlr + "templates/" + template['id']
+            response_delete_template = self.xlr_client.delete(url_delete_template, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), verify=False)
+            if response_delete_template.status_code != 404:
+                response_delete_template.raise_for_status()
+            self.logger_cr.info("DELETE TEMPLATE : " + template['title'])
+            return template
+
+        if not templates:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(templates)))) as executor:
+            return list(executor.map(delete, templates))
+
     def delete_template(self):
         """
         Delete existing XLR template if it exists.
@@ -268,22 +451,29 @@ class XLRBase:
         regenerating templates and ensures the latest configuration is used.
 
         The deletion is performed by:
-        1. Searching for templates by name
-        2. Checking template status
-        3. Deleting found templates
+        1. Deleting the template ids stored by the previous generation, if any
+           (a 404 means it is already gone)
+        2. Paging through the templates with this exact name, in the XLR folder
+           when find_xlr_folder() already ran: the cached ids are only those
+           this host wrote, a copy made elsewhere must go too
+        3. Deleting the other found templates concurrently
         4. Logging the deletion operation
         """
-        url_search_template = self.url_api_xlr + "templates?title=" + self.parameters['general_info']['name_release']
+        url_search_template = self.url_api_xlr + "templates?title=" + quote(self.parameters['general_info']['name_release'])
         try:
-            response_search_template = requests.get(url_search_template, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), verify=False)
-            response_search_template.raise_for_status()
-            if response_search_template.json():
-                for template in response_search_template.json():
-                    if template['title'] == self.parameters['general_info']['name_release'] and template['status'] == 'TEMPLATE':
-                        url_delete_template = self.url_api_xlr + "templates/" + template['id']
-                        response_delete_template = requests.delete(url_delete_template, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), verify=False)
-                        response_delete_template.raise_for_status()
-                        self.logger_cr.info("DELETE TEMPLATE : " + template['title'])
+            # Template ids stored by the previous generation are deleted without waiting for the search
+            cached_ids = self.lookup_store_get('template', self.parameters['general_info']['name_release']) or []
+            deleted = {template['id'] for template in
+                       self.delete_templates([{'id': template_id, 'title': self.parameters['general_info']['name_release']}
+                                              for template_id in cached_ids])}
+            if cached_ids:
+                self.lookup_store_invalidate('template', self.parameters['general_info']['name_release'])
+
+            # Exact title, in the template folder when it is already known
+            folder_id = getattr(self, 'dict_template', {}).get('template', {}).get('xlr_folder')
+            self.delete_templates([template for template in
+                                   self.search_templates(title=self.parameters['general_info']['name_release'], folder_id=folder_id)
+                                   if template['id'] not in deleted])
         except requests.exceptions.RequestException as e:
             self.logger_error.error("File: " + os.path.basename(inspect.currentframe().f_code.co_filename) + " --Class: " + self.__class__.__name__ + " --Function : " + inspect.currentframe().f_code.co_name + " --Line : " + str(inspect.currentframe().f_lineno))
             self.logger_error.error("Error delete template : " + self.parameters['general_info']['name_release'])
@@ -302,10 +492,26 @@ class XLRBase:
         Updates dict_template with folder information for template creation.
         """
         url_find_xlr_folder = self.url_api_xlr + "folders/find?byPath=" + self.parameters['general_info']['xlr_folder']
+
+        # Folder ids are shared by every template generated with the same client pool (--batch)
+        # and kept between runs in the persistent lookup cache
+        folder_id = self.xlr_client.lookup_cache.get(('folder', url_find_xlr_folder))
+        if folder_id is None:
+            folder_id = self.lookup_store_get('folder', self.parameters['general_info']['xlr_folder'])
+        if folder_id is not None:
+            self.xlr_client.lookup_cache[('folder', url_find_xlr_folder)] = folder_id
+            self.folder_id_from_cache = True
+            self.dict_template = {'template': {'xlr_folder': folder_id}}
+            self.logger_cr.info("XLR FOLDER FOUND : " + self.parameters['general_info']['xlr_folder'])
+            return folder_id
+
         try:
-            response_find_xlr_folder = requests.get(url_find_xlr_folder, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), verify=False)
+            response_find_xlr_folder = self.xlr_client.get(url_find_xlr_folder, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), verify=False)
             response_find_xlr_folder.raise_for_status()
             if 'id' in response_find_xlr_folder.json():
+                self.xlr_client.lookup_cache[('folder', url_find_xlr_folder)] = response_find_xlr_folder.json()['id']
+                self.lookup_store_set('folder', self.parameters['general_info']['xlr_folder'], response_find_xlr_folder.json()['id'], FOLDER_TTL)
+                self.folder_id_from_cache = False
                 self.dict_template = {'template': {'xlr_folder': response_find_xlr_folder.json()['id']}}
                 self.logger_cr.info("XLR FOLDER FOUND : " + self.parameters['general_info']['xlr_folder'])
                 return response_find_xlr_folder.json()['id']
@@ -325,14 +531,23 @@ class XLRBase:
 
         XLR templates are created with a default phase called 'New Phase'.
         This method removes it to start with a clean template structure.
+
+        The template shadow (xlr_client.shadow) answers whether the phase still
+        exists; XLR is only searched when the creation response did not list
+        the phases, and every later call is answered without any HTTP call.
         """
         url_delete_phase_default = self.url_api_xlr + "phases/search?phaseTitle=New Phase&releaseId=" + self.dict_template['template']['xlr_id'] + "&phaseVersion=ALL"
         try:
-            response = requests.get(url_delete_phase_default, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), verify=False)
-            response.raise_for_status()
-            if len(response.json()) != 0:
-                delete_phase = self.url_api_xlr + "phases/" + response.json()[0]['id']
-                delete_response = requests.delete(delete_phase, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), verify=False)
+            default_phases = self.xlr_client.shadow.phase_ids('New Phase')
+            if default_phases is None:
+                response = self.xlr_client.get(url_delete_phase_default, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), verify=False)
+                response.raise_for_status()
+                default_phases = [phase['id'] for phase in response.json()[:1]]
+            for phase_id in default_phases:
+                if not phase_id.startswith(self.dict_template['template']['xlr_id']):
+                    phase_id = self.dict_template['template']['xlr_id'] + '/' + phase_id
+                delete_phase = self.url_api_xlr + "phases/" + phase_id
+                delete_response = self.xlr_client.delete(delete_phase, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), verify=False)
                 delete_response.raise_for_status()
                 self.logger_cr.info("DELETED DEFAULT PHASE: New Phase")
         except requests.exceptions.RequestException as e:
@@ -398,9 +613,11 @@ class XLRBase:
             key (str): Variable name
             value (list): List of environment options
         """
+        if key in self.xlr_client.shadow.existing_variables:
+            return
         url_create_variable = self.url_api_xlr + "templates/" + self.dict_template['template']['xlr_id'] + "/variables"
         try:
-            response = requests.post(url_create_variable, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response = self.xlr_client.post(url_create_variable, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": "null",
                 "key": key,
                 "type": "xlrelease.ListBoxVariable",
@@ -483,10 +700,35 @@ class XLRBase:
                     self.list_auto_undeploy.append(package)
                     self.set_undeploy_task = True
 
+        # Value of a package left unselected at release start (string package mode)
+        self.release_Variables_in_progress['package_title_choice'] = self.package_title_choice()
+
         dict_value_for_template['package'] = self.list_package
         dict_value_for_template['template_liste_phase'] = self.parameters['general_info']['phases']
         return dict_value_for_template
 
+    def package_title_choice(self):
+        """
+        Placeholder value of the <package>_version variables.
+
+        In string package mode, a package whose version still contains this
+        value at release start is not managed by the release.
+
+        Returns:
+            str: Placeholder describing what the version variable expects
+        """
+        phases = self.parameters['general_info']['phases']
+        latest = self.parameters['general_info'].get('option_latest')
+        if 'BUILD' in phases:
+            return 'NO DEPLOY'
+        if self.transformation_variable_branch:
+            return 'XLD PACKAGE NAME or LATEST to get the last VERSION of XLD package' if latest else 'XLD PACKAGE NAME or BRANCH NAME'
+        if 'DEV' not in phases or self.parameters.get('jenkins') is None:
+            return 'XLD PACKAGE NAME or LATEST to get the last VERSION of XLD package' if latest else 'XLD PACKAGE NAME'
+        if phases == ['DEV']:
+            return 'BRANCH_NAME'
+        return 'XLD PACKAGE NAME or BRANCH_NAME if you select DEV'
+
     def dict_value_for_tempalte_technical_task(self):
         """
         Create dictionary for technical task management.
@@ -504,6 +746,77 @@ class XLRBase:
 
         return dict_value_for_template_technical_task
 
+    def build_technical_task_index(self):
+        """
+        Precompute technical tasks by (phase, category).
+
+        Returns:
+            dict: {(phase, category): tuple of task entries}
+
+        Each entry is a dict with 'name', 'kind', 'sun_title' and
+        'xlr_sun_task_variable_name' (already suffixed with the phase).
+        Accepts both the detailed form (category -> {task_name: {...}}) and the
+        raw YAML form (category -> ['task_ops', 'task_dba_other', ...]), in which
+        case names and titles are numbered per kind like the original generator.
+        """
+        index = {}
+        technical_task = getattr(self, 'dict_value_for_template_technical_task', {}).get('technical_task') or {}
+
+        for cat_technicaltask, tasks in technical_task.items():
+            entries = self._technical_task_entries(cat_technicaltask, tasks)
+            for phase in self.parameters['general_info']['phases']:
+                index[(phase, cat_technicaltask)] = tuple(
+                    dict(entry, xlr_sun_task_variable_name=entry['xlr_sun_task_variable_name'] + '_' + phase)
+                    for entry in entries
+                )
+
+        return index
+
+    def _technical_task_entries(self, cat_technicaltask, tasks):
+        """
+        Normalize one technical_task_list category into a list of task entries.
+
+        Args:
+            cat_technicaltask (str): Category (before_deployment, after_xldeploy, ...)
+            tasks (dict|list): Category content from the YAML or the detailed dict
+
+        Returns:
+            list: Task entries without phase suffix
+        """
+        entries = []
+        if not tasks:
+            return entries
+
+        if isinstance(tasks, dict):
+            for name, value in tasks.items():
+                kind = next((k for k in ('task_dba_factor', 'task_dba_other', 'task_ops') if k in name), name)
+                entries.append({'name': name,
+                                'kind': kind,
+                                'sun_title': value.get('sun_title', name),
+                                'xlr_sun_task_variable_name': value['xlr_sun_task_variable_name']})
+            return entries
+
+        labels = {'task_dba_factor': 'Action DBA FACTOR SQL ', 'task_dba_other': 'Action DBA ', 'task_ops': 'Action OPS '}
+        appli_name = self.parameters['general_info'].get('appli_name', '')
+        suffixes = {'before_deployment': ' before STOP ' + appli_name,
+                    'before_xldeploy': ' before XLD',
+                    'after_xldeploy': ' after XLD',
+                    'after_deployment': ' after START ' + appli_name}
+        count = dict.fromkeys(labels, 1)
+
+        for task in tasks:
+            kind = next((k for k in labels if k in task), None)
+            if kind is None:
+                continue
+            name = kind + '_' + str(count[kind])
+            entries.append({'name': name,
+                            'kind': kind,
+                            'sun_title': labels[kind] + str(count[kind]) + suffixes.get(cat_technicaltask, ' ' + cat_technicaltask),
+                            'xlr_sun_task_variable_name': cat_technicaltask + '_task_sun_' + name})
+            count[kind] += 1
+
+        return entries
+
     def task_notification(self, phase, email_item, aim):
         """
         Create email notification task in XLR template.
@@ -530,7 +843,7 @@ class XLRBase:
 
         try:
             if aim == 'email_close_release':
-                response = requests.post(url_task_notification, headers=self.header,
+                response = self.xlr_client.post(url_task_notification, headers=self.header,
                                        auth=(self.ops_username_api, self.ops_password_api), json={
                     "id": "null",
                     "locked": True,
@@ -554,7 +867,7 @@ class XLRBase:
                     }
                 }, verify=False)
             elif aim == 'email_end_release':
-                response = requests.post(url_task_notification, headers=self.header,
+                response = self.xlr_client.post(url_task_notification, headers=self.header,
                                        auth=(self.ops_username_api, self.ops_password_api), json={
                     "id": "null",
                     "locked": True,
@@ -629,8 +942,11 @@ class XLRBase:
         - Dynamic phase: Runtime template customization
         """
         url_add_phase_tasks = self.url_api_xlr + "templates/" + self.dict_template['template']['xlr_id'] + "/phases"
+        if phase in self.phase_positions:
+            # Rebuilt phase (--phases / --only-changed): insert it at its previous place
+            url_add_phase_tasks = self.url_api_xlr + "phases/" + self.dict_template['template']['xlr_id'] + "/phase?position=" + str(self.phase_positions[phase])
         try:
-            response_add_phase_tasks = requests.post(url_add_phase_tasks, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response_add_phase_tasks = self.xlr_client.post(url_add_phase_tasks, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": "null",
                 "type": "xlrelease.Phase",
                 "title": phase,
@@ -667,7 +983,7 @@ class XLRBase:
         """
         url_group_task = self.url_api_xlr + "tasks/" + ID_XLR_task + "/tasks"
         try:
-            response_group_task = requests.post(url_group_task, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response_group_task = self.xlr_client.post(url_group_task, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": "null",
                 "type": "xlrelease." + type_group,
                 "title": title_group,
@@ -702,7 +1018,7 @@ class XLRBase:
         """
         url_gate_task = self.url_api_xlr + "tasks/" + XLR_ID + "/tasks"
         try:
-            response_gate_task = requests.post(url_gate_task, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response_gate_task = self.xlr_client.post(url_gate_task, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": "null",
                 "type": "xlrelease.GateTask",
                 "title": gate_title,
@@ -724,4 +1040,247 @@ class XLRBase:
             self.logger_error.error("Error create gate task : " + gate_title)
             self.logger_error.error("Error call api : " + url_gate_task)
             self.logger_error.error(e)
-            sys.exit(0)
\ No newline at end of file
+            sys.exit(0)
+
+    def add_task_user_input(self, phase, type_userinput, link_task_id):
+        """
+        Add user input tasks for interactive deployment steps.
+
+        Args:
+            phase (str): Phase name
+            type_userinput (str): Type of user input required
+            link_task_id (str): Parent task ID
+
+        Creates tasks that require user interaction during deployment.
+        """
+        # Create variables for username and password
+        for value in [phase + '_username_' + type_userinput, phase + '_password_' + type_userinput]:
+            if 'password' in value:
+                self.template_create_variable(
+                    key=value, typev='PasswordStringVariable', label=value, description='',
+                    value='', requiresValue=False, showOnReleaseStart=False, multiline=False
+                )
+            else:
+                if 'controlm' in type_userinput:
+                    default_value = getattr(self, 'ops_username_controlm', '')
+                elif 'windows' in type_userinput:
+                    default_value = getattr(self, 'ops_username_windows', '')
+                else:
+                    default_value = ''
+
+                self.template_create_variable(
+                    key=value, typev='StringVariable', label=value, description='',
+                    value=default_value, requiresValue=False, showOnReleaseStart=False, multiline=False
+                )
+
+        # Prepare variables for user input task
+        variables_userinput = []
+        l_name_variable = []
+
+        if hasattr(self, 'dict_template') and 'variables' in self.dict_template:
+            for value in self.dict_template['variables']:
+                if list(value.keys())[0] == phase + '_username_' + type_userinput:
+                    variables_userinput.append(value[phase + '_username_' + type_userinput])
+                    l_name_variable.append(phase + '_username_' + type_userinput)
+                elif list(value.keys())[0] == phase + '_password_' + type_userinput:
+                    variables_userinput.append(value[phase + '_password_' + type_userinput])
+                    l_name_variable.append(phase + '_password_' + type_userinput)
+
+        # Create user input task
+        url = self.url_api_xlr + 'tasks/' + link_task_id + '/tasks'
+        try:
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+                "id": "null",
+                "type": "xlrelease.UserInputTask",
+                "title": "Please enter user password for " + type_userinput + ' on ' + phase,
+                "status": "PLANNED",
+                "variables": variables_userinput
+            }, verify=False)
+            response.raise_for_status()
+
+            if hasattr(self, 'logger_cr'):
+                self.logger_cr.info(f"CREATE USER INPUT TASK: {type_userinput} for phase {phase}")
+
+        except requests.exceptions.RequestException as e:
+            if hasattr(self, 'logger_error'):
+                self.logger_error.error(f"Error creating user input task: {e}")
+            raise
+
+    def xld_environment_id(self, package_name, phase):
+        """
+        XLD environment of a package in a phase.
+
+        Args:
+            package_name (str): Package of template_liste_package
+            phase (str): DEV, UAT, BENCH or PRODUCTION
+
+        Returns:
+            str: XLD_environment_path with <ENV>, <XLD_env> and <xld_prefix_env> replaced;
+                <XLD_env> is the env_<phase> release variable when XLD_ENV_<phase> is set
+        """
+        directory, prefix = XLD_PHASE_ENVIRONMENT[phase]
+        if phase == 'BENCH':
+            if len(self.parameters.get('XLD_ENV_BENCH') or []) > 1:
+                prefix = '${controlm_prefix_BENCH}'
+            elif 'NXFFA' in self.parameters['general_info']['iua']:
+                prefix = 'Q'
+        xld_env = '${env_' + phase + '}' if self.parameters.get('XLD_ENV_' + phase) is not None else directory
+        return (self.parameters['template_liste_package'][package_name]['XLD_environment_path']
+                .replace('<XLD_env>', xld_env).replace('<xld_prefix_env>', prefix).replace('<ENV>', directory))
+
+    def xld_application_name(self, package_name):
+        """Return XLD_application_name, or the last segment of XLD_application_path."""
+        package = self.parameters['template_liste_package'][package_name]
+        if package.get('XLD_application_name') is not None:
+            return package['XLD_application_name']
+        application_path = package['XLD_application_path']
+        return application_path.rstrip('/').split('/')[-1] if application_path.endswith('/') else application_path
+
+    def add_xld_version_lookup(self, phase, packages, step, xlr_phase=None):
+        """
+        Record the versions deployed in XLD before a step of a phase.
+
+        Args:
+            phase (str): Phase name (DEV, UAT, BENCH, PRODUCTION): XLD environment and credentials
+            packages (list): Packages to look up
+            step (str): Step name (BEFORE, CHANGE), part of the variable names
+            xlr_phase (str): XLR phase receiving the tasks (CREATE_CHANGE_<phase>), default phase
+
+        Writes version_deployed_<package>_<phase>_<step> ('Not Deploy' when the
+        package is not deployed). general_info.xld_version_lookup selects one
+        xldeploy.GetLastVersionDeployedTask per package in a ParallelGroup
+        (per_package, the default) or one script task querying every package
+        (consolidated).
+        """
+        xlr_phase = xlr_phase or phase
+        if f'xldeploy_user_input_{phase}' not in self.xlr_group_task_done:
+            self.add_task_user_input(phase, 'xldeploy', self.dict_template['template']['xlr_id'] + '/' +
+                                     self.dict_template[xlr_phase]['xlr_id_phase'])
+            self.xlr_group_task_done.add(f'xldeploy_user_input_{phase}')
+        for package in packages:
+            self.template_create_variable('version_deployed_' + package + '_' + phase + '_' + step, 'StringVariable',
+                                          '', '', '', False, False, False)
+
+        if self.parameters['general_info'].get('xld_version_lookup') == 'consolidated':
+            self.script_jython_xld_get_versions(phase, packages, self.dict_template[xlr_phase]['xlr_id_phase'], step)
+            return
+        grp_id_xldeploy_check = self.XLR_group_task(self.dict_template[xlr_phase]['xlr_id_phase'], 'ParallelGroup',
+                                                    'Check Version package in XLD ' + step, '')
+        for package in packages:
+            self.xld_get_version_deploy(package, phase, grp_id_xldeploy_check, step)
+
+    def xld_get_version_deploy(self, package_name, phase, grp_id_xldeploy, step):
+        """
+        Create the XLD task reading the version of a package deployed in a phase.
+
+        Args:
+            package_name (str): Package name
+            phase (str): Phase name
+            grp_id_xldeploy (str): Parent group ID
+            step (str): Step name, part of the variable name
+
+        The task output is mapped to version_deployed_<package>_<phase>_<step>;
+        its failure handler sets 'Not Deploy' and skips the task.
+        """
+        variable = 'version_deployed_' + package_name + '_' + phase + '_' + step
+        url = self.url_api_xlr + 'tasks/' + grp_id_xldeploy + '/tasks'
+        try:
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+                "id": None,
+                "type": "xlrelease.CustomScriptTask",
+                "title": "Get package version " + package_name,
+                "status": "PLANNED",
+                "locked": False,
+                "taskRecoverOp": "RUN_SCRIPT",
+                "taskFailureHandlerEnabled": True,
+                "failuresCount": 0,
+                "failureHandler": "releaseVariables['" + variable + "'] = 'Not Deploy'\n"
+                                  "taskApi.skipTask(getCurrentTask().getId(), 'Package " + package_name + " not deploy on " + phase + "')\n",
+                "variableMapping": {"pythonScript.applicationId": '${' + variable + '}'},
+                "waitForScheduledStartDate": True,
+                "pythonScript": {
+                    "xldeployServer": XLD_SERVER,
+                    "type": "xldeploy.GetLastVersionDeployedTask",
+                    "id": None,
+                    "username": "${" + phase + "_username_xldeploy}",
+                    "password": "${" + phase + "_password_xldeploy}",
+                    "environmentId": self.xld_environment_id(package_name, phase),
+                    "applicationName": self.xld_application_name(package_name),
+                }
+            }, verify=False)
+            response.raise_for_status()
+            if 'id' in response.json():
+                self.logger_cr.info("ON PHASE : " + phase.upper() + " --- Add task : 'Get version XLdeploy PACKAGE: " + package_name + "'")
+        except Exception as e:
+            self.logger_error.error("Detail ERROR: ON PHASE : " + phase.upper() + " --- Add task : 'Get package version " + package_name + "'")
+            self.logger_error.error("Error call api : " + url)
+            self.logger_error.error(str(e))
+            sys.exit(0)
+
+    def script_jython_xld_get_versions(self, phase, packages, parent_id, step):
+        """
+        Create one script task reading the deployed versions of several packages.
+
+        Args:
+            phase (str): Phase name
+            packages (list): Packages to look up
+            parent_id (str): Parent phase or group ID
+            step (str): Step name, part of the variable names
+
+        A single task instead of one GetLastVersionDeployedTask per package; the
+        variables are the same (version_deployed_<package>_<phase>_<step>, 'Not
+        Deploy' when absent or unreadable). The deployed applications are read
+        with one POST repository/cis/read; XLD fails that read as a whole when
+        one of them is absent, the script then reads them one by one (one
+        request per package, in sequence).
+        """
+        deployed = [(package, self.xld_environment_id(package, phase), self.xld_application_name(package))
+                    for package in packages]
+        title = 'Check Version package in XLD ' + step
+        url = self.url_api_xlr + 'tasks/' + parent_id + '/tasks'
+        try:
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+                "id": "null",
+                "type": "xlrelease.ScriptTask",
+                "locked": True,
+                "title": title,
+                "script": (
+                    "##script_jython_xld_get_versions\n"
+                    "import json\n"
+                    "import urllib2\n"
+                    "server = configurationApi.getConfiguration('" + XLD_SERVER + "')\n"
+                    "url_read = server.getProperty('url').rstrip('/') + '/deployit/repository/cis/read'\n"
+                    "login = '${" + phase + "_username_xldeploy}'\n"
+                    # Password values are keyed by the placeholder, kept out of XLR substitution
+                    "password = getCurrentRelease().passwordVariableValues['$' + '{" + phase + "_password_xldeploy}']\n"
+                    "password_manager = urllib2.HTTPPasswordMgrWithDefaultRealm()\n"
+                    "password_manager.add_password(None, url_read, login, password)\n"
+                    "opener = urllib2.build_opener(urllib2.HTTPBasicAuthHandler(password_manager))\n"
+                    "deployed = " + repr(deployed) + "\n"
+                    "ci_ids = [environment_id + '/' + application_name for package, environment_id, application_name in deployed]\n"
+                    "def read_cis(ids):\n"
+                    "    request = urllib2.Request(url_read, json.dumps(ids), {'Content-Type': 'application/json', 'Accept': 'application/json'})\n"
+                    "    return dict((ci['id'], ci) for ci in json.loads(opener.open(request).read()))\n"
+                    "try:\n"
+                    "    cis = read_cis(ci_ids)\n"
+                    "except (urllib2.URLError, KeyError, ValueError):\n"
+                    "    cis = {}\n"
+                    "    for ci_id in ci_ids:\n"
+                    "        try:\n"
+                    "            cis.update(read_cis([ci_id]))\n"
+                    "        except (urllib2.URLError, KeyError, ValueError):\n"
+                    "            pass\n"
+                    "for (package, environment_id, application_name), ci_id in zip(deployed, ci_ids):\n"
+                    "    variable = 'version_deployed_' + package + '_" + phase + "_" + step + "'\n"
+                    "    releaseVariables[variable] = cis.get(ci_id, {}).get('version') or 'Not Deploy'\n"
+                    "    print(package + ' : ' + releaseVariables[variable])\n"
+                )
+            }, verify=False)
+            response.raise_for_status()
+            if 'id' in response.json():
+                self.logger_cr.info("ON PHASE : " + phase.upper() + " --- Add task : '" + title + "'")
+        except Exception as e:
+            self.logger_error.error("Detail ERROR: ON PHASE : " + phase.upper() + " --- Add task : '" + title + "'")
+            self.logger_error.error("Error call api : " + url)
+            self.logger_error.error(str(e))
+            sys.exit(0)
@@ -0,0 +1,134 @@
+"""
+XLRBudget - Host-wide XLR API call budget
+
+Limits the number of concurrent XLR calls and the call rate across every
+generator process of a host (parallel CI jobs, --batch workers). The budget
+state lives in lock files of a directory shared by the processes, one
+directory per XLR server:
+
+- concurrency: N slot files, a call holds an exclusive flock on one of them
+- rate: a token bucket stored in a small state file updated under flock
+
+Locks are released by the kernel when a process dies, so a killed job never
+leaks budget.
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # No flock (Windows): the budget is disabled
+    fcntl = None
+
+ENV_MAX_CONCURRENT_CALLS = 'XLR_MAX_CONCURRENT_CALLS'
+ENV_MAX_CALLS_PER_SECOND = 'XLR_MAX_CALLS_PER_SECOND'
+ENV_BUDGET_DIR = 'XLR_BUDGET_DIR'
+
+
+class XLRBudget:
+    """
+    Cross-process concurrency and rate budget for XLR API calls.
+
+    Attributes:
+        directory (str): Directory holding the lock and state files
+        max_concurrent_calls (int): Calls in flight on the host, unlimited if None
+        max_calls_per_second (float): Sustained call rate on the host, unlimited if None
+    """
+
+    def __init__(self, directory, max_concurrent_calls=None, max_calls_per_second=None, poll_interval=0.02):
+        """
+        Args:
+            directory (str): Directory shared by all processes using this budget
+            max_concurrent_calls (int): Calls in flight on the host, unlimited if None
+            max_calls_per_second (float): Sustained call rate on the host, unlimited if None
+            poll_interval (float): Seconds between two attempts to get a free slot
+        """
+        self.directory = directory
+        self.max_concurrent_calls = max_concurrent_calls
+        self.max_calls_per_second = max_calls_per_second
+        self.poll_interval = poll_interval
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_settings(cls, url_api_xlr, max_concurrent_calls=None, max_calls_per_second=None):
+        """
+        Build the budget of an XLR server from configuration values.
+
+        Args:
+            url_api_xlr (str): XLR API URL (one budget per server)
+            max_concurrent_calls: Value of xlr_max_concurrent_calls in the .ini file
+            max_calls_per_second: Value of xlr_max_calls_per_second in the .ini file
+
+        Returns:
+            XLRBudget: The budget, or None when no limit is configured or flock is unavailable
+
+        The XLR_MAX_CONCURRENT_CALLS and XLR_MAX_CALLS_PER_SECOND environment
+        variables override the .ini values, XLR_BUDGET_DIR overrides the directory.
+        """
+        max_concurrent_calls = os.environ.get(ENV_MAX_CONCURRENT_CALLS, max_concurrent_calls)
+        max_calls_per_second = os.environ.get(ENV_MAX_CALLS_PER_SECOND, max_calls_per_second)
+        max_concurrent_calls = int(max_concurrent_calls) if max_concurrent_calls not in (None, '', '0') else None
+        max_calls_per_second = float(max_calls_per_second) if max_calls_per_second not in (None, '', '0') else None
+        if fcntl is None or (max_concurrent_calls is None and max_calls_per_second is None):
+            return None
+
+        server = hashlib.sha1((url_api_xlr or '').encode('utf-8')).hexdigest()[:12]
+        directory = os.environ.get(ENV_BUDGET_DIR) or os.path.join(tempfile.gettempdir(), 'xlr_budget_' + server)
+        return cls(directory, max_concurrent_calls, max_calls_per_second)
+
+    @contextmanager
+    def acquire(self):
+        """Wait for a rate token and a concurrency slot, and hold the slot for the call."""
+        self._take_rate_token()
+        slot = self._take_slot()
+        try:
+            yield
+        finally:
+            if slot is not None:
+                fcntl.flock(slot, fcntl.LOCK_UN)
+                os.close(slot)
+
+    def _take_slot(self):
+        if not self.max_concurrent_calls:
+            return None
+        while True:
+            for index in range(self.max_concurrent_calls):
+                slot = os.open(os.path.join(self.directory, f'slot.{index}.lock'), os.O_RDWR | os.O_CREAT, 0o666)
+                try:
+                    fcntl.flock(slot, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return slot
+                except BlockingIOError:
+                    os.close(slot)
+            time.sleep(self.poll_interval)
+
+    def _take_rate_token(self):
+        if not self.max_calls_per_second:
+            return
+        rate = self.max_calls_per_second
+        burst = max(rate, 1.0)
+        while True:
+            state = os.open(os.path.join(self.directory, 'rate.state'), os.O_RDWR | os.O_CREAT, 0o666)
+            try:
+                fcntl.flock(state, fcntl.LOCK_EX)
+                now = time.time()
+                try:
+                    tokens, last = (float(value) for value in os.pread(state, 64, 0).split())
+                except ValueError:
+                    tokens, last = burst, now
+                tokens = min(burst, tokens + max(now - last, 0) * rate)
+                wait = 0 if tokens >= 1 else (1 - tokens) / rate
+                if not wait:
+                    tokens -= 1
+                os.ftruncate(state, 0)
+                os.pwrite(state, f'{tokens!r} {now!r}'.encode('ascii'), 0)
+            finally:
+                fcntl.flock(state, fcntl.LOCK_UN)
+                os.close(state)
+            if not wait:
+                return
+            time.sleep(wait)
@@ -0,0 +1,98 @@
+"""
+XLRTemplateCleanup - Fleet-wide sweep of orphan templates (--sweep)
+
+The XLR folders used by a set of YAML files are paged through
+(folders/<id>/templates) and every template whose title matches a pattern
+but is no longer declared by any YAML file is an orphan: a release that was
+renamed or retired. Folders are searched concurrently and orphans are
+deleted with bounded parallelism, through the same XLRBase.search_templates
+and XLRBase.delete_templates used before each generation.
+"""
+
+import os, sys, fnmatch, requests, inspect
+from concurrent.futures import ThreadPoolExecutor
+from .xlr_base import XLRBase, CLEANUP_WORKERS
+
+
+def orphan_templates(templates, known_titles, pattern='*'):
+    """
+    Select the orphans of a folder.
+
+    Args:
+        templates (list): Templates of the folder
+        known_titles (set): name_release of the YAML files using this folder
+        pattern (str): fnmatch pattern of the titles the generator owns
+
+    Returns:
+        list: Templates matching pattern whose title is not in known_titles
+    """
+    return [template for template in templates
+            if fnmatch.fnmatchcase(template.get('title', ''), pattern) and template.get('title') not in known_titles]
+
+
+class XLRTemplateCleanup(XLRBase):
+    """
+    Find and delete orphan templates in the XLR folders of a set of YAML files.
+
+    Attributes:
+        folders (dict): XLR folder path -> set of name_release declared in it
+    """
+
+    def __init__(self, folders, configuration, xlr_client=None, log_directory='log/_sweep', use_lookup_cache=True):
+        """
+        Args:
+            folders (dict): XLR folder path -> set of name_release declared in it
+            configuration (dict): XLR API configuration (url_api_xlr, credentials)
+            xlr_client (XLRClient): Client for XLR API calls
+            log_directory (str): Log directory of the sweep
+            use_lookup_cache (bool): Use the persistent folder lookup cache
+        """
+        super().__init__()
+        self.folders = folders
+        self.parameters = {'general_info': {'name_release': 'SWEEP', 'xlr_folder': ''}}
+        self.setup_enhanced_logging('SWEEP', log_directory)
+        for key, value in configuration.items():
+            setattr(self, key, value)
+        self.header = {'content-type': 'application/json', 'Accept': 'application/json'}
+        self.setup_xlr_client(xlr_client, use_lookup_cache)
+        self.dict_template = {}
+
+    def folder_id(self, xlr_folder):
+        """Return the XLR id of a folder path (cached like the generation lookups)."""
+        self.parameters['general_info']['xlr_folder'] = xlr_folder
+        return self.find_xlr_folder()
+
+    def sweep(self, pattern='*', apply=False, workers=CLEANUP_WORKERS):
+        """
+        List, and optionally delete, the orphan templates of every folder.
+
+        Args:
+            pattern (str): fnmatch pattern of the titles the generator owns
+            apply (bool): Delete the orphans; only list them when False
+            workers (int): Folders searched and templates deleted concurrently
+
+        Returns:
+            list: (folder path, template) of every orphan found
+        """
+        self.enhanced_logger.start_timer('sweep_templates')
+        folder_ids = {xlr_folder: self.folder_id(xlr_folder) for xlr_folder in sorted(self.folders)}
+
+        def folder_orphans(xlr_folder):
+            templates = list(self.search_templates(folder_id=folder_ids[xlr_folder]))
+            return [(xlr_folder, template) for template in orphan_templates(templates, self.folders[xlr_folder], pattern)]
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(folder_ids) or 1))) as executor:
+                orphans = [orphan for found in executor.map(folder_orphans, sorted(folder_ids)) for orphan in found]
+            for xlr_folder, template in orphans:
+                self.logger_cr.info("ORPHAN TEMPLATE : " + xlr_folder + " / " + template['title'])
+            if apply:
+                self.delete_templates([template for _, template in orphans], workers=workers)
+        except requests.exceptions.RequestException as e:
+            self.logger_error.error("File: " + os.path.basename(inspect.currentframe().f_code.co_filename) + " --Class: " + self.__class__.__name__ + " --Function : " + inspect.currentframe().f_code.co_name + " --Line : " + str(inspect.currentframe().f_lineno))
+            self.logger_error.error("Error sweep templates : " + ", ".join(sorted(self.folders)))
+            self.logger_error.error(str(e))
+            sys.exit(0)
+
+        self.enhanced_logger.end_timer('sweep_templates', f"{len(orphans)} orphan template(s) in {len(folder_ids)} folder(s)")
+        return orphans
@@ -0,0 +1,231 @@
+"""
+XLRClient - HTTP access to the XLR REST API
+
+All XLR calls made by XLRBase and the specialized classes go through an
+XLRClient (self.xlr_client). The client keeps a pooled requests.Session,
+classifies every call by endpoint and records its latency in the release
+performance log, which is the history used by the --plan estimator.
+
+XLRPlanClient is a drop-in replacement that sends nothing: it answers with
+generated IDs and records every call, giving the compiled template model
+used by --plan.
+"""
+
+import json
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .xlr_shadow import XLRTemplateShadow, OBSERVED_ENDPOINTS
+
+
+def endpoint_of(method, url):
+    """
+    Return the coarse endpoint of a call, e.g. 'POST tasks' or 'GET folders/find'.
+
+    Args:
+        method (str): HTTP method
+        url (str): Full XLR API URL
+
+    The resource is the first path segment after /api/v1/, followed by the
+    last segment when it names a sub-collection (tasks, variables, phases, find, search).
+    """
+    path = urlsplit(url).path
+    if 'api/v1/' in path:
+        path = path.split('api/v1/', 1)[1]
+    segments = [segment for segment in path.split('/') if segment]
+    if not segments:
+        return method.upper() + ' /'
+    resource = segments[0]
+    if len(segments) > 1 and segments[-1] in ('tasks', 'variables', 'phases', 'phase', 'find', 'search'):
+        if resource in ('folders', 'phases') and segments[-1] in ('find', 'search'):
+            resource = resource + '/' + segments[-1]
+        elif segments[-1] != resource:
+            resource = segments[-1] if segments[-1] != 'phase' else 'phases'
+    return method.upper() + ' ' + resource
+
+
+class XLRClient:
+    """
+    XLR REST client with a shared connection pool and per-call latency logging.
+
+    Attributes:
+        session (requests.Session): Pooled HTTP session (may be shared between clients)
+        enhanced_logger (XLRLogger): Release logger receiving api_call metrics, or None
+        lookup_cache (dict): XLR lookups (folder path -> id) shared between clients
+        budget (XLRBudget): Host-wide concurrency/rate budget, unlimited if None
+        lookup_store (XLRLookupCache): Persistent lookup cache, disabled if None
+        shadow (XLRTemplateShadow): Local model of the template built through this client
+        script_stage (XLRScriptStage): Stage applied to ScriptTask payloads, none if None
+    """
+
+    dry_run = False
+    script_stage = None
+
+    def __init__(self, session=None, enhanced_logger=None, pool_size=10, lookup_cache=None, budget=None,
+                 lookup_store=None):
+        """
+        Args:
+            session (requests.Session): Existing session to share, a new pooled one if None
+            enhanced_logger (XLRLogger): Logger for api_call performance records
+            pool_size (int): Connection pool size of a newly created session
+            lookup_cache (dict): Existing lookup cache to share, a new one if None
+            budget (XLRBudget): Host-wide concurrency/rate budget, unlimited if None
+            lookup_store (XLRLookupCache): Persistent lookup cache, disabled if None
+        """
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        self.session = session
+        self.enhanced_logger = enhanced_logger
+        self.lookup_cache = lookup_cache if lookup_cache is not None else {}
+        self.budget = budget
+        self.lookup_store = lookup_store
+        self.shadow = XLRTemplateShadow()
+
+    def observe(self, method, url, endpoint, payload, response):
+        """Feed a successful template create/delete/search response to the shadow."""
+        if endpoint not in OBSERVED_ENDPOINTS or response.status_code >= 400:
+            return
+        try:
+            data = response.json() if response.content else None
+        except ValueError:
+            return
+        self.shadow.observe(method.upper(), url, endpoint, payload, data)
+
+    def prepare(self, kwargs):
+        """Pass the JSON body of a call through the script stage."""
+        if self.script_stage is not None and kwargs.get('json') is not None:
+            kwargs['json'] = self.script_stage.prepare(kwargs['json'])
+        return kwargs
+
+    def request(self, method, url, **kwargs):
+        """Send one XLR API call within the budget, record its latency and update the shadow."""
+        kwargs = self.prepare(kwargs)
+        endpoint = endpoint_of(method, url)
+        if self.budget is None:
+            start = time.time()
+            response = self.session.request(method, url, **kwargs)
+            budget_wait = None
+        else:
+            wait_start = time.time()
+            with self.budget.acquire():
+                start = time.time()
+                response = self.session.request(method, url, **kwargs)
+            budget_wait = start - wait_start
+        if self.enhanced_logger:
+            self.enhanced_logger.log_api_call(endpoint, time.time() - start, response.status_code, budget_wait)
+        self.observe(method, url, endpoint, kwargs.get('json'), response)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+
+class XLRPlanResponse:
+    """Minimal requests.Response stand-in returned by XLRPlanClient."""
+
+    def __init__(self, data, status_code=200):
+        self._data = data
+        self.status_code = status_code
+        self.content = json.dumps(data).encode('utf-8') if data is not None else b''
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        return None
+
+
+class XLRPlanClient(XLRClient):
+    """
+    Dry-run client: records every call and answers with generated IDs.
+
+    Attributes:
+        calls (list): One dict per call with method, url, endpoint, task_type,
+            section (phase title or 'template'), payload, payload bytes and the
+            generated response_id
+    """
+
+    # Generated ids must never reach the persistent lookup cache
+    dry_run = True
+
+    def __init__(self, enhanced_logger=None):
+        self.session = None
+        self.enhanced_logger = enhanced_logger
+        self.lookup_cache = {}
+        self.budget = None
+        self.lookup_store = None
+        self.shadow = XLRTemplateShadow()
+        self.calls = []
+        self._counter = 0
+        self._phase_titles = {}
+        self._default_phase_deleted = set()
+
+    def _new_id(self, prefix):
+        self._counter += 1
+        return prefix + str(self._counter)
+
+    def _section(self, url):
+        """Phase title owning the URL, 'template' when the call is not under a phase."""
+        for segment in urlsplit(url).path.split('/'):
+            if segment in self._phase_titles:
+                return self._phase_titles[segment]
+        return 'template'
+
+    def request(self, method, url, **kwargs):
+        payload = self.prepare(kwargs).get('json')
+        endpoint = endpoint_of(method, url)
+        call = {
+            'method': method.upper(),
+            'url': url,
+            'endpoint': endpoint,
+            'task_type': payload.get('type') if isinstance(payload, dict) else None,
+            'section': self._section(url),
+            'payload': payload,
+            'bytes': len(json.dumps(payload)) if payload is not None else 0,
+        }
+        self.calls.append(call)
+        answer = self._answer(method.upper(), url, endpoint, payload)
+        call['response_id'] = answer.get('id') if isinstance(answer, dict) else None
+        response = XLRPlanResponse(answer)
+        self.observe(method, url, endpoint, payload, response)
+        return response
+
+    def _answer(self, method, url, endpoint, payload):
+        path = urlsplit(url).path
+        if endpoint == 'GET folders/find':
+            return {'id': 'Applications/FolderPlan', 'title': 'plan'}
+        if endpoint == 'GET templates':
+            return []
+        if endpoint == 'GET phases/search':
+            release_id = dict(part.split('=', 1) for part in urlsplit(url).query.split('&') if '=' in part).get('releaseId', '')
+            if release_id in self._default_phase_deleted:
+                return []
+            self._default_phase_deleted.add(release_id)
+            return [{'id': release_id + '/PhaseDefault'}]
+        if method != 'POST':
+            return None
+        if endpoint == 'POST templates':
+            return {'id': 'Applications/FolderPlan/' + self._new_id('Release')}
+        if endpoint == 'POST phases':
+            phase_segment = self._new_id('Phase')
+            self._phase_titles[phase_segment] = (payload or {}).get('title', phase_segment)
+            return {'id': phase_segment}
+        if endpoint == 'POST variables':
+            return {'id': self._new_id('Variable'), 'key': (payload or {}).get('key')}
+        parent = path.split('tasks/', 1)[1].rsplit('/tasks', 1)[0] if 'tasks/' in path else ''
+        return {'id': (parent + '/' if parent else '') + self._new_id('Task')}
@@ -5,6 +5,7 @@ This module contains the enhanced XLRControlm class that inherits from XLRBase
 for Control-M integration functionality.
 """
 
+import sys
 from .xlr_base import XLRBase
 
 class XLRControlm(XLRBase):
@@ -56,7 +57,7 @@ class XLRControlm(XLRBase):
         # Create webhook task using inherited XLR API methods
         url_webhook = self.url_api_xlr + 'tasks/' + grp_id_controlm + '/tasks'
         try:
-            response = requests.post(url_webhook, headers=self.header,
+            response = self.xlr_client.post(url_webhook, headers=self.header,
                                    auth=(self.ops_username_api, self.ops_password_api),
                                    json={
                                        "id": "null",
@@ -99,7 +100,7 @@ class XLRControlm(XLRBase):
         """
         url_date_script = self.url_api_xlr + 'tasks/' + self.dict_template[phase]['xlr_id_phase'] + '/tasks'
         try:
-            response = requests.post(url_date_script, headers=self.header,
+            response = self.xlr_client.post(url_date_script, headers=self.header,
                                    auth=(self.ops_username_api, self.ops_password_api),
                                    json={
                                        "id": "null",
@@ -145,7 +146,7 @@ class XLRControlm(XLRBase):
 
         url_order_folder = self.url_api_xlr + 'tasks/' + grp_id_controlm + '/tasks'
         try:
-            response = requests.post(url_order_folder, headers=self.header,
+            response = self.xlr_client.post(url_order_folder, headers=self.header,
                                    auth=(self.ops_username_api, self.ops_password_api),
                                    json={
                                        "id": "null",
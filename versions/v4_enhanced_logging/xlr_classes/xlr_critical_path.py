@@ -0,0 +1,207 @@
+"""
+XLRCriticalPath - Expected duration and critical path of a generated release
+
+A compiled template (see xlr_export) is priced task by task from the
+durations of past releases, then folded the way XLR runs it: phases and
+SequentialGroups add up their tasks, a ParallelGroup lasts as long as its
+longest task. The result is the expected end-to-end duration, the critical
+path (the tasks that make it) and the SequentialGroups on that path that
+weigh most, i.e. the YAML sections worth restructuring.
+
+Durations are read from:
+- an exported XLR release JSON (one release, a list of releases, or
+  {"releases": [...]}): startDate/endDate of every completed task
+- a CSV file with type, title and seconds columns, where title may be a
+  pattern ('XLD *') and type may be empty or '*'
+
+A task is priced by, in order: the mean of its type and exact title, the
+first CSV pattern matching its type and title, the mean of its type, and
+DEFAULT_TASK_SECONDS.
+"""
+
+import csv
+import json
+from collections import defaultdict
+from datetime import datetime
+from fnmatch import fnmatchcase
+
+# Seconds of a task without any history for its type
+DEFAULT_TASK_SECONDS = 60.0
+
+# Share of the release above which a SequentialGroup of the critical path is flagged
+DEFAULT_GROUP_SHARE = 0.10
+
+PARALLEL_GROUP = 'xlrelease.ParallelGroup'
+
+
+def task_kind(task):
+    """Type a task is priced by: the plugin type of a CustomScriptTask, else the XLR type."""
+    if task.get('type') == 'xlrelease.CustomScriptTask' and isinstance(task.get('pythonScript'), dict):
+        return task['pythonScript'].get('type', task['type'])
+    return task.get('type')
+
+
+def _parse_date(value):
+    """Parse an XLR date (ISO 8601, '2024-05-01T10:00:00.000+0200' or with 'Z')."""
+    value = value.replace('Z', '+00:00')
+    if len(value) > 5 and value[-5] in '+-' and value[-3] != ':':
+        value = value[:-2] + ':' + value[-2:]
+    return datetime.fromisoformat(value)
+
+
+class XLRDurationHistory:
+    """
+    Task durations of past releases.
+
+    Attributes:
+        exact (dict): (type, title) -> list of seconds
+        by_kind (dict): type -> list of seconds
+        patterns (list): (type pattern, title pattern, seconds) in file order
+        default_seconds (float): Seconds of a task without any history
+    """
+
+    def __init__(self, default_seconds=DEFAULT_TASK_SECONDS):
+        self.exact = defaultdict(list)
+        self.by_kind = defaultdict(list)
+        self.patterns = []
+        self.default_seconds = default_seconds
+
+    @classmethod
+    def load(cls, path, default_seconds=DEFAULT_TASK_SECONDS):
+        """
+        Read a history file, CSV by extension, release JSON otherwise.
+
+        Raises:
+            OSError, ValueError, KeyError: If the file cannot be read as a history
+        """
+        history = cls(default_seconds)
+        if path.lower().endswith('.csv'):
+            with open(path, newline='') as file:
+                history.add_csv_rows(csv.DictReader(file))
+        else:
+            with open(path, 'r') as file:
+                history.add_releases(json.load(file))
+        return history
+
+    def add(self, kind, title, seconds):
+        """Record one task duration."""
+        self.exact[(kind, title)].append(seconds)
+        self.by_kind[kind].append(seconds)
+
+    def add_releases(self, data):
+        """Record the completed tasks of exported releases (dict, list or {'releases': [...]})."""
+        releases = data.get('releases', [data]) if isinstance(data, dict) else data
+
+        def walk(tasks):
+            for task in tasks or []:
+                if task.get('tasks'):
+                    walk(task['tasks'])
+                elif task.get('startDate') and task.get('endDate'):
+                    seconds = (_parse_date(task['endDate']) - _parse_date(task['startDate'])).total_seconds()
+                    self.add(task_kind(task), task.get('title'), max(seconds, 0.0))
+
+        for release in releases:
+            for phase in release.get('phases', []):
+                walk(phase.get('tasks'))
+
+    def add_csv_rows(self, rows):
+        """Record type, title (pattern) and seconds rows."""
+        for row in rows:
+            kind = (row.get('type') or '*').strip()
+            title = (row.get('title') or '*').strip()
+            seconds = float(row['seconds'])
+            if any(character in title for character in '*?[') or kind == '*':
+                self.patterns.append((kind, title, seconds))
+            else:
+                self.add(kind, title, seconds)
+
+    def estimate(self, task):
+        """
+        Expected duration of a task.
+
+        Returns:
+            tuple: (seconds, source) with source 'title', 'pattern', 'type' or 'default'
+        """
+        kind, title = task_kind(task), task.get('title') or ''
+        if (kind, title) in self.exact:
+            values = self.exact[(kind, title)]
+            return sum(values) / len(values), 'title'
+        for kind_pattern, title_pattern, seconds in self.patterns:
+            if fnmatchcase(kind or '', kind_pattern) and fnmatchcase(title, title_pattern):
+                return seconds, 'pattern'
+        if self.by_kind.get(kind):
+            values = self.by_kind[kind]
+            return sum(values) / len(values), 'type'
+        return self.default_seconds, 'default'
+
+
+def critical_path(release, history, group_share=DEFAULT_GROUP_SHARE):
+    """
+    Expected duration and critical path of an exported template.
+
+    Args:
+        release (dict): build_template_export() of the compiled template
+        history (XLRDurationHistory): Task durations
+        group_share (float): Share of the total above which a SequentialGroup is flagged
+
+    Returns:
+        dict: total_seconds, phases [(title, seconds)], path [(location, type,
+            seconds, source)], groups (flagged SequentialGroups: location,
+            seconds, share, tasks), sources (tasks priced per source)
+    """
+    sources = defaultdict(int)
+    groups = []
+
+    def fold(node, location):
+        """Return (seconds, critical leaves) of a task or group."""
+        children = node.get('tasks') or []
+        if 'tasks' not in node and not node.get('type', '').endswith('Group'):
+            seconds, source = history.estimate(node)
+            sources[source] += 1
+            return seconds, [(location, task_kind(node), seconds, source)]
+        folded = [fold(child, location + ' / ' + (child.get('title') or '')) for child in children]
+        if node.get('type') == PARALLEL_GROUP:
+            return max(folded, key=lambda item: item[0], default=(0.0, []))
+        seconds = sum(item[0] for item in folded)
+        if node.get('type', '').endswith('SequentialGroup'):
+            groups.append({'location': location, 'seconds': seconds, 'tasks': len(children)})
+        return seconds, [leaf for item in folded for leaf in item[1]]
+
+    phases, path = [], []
+    for phase in release.get('phases', []):
+        seconds, leaves = fold(phase, phase.get('title') or '')
+        phases.append((phase.get('title'), seconds))
+        path.extend(leaves)
+
+    total = sum(seconds for _, seconds in phases)
+    flagged = []
+    for group in groups:
+        share = group['seconds'] / total if total else 0.0
+        critical = any(location.startswith(group['location'] + ' / ') for location, _, _, _ in path)
+        if critical and group['tasks'] > 1 and share >= group_share:
+            flagged.append(dict(group, share=share))
+    flagged.sort(key=lambda group: group['seconds'], reverse=True)
+
+    return {'total_seconds': total, 'phases': phases, 'path': path, 'groups': flagged, 'sources': dict(sources)}
+
+
+def _duration(seconds):
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{seconds:02d}s"
+
+
+def format_critical_path(result, release_name, top=10):
+    """Render a critical_path() result as printable lines."""
+    priced = ', '.join(f"{count} by {source}" for source, count in sorted(result['sources'].items()))
+    lines = [f"CRITICAL PATH for {release_name} : {_duration(result['total_seconds'])} expected ({priced})",
+             "  Phases :"]
+    lines += [f"    {_duration(seconds)}  {title}" for title, seconds in result['phases']]
+    lines.append(f"  Longest tasks of the critical path (top {top}) :")
+    for location, kind, seconds, source in sorted(result['path'], key=lambda leaf: leaf[2], reverse=True)[:top]:
+        lines.append(f"    {_duration(seconds)}  {location} [{kind}, {source}]")
+    lines.append("  Sequential groups weighing on the release :" if result['groups'] else
+                 "  No sequential group above the flag threshold")
+    for group in result['groups']:
+        lines.append(f"    {_duration(group['seconds'])} ({group['share']:.0%})  {group['location']} : {group['tasks']} tasks in sequence")
+    return lines
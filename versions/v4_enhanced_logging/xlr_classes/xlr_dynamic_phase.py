@@ -5,7 +5,220 @@ This module contains the enhanced XLRDynamicPhase class that inherits from XLRBa
 for dynamic phase functionality.
 """
 
+import re
+import sys
 from .xlr_base import XLRBase
+from .xlr_incremental import phase_titles
+
+# Title of the single script task replacing the pruning scripts of dynamic_release
+PRUNING_TASK_TITLE = 'DYNAMIC RELEASE PRUNING'
+
+# Jython prologue: the release is fetched once and indexed by phase title and
+# task title, so deletions need no taskApi/phaseApi search per title
+RELEASE_INDEX_SCRIPT = (
+    "release = releaseApi.getRelease(getCurrentRelease().id)\n"
+    "phase_ids = {}\n"
+    "task_ids = {}\n"
+    "deleted_ids = []\n"
+    "def index_tasks(phase_title, tasks):\n"
+    "    for task in tasks:\n"
+    "        task_ids[phase_title].setdefault(task.title, []).append(task.id)\n"
+    "        if getattr(task, 'tasks', None):\n"
+    "            index_tasks(phase_title, task.tasks)\n"
+    "for phase in release.phases:\n"
+    "    phase_ids.setdefault(phase.title, []).append(phase.id)\n"
+    "    task_ids.setdefault(phase.title, {})\n"
+    "    index_tasks(phase.title, phase.tasks)\n"
+    "def is_deleted(object_id):\n"
+    "    return any(object_id == deleted or object_id.startswith(deleted + '/') for deleted in deleted_ids)\n"
+    "def delete_phase(phase_title):\n"
+    "    for phase_id in phase_ids.pop(phase_title, []):\n"
+    "        phaseApi.deletePhase(phase_id)\n"
+    "        deleted_ids.append(phase_id)\n"
+    "    task_ids.pop(phase_title, None)\n"
+    "def delete_task(phase_title, title):\n"
+    "    for task_id in task_ids.get(phase_title, {}).pop(title, []):\n"
+    "        if not is_deleted(task_id):\n"
+    "            taskApi.delete(task_id)\n"
+    "            deleted_ids.append(task_id)\n"
+)
+
+def delete_phase_script(marker, phases, selected, titles):
+    """
+    Build a DELETE PHASE script for the phases known at generation time.
+
+    The loop over template_liste_phase is unrolled: each phase keeps a single
+    runtime test, on the user's choice, and the titles it selects or deletes
+    are written in the script.
+
+    Args:
+        marker (str): First line of the script
+        phases (list): general_info.phases
+        selected (callable): phase -> Jython condition, true when the user keeps the phase
+        titles (callable): phase -> (titles selected, titles deleted) when kept / not kept
+
+    Returns:
+        str: Jython script setting xlr_list_phase, xlr_list_phase_selection and their _to_delete lists
+    """
+    lines = [marker,
+             "xlr_list_phase_selection = []",
+             "xlr_list_phase = []",
+             "xlr_list_phase_selection_to_delete = []",
+             "xlr_list_phase_to_delete = []"]
+    for name in phases:
+        kept, deleted = titles(name)
+        branches = []
+        if kept:
+            branches.append(("if " + selected(name) + ":",
+                             ["xlr_list_phase_selection += " + repr(kept), "xlr_list_phase.append(" + repr(name) + ")"]))
+        if deleted:
+            branches.append(("else:" if kept else "if not " + selected(name) + ":",
+                             ["xlr_list_phase_selection_to_delete += " + repr(deleted), "xlr_list_phase_to_delete.append(" + repr(name) + ")"]))
+        for condition, statements in branches:
+            lines.append(condition)
+            lines.extend("    " + statement for statement in statements)
+    for key in ('xlr_list_phase', 'xlr_list_phase_selection', 'xlr_list_phase_to_delete', 'xlr_list_phase_selection_to_delete'):
+        lines.append("releaseVariables['release_Variables_in_progress']['" + key + "'] = ','.join(map(str, " + key + "))")
+    return "\n".join(lines) + "\n"
+
+
+# Spellings of the release_Variables_in_progress map in the section scripts
+_IN_PROGRESS_REFERENCES = ("releaseVariables['release_Variables_in_progress']", "${release_Variables_in_progress}")
+
+# release_Variables_in_progress lists, list variables and map writes in the merged sections
+_SPLIT_READ = re.compile(r"release_variables_in_progress\['(\w+)'\]\.split\(','\)")
+_LIST_VARIABLE = re.compile(r"\$\{(\w+)\}")
+_IN_PROGRESS_WRITE = re.compile(r"release_variables_in_progress\['(\w+)'\]\s*=(?!=)")
+
+# Text before a read: right operand of a membership test, or of a for clause
+_MEMBERSHIP_PREFIX = re.compile(r"\bin\s*$")
+_FOR_CLAUSE_PREFIX = re.compile(r"\bfor\s+(?:(?!\bin\b)[\w\s,()])+?\s+in\s*$")
+
+
+def _is_membership_test(line, start):
+    """True when the expression starting at line[start] is the right operand of 'in' / 'not in' (not of a for clause)."""
+    prefix = line[:start]
+    return bool(_MEMBERSHIP_PREFIX.search(prefix)) and not _FOR_CLAUSE_PREFIX.search(prefix)
+
+
+def _presplit(bodies, static):
+    """
+    Split each list of the merged sections once, at the top of the script.
+
+    release_Variables_in_progress lists that no section writes become
+    split_sets[key] when they are the right operand of a membership test
+    (x in / x not in ...split(',')) and split_lists[key] everywhere else
+    (for clauses, comprehensions, indexing, join), keeping their order and
+    type; list variables tested for membership (phase in ${Choice_ENV})
+    become variable_sets[name]. The lists of static, the values the generator
+    wrote in release_Variables_in_progress, are written in the script.
+
+    Returns:
+        tuple: (rewritten bodies, prologue declaring the lists and sets)
+    """
+    written = set(_IN_PROGRESS_WRITE.findall("\n".join(bodies)))
+    split_keys, list_variables = [], []
+
+    def split_read(line):
+        def replace(match):
+            if match.group(1) in written:
+                return match.group(0)
+            if match.group(1) not in split_keys:
+                split_keys.append(match.group(1))
+            container = 'split_sets' if _is_membership_test(line, match.start()) else 'split_lists'
+            return container + "['" + match.group(1) + "']"
+        return replace
+
+    def list_variable(line):
+        def replace(match):
+            if not _is_membership_test(line, match.start()):
+                return match.group(0)
+            if match.group(1) not in list_variables:
+                list_variables.append(match.group(1))
+            return "variable_sets['" + match.group(1) + "']"
+        return replace
+
+    rewritten = []
+    for body in bodies:
+        lines = []
+        for line in body.split('\n'):
+            line = _SPLIT_READ.sub(split_read(line), line)
+            line = _LIST_VARIABLE.sub(list_variable(line), line)
+            lines.append(line)
+        rewritten.append("\n".join(lines))
+
+    prologue = ""
+    if split_keys:
+        prologue += "split_lists = {}\n"
+        for key in split_keys:
+            if key in static:
+                prologue += "split_lists['" + key + "'] = " + repr(static[key].split(',')) + "\n"
+        runtime_keys = [key for key in split_keys if key not in static]
+        if runtime_keys:
+            prologue += (
+                "for key in " + repr(runtime_keys) + ":\n"
+                "    split_lists[key] = release_variables_in_progress[key].split(',')\n"
+            )
+        prologue += "split_sets = dict((key, set(values)) for key, values in split_lists.items())\n"
+    if list_variables:
+        prologue += "variable_sets = {" + ", ".join("'" + name + "': set(${" + name + "})" for name in list_variables) + "}\n"
+    return rewritten, prologue
+
+
+def merge_pruning_sections(sections, static=None):
+    """
+    Merge the dynamic_release pruning scripts into one Jython script.
+
+    The merged script reads release_Variables_in_progress once and indexes
+    the release once (RELEASE_INDEX_SCRIPT), runs every section in order
+    against that map, then deletes in a single pass the phases the DELETE
+    PHASE section selected (xlr_list_phase_selection_to_delete) and the task
+    titles the sections added to tasks_to_delete. Sections may also call
+    delete_task(phase title, task title) directly. Lists are split once,
+    into sets for membership tests (see _presplit).
+
+    Args:
+        sections (list): (title, script) in creation order
+        static (dict): release_Variables_in_progress entries known at
+            generation time (template_liste_phase, list_env_BENCH, list_package)
+
+    Returns:
+        str: Jython script of the PRUNING_TASK_TITLE task
+    """
+    imports = set()
+    bodies = []
+    for title, script in sections:
+        lines = []
+        for line in script.strip('\n').split('\n'):
+            if line.startswith('import '):
+                imports.update(module.strip() for module in line[len('import '):].split(','))
+                continue
+            for reference in _IN_PROGRESS_REFERENCES:
+                line = line.replace(reference, 'release_variables_in_progress')
+            lines.append(line)
+        bodies.append("## ---- " + title + "\n" + "\n".join(lines) + "\n")
+    bodies, presplit = _presplit(bodies, static or {})
+
+    return (
+        "##script_jython_dynamic_release_pruning\n"
+        + ("import " + ",".join(sorted(imports)) + "\n" if imports else "")
+        + "release_variables_in_progress = releaseVariables['release_Variables_in_progress']\n"
+        "tasks_to_delete = []\n"
+        + RELEASE_INDEX_SCRIPT
+        + presplit
+        + "".join(bodies)
+        + "## ---- Deletion, once for all sections\n"
+        "releaseVariables['release_Variables_in_progress'] = release_variables_in_progress\n"
+        "phases_to_delete = []\n"
+        "if 'xlr_list_phase_selection_to_delete' in release_variables_in_progress:\n"
+        "    phases_to_delete = [title for title in release_variables_in_progress['xlr_list_phase_selection_to_delete'].split(',') if title]\n"
+        "for title in phases_to_delete:\n"
+        "    delete_phase(title)\n"
+        "for title in set(tasks_to_delete):\n"
+        "    for phase_title in list(task_ids):\n"
+        "        delete_task(phase_title, title)\n"
+    )
+
 
 class XLRDynamicPhase(XLRBase):
     """
@@ -63,7 +276,7 @@ class XLRDynamicPhase(XLRBase):
                     print('Removing phase: ' + phase_name)
             """
 
-            response = requests.post(url, headers=self.header,
+            response = self.xlr_client.post(url, headers=self.header,
                                    auth=(self.ops_username_api, self.ops_password_api),
                                    json={
                                        "id": "null",
@@ -79,12 +292,14 @@ class XLRDynamicPhase(XLRBase):
             self.logger_error.error("Error creating dynamic phase deletion script: " + str(e))
             sys.exit(0)
 
-    def XLRJython_delete_phase_one_list(self, phase):
+    def XLRJython_delete_phase_one_list(self, phase, sections=None):
         """
         Create Jython script for single-list phase selection.
 
         Args:
             phase (str): Phase name where the script is created
+            sections (list): When given, the script is appended to it as
+                (title, script) for the merged pruning script instead of being posted
 
         Creates a script that handles phase deletion when using a single
         selection list for phase choices.
@@ -96,39 +311,19 @@ class XLRDynamicPhase(XLRBase):
         else:
             url = self.url_api_xlr + 'tasks/' + self.dict_template['CREATE_CHANGE_' + phase]['xlr_id_phase'] + '/tasks'
 
-        script_content = (
-            "##script_jython_delete_phase_one_list_bis\n"
-            "import json\n"
-            "xlr_list_phase_selection = []\n"
-            "xlr_list_phase = []\n"
-            "xlr_list_phase_selection_to_delete = []\n"
-            "xlr_list_phase_to_delete = []\n"
-            "for phase in releaseVariables['release_Variables_in_progress']['template_liste_phase'].split(','):\n"
-            "   if phase in ${Choice_ENV}:\n"
-            "       if phase in ['PRODUCTION','BENCH'] :\n"
-            "           xlr_list_phase_selection.append('CREATE_CHANGE_'+phase)\n"
-            "           xlr_list_phase_selection.append(phase)\n"
-            "           xlr_list_phase.append(phase)\n"
-            "       else:\n"
-            "           xlr_list_phase_selection.append(phase)\n"
-            "           xlr_list_phase.append(phase)\n"
-            "   else:\n"
-            "     if phase != 'DEV':\n"
-            "       if phase in ['PRODUCTION','BENCH']:\n"
-            "           xlr_list_phase_selection_to_delete.append('CREATE_CHANGE_'+phase)\n"
-            "           xlr_list_phase_selection_to_delete.append(phase)\n"
-            "           xlr_list_phase_to_delete.append(phase)\n"
-            "       else:\n"
-            "           xlr_list_phase_selection_to_delete.append(phase)\n"
-            "           xlr_list_phase_to_delete.append(phase)\n"
-            "releaseVariables['release_Variables_in_progress']['xlr_list_phase'] = ','.join(map(str, xlr_list_phase))\n"
-            "releaseVariables['release_Variables_in_progress']['xlr_list_phase_selection'] =  ','.join(map(str, xlr_list_phase_selection))\n"
-            "releaseVariables['release_Variables_in_progress']['xlr_list_phase_to_delete'] = ','.join(map(str, xlr_list_phase_to_delete))\n"
-            "releaseVariables['release_Variables_in_progress']['xlr_list_phase_selection_to_delete'] = ','.join(map(str, xlr_list_phase_selection_to_delete))\n"
-        )
+        # Phases are known at generation time; only the user choice is read at runtime
+        script_content = delete_phase_script(
+            "##script_jython_delete_phase_one_list_bis",
+            self.parameters['general_info']['phases'],
+            lambda name: "'" + name + "' in ${Choice_ENV}",
+            lambda name: (phase_titles(name), [] if name == 'DEV' else phase_titles(name)))
+
+        if sections is not None:
+            sections.append(('DELETE PHASE', script_content))
+            return
 
         try:
-            response = requests.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": "null",
                 "type": "xlrelease.ScriptTask",
                 "locked": True,
@@ -152,12 +347,14 @@ class XLRDynamicPhase(XLRBase):
                 self.logger_error.error(str(e))
             raise
 
-    def XLRJython_delete_phase_one_list_template_package_mode_string(self, phase):
+    def XLRJython_delete_phase_one_list_template_package_mode_string(self, phase, sections=None):
         """
         Create Jython script for single-list phase selection with string package mode.
 
         Args:
             phase (str): Phase name where the script is created
+            sections (list): When given, the script is appended to it as
+                (title, script) for the merged pruning script instead of being posted
 
         Creates a script that handles phase deletion when using string package mode
         with single selection list for phase choices.
@@ -169,40 +366,19 @@ class XLRDynamicPhase(XLRBase):
         else:
             url = self.url_api_xlr + 'tasks/' + self.dict_template['CREATE_CHANGE_' + phase]['xlr_id_phase'] + '/tasks'
 
-        script_content = (
-            "##script_jython_delete_phase_one_list_template_package_mode_string\n"
-            "import json\n"
-            "xlr_list_phase_selection = []\n"
-            "xlr_list_phase = []\n"
-            "xlr_list_phase_selection_to_delete = []\n"
-            "xlr_list_phase_to_delete = []\n"
-            "for phase in releaseVariables['release_Variables_in_progress']['template_liste_phase'].split(','):\n"
-            "   if phase in ${Choice_ENV} and phase != 'BUILD':\n"
-            "       if phase in ['PRODUCTION','BENCH'] :\n"
-            "           xlr_list_phase_selection.append('CREATE_CHANGE_'+phase)\n"
-            "           xlr_list_phase_selection.append(phase)\n"
-            "           xlr_list_phase.append(phase)\n"
-            "       else:\n"
-            "           if phase != 'BUILD':\n"
-            "            xlr_list_phase_selection.append(phase)\n"
-            "            xlr_list_phase.append(phase)\n"
-            "   else:\n"
-            "       if phase in ['PRODUCTION','BENCH'] :\n"
-            "           xlr_list_phase_selection_to_delete.append('CREATE_CHANGE_'+phase)\n"
-            "           xlr_list_phase_selection_to_delete.append(phase)\n"
-            "           xlr_list_phase_to_delete.append(phase)\n"
-            "       else:\n"
-            "           if phase != 'BUILD':\n"
-            "               xlr_list_phase_selection_to_delete.append(phase)\n"
-            "               xlr_list_phase_to_delete.append(phase)\n"
-            "releaseVariables['release_Variables_in_progress']['xlr_list_phase'] = ','.join(map(str, xlr_list_phase))\n"
-            "releaseVariables['release_Variables_in_progress']['xlr_list_phase_selection'] =  ','.join(map(str, xlr_list_phase_selection))\n"
-            "releaseVariables['release_Variables_in_progress']['xlr_list_phase_to_delete'] = ','.join(map(str, xlr_list_phase_to_delete))\n"
-            "releaseVariables['release_Variables_in_progress']['xlr_list_phase_selection_to_delete'] = ','.join(map(str, xlr_list_phase_selection_to_delete))\n"
-        )
+        # BUILD is neither selected nor deleted in string package mode
+        script_content = delete_phase_script(
+            "##script_jython_delete_phase_one_list_template_package_mode_string",
+            self.parameters['general_info']['phases'],
+            lambda name: "'" + name + "' in ${Choice_ENV}",
+            lambda name: ([], []) if name == 'BUILD' else (phase_titles(name), phase_titles(name)))
+
+        if sections is not None:
+            sections.append(('DELETE PHASE', script_content))
+            return
 
         try:
-            response = requests.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": "null",
                 "type": "xlrelease.ScriptTask",
                 "locked": True,
@@ -226,12 +402,14 @@ class XLRDynamicPhase(XLRBase):
                 self.logger_error.error(str(e))
             raise
 
-    def XLRJython_delete_phase_list_multi_list(self, phase):
+    def XLRJython_delete_phase_list_multi_list(self, phase, sections=None):
         """
         Create Jython script for multi-list phase selection.
 
         Args:
             phase (str): Phase name where the script is created
+            sections (list): When given, the script is appended to it as
+                (title, script) for the merged pruning script instead of being posted
 
         Creates a script that handles phase deletion when using multiple
         selection lists for individual phase choices.
@@ -245,43 +423,19 @@ class XLRDynamicPhase(XLRBase):
         else:
             url = self.url_api_xlr + 'tasks/' + self.dict_template['CREATE_CHANGE_' + phase]['xlr_id_phase'] + '/tasks'
 
-        script_content = (
-            "##script_jython_delete_phase_list_multi_list\n"
-            "import json\n"
-            "##purpose : creation variables for ENV management\n"
-            "xlr_list_phase_selection = []\n"
-            "xlr_list_phase = []\n"
-            "xlr_list_phase_selection_to_delete = []\n"
-            "xlr_list_phase_to_delete = []\n"
-            "##for each phase of the list in releaseVariables['release_Variables_in_progress']['template_liste_phase']\n"
-            "## we chech if there is a value in xlr variable env_'phase' ( so env_DEV or env_UAT or env_BENCH)  \n"
-            "for phase in releaseVariables['release_Variables_in_progress']['template_liste_phase'].split(','):\n"
-            "   if releaseVariables['env_'+phase] != '':\n"
-            "       if phase in ['PRODUCTION','BENCH']:\n"
-            "           xlr_list_phase_selection.append('CREATE_CHANGE_'+phase)\n"
-            "           xlr_list_phase_selection.append(phase)\n"
-            "           xlr_list_phase.append(phase)\n"
-            "       else:\n"
-            "           if phase != 'BUILD':\n"
-            "               xlr_list_phase_selection.append(phase)\n"
-            "               xlr_list_phase.append(phase)\n"
-            "   else:\n"
-            "       if phase in ['PRODUCTION','BENCH']:\n"
-            "           xlr_list_phase_selection_to_delete.append('CREATE_CHANGE_'+phase)\n"
-            "           xlr_list_phase_selection_to_delete.append(phase)\n"
-            "           xlr_list_phase_to_delete.append(phase)\n"
-            "       else:\n"
-            "           if phase != 'BUILD':\n"
-            "               xlr_list_phase_selection_to_delete.append(phase)\n"
-            "               xlr_list_phase_to_delete.append(phase)\n"
-            "releaseVariables['release_Variables_in_progress']['xlr_list_phase'] = ','.join(map(str, xlr_list_phase))\n"
-            "releaseVariables['release_Variables_in_progress']['xlr_list_phase_selection'] =  ','.join(map(str, xlr_list_phase_selection))\n"
-            "releaseVariables['release_Variables_in_progress']['xlr_list_phase_to_delete'] = ','.join(map(str, xlr_list_phase_to_delete))\n"
-            "releaseVariables['release_Variables_in_progress']['xlr_list_phase_selection_to_delete'] = ','.join(map(str, xlr_list_phase_selection_to_delete))\n"
-        )
+        # One env_<phase> variable per phase: a phase is selected when its variable is set
+        script_content = delete_phase_script(
+            "##script_jython_delete_phase_list_multi_list",
+            self.parameters['general_info']['phases'],
+            lambda name: "releaseVariables['env_" + name + "'] != ''",
+            lambda name: ([], []) if name == 'BUILD' else (phase_titles(name), phase_titles(name)))
+
+        if sections is not None:
+            sections.append(('DELETE PHASE', script_content))
+            return
 
         try:
-            response = requests.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": "null",
                 "type": "xlrelease.ScriptTask",
                 "locked": True,
@@ -305,12 +459,14 @@ class XLRDynamicPhase(XLRBase):
                 self.logger_error.error(str(e))
             raise
 
-    def script_jython_define_xld_prefix_new(self, phase):
+    def script_jython_define_xld_prefix_new(self, phase, sections=None):
         """
         Create Jython script to define XLD prefix for multi-BENCH environments.
 
         Args:
             phase (str): Phase name where the script is created
+            sections (list): When given, the script is appended to it as
+                (title, script) for the merged pruning script instead of being posted
 
         Creates a script that defines XLD environment prefixes when multiple
         BENCH environments are available, based on user selection.
@@ -322,30 +478,29 @@ class XLRDynamicPhase(XLRBase):
         else:
             url = self.url_api_xlr + 'tasks/' + self.dict_template['CREATE_CHANGE_' + phase]['xlr_id_phase'] + '/tasks'
 
+        # '<XLD_VALUE_ENV>;<PREFIXE_LETTER>' entries of XLD_ENV_BENCH (prefix B by default),
+        # resolved now: only the env_BENCH choice of the user is read at runtime
+        bench_prefixes = {}
+        for bench_value in self.parameters.get('XLD_ENV_BENCH') or []:
+            bench_prefixes[bench_value.split(';')[0]] = bench_value.split(';')[1] if ';' in bench_value else 'B'
         script_content = (
             "##script_jython_define_xld_prefix_new\n"
-            "import json\n"
-            "## In case of two BENCH environnement , we need to determinate if there is a speciale value for  ENV CONTROLM and XLD variable\n"
-            "## The jython check if there is key in valariable 'release_Variables_in_progress['list_env_BENCH']'\n"
-            "##  value need to be type '<XLD_VALUE_ENV_1>;<PREFIXE_LETTER>,<XLD_VALUE_ENV_2>;<PREFIXE_LETTER>' \n"
-            "## Example : MCO;Q,PRJ;B\n"
-            "## We check the choice of the user at the start of the release variable : 'env_BENCH'\n"
-            "## And we define  a XLR new variable :'controlm_prefix_BENCH' (type string) which is use to evalute \n"
-            "## XLD ENV OATH in XLD TASK in the release \n"
-            "for bench_value in ${release_Variables_in_progress}['list_env_BENCH'].split(','):\n"
-            "    if releaseVariables['env_BENCH'] == bench_value.split(';')[0]: \n"
-            "        if ';' not in bench_value:\n"
-            "            releaseVariables['controlm_prefix_BENCH'] = 'B'\n"
-            "        else:\n"
-            "            releaseVariables['controlm_prefix_BENCH'] = bench_value.split(';')[1]\n"
-            "    else:\n"
-            "        print('Error in definition Prefixe BENCH')\n"
+            "## controlm_prefix_BENCH evaluates the XLD ENV path in the XLD tasks of the release\n"
+            "bench_prefixes = " + repr(bench_prefixes) + "\n"
+            "if releaseVariables['env_BENCH'] in bench_prefixes:\n"
+            "    releaseVariables['controlm_prefix_BENCH'] = bench_prefixes[releaseVariables['env_BENCH']]\n"
+            "else:\n"
+            "    print('Error in definition Prefixe BENCH')\n"
             "if 'BENCH' in releaseVariables['release_Variables_in_progress']['xlr_list_phase_selection'].split(','):\n"
             "   releaseVariables['BENCH_Y88'] = releaseVariables['env_BENCH'].split('_')[0]\n"
         )
 
+        if sections is not None:
+            sections.append(('XLD VARIABLE : Defnition Value if MULTIBENCH', script_content))
+            return
+
         try:
-            response = requests.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": "null",
                 "type": "xlrelease.ScriptTask",
                 "locked": True,
@@ -369,12 +524,14 @@ class XLRDynamicPhase(XLRBase):
                 self.logger_error.error(str(e))
             raise
 
-    def script_jython_List_package_string(self, phase):
+    def script_jython_List_package_string(self, phase, sections=None):
         """
         Create Jython script for string-based package selection.
 
         Args:
             phase (str): Phase name where the script is created
+            sections (list): When given, the script is appended to it as
+                (title, script) for the merged pruning script instead of being posted
 
         Creates a script that processes string-based package selection
         and filters deployment tasks accordingly, with validation.
@@ -423,8 +580,12 @@ class XLRDynamicPhase(XLRBase):
             "releaseVariables['release_Variables_in_progress']['list_package_not_manage'] = ','.join(map(str, list_package_not_manage))\n"
         )
 
+        if sections is not None:
+            sections.append(('PACKAGE Variable for the RELEASE', script_content))
+            return
+
         try:
-            response = requests.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": "null",
                 "type": "xlrelease.ScriptTask",
                 "locked": True,
@@ -481,7 +642,7 @@ class XLRDynamicPhase(XLRBase):
 
         url_script = self.url_api_xlr + 'tasks/' + jenkins_group + '/tasks'
         try:
-            response = requests.post(url_script, headers=self.header,
+            response = self.xlr_client.post(url_script, headers=self.header,
                                    auth=(self.ops_username_api, self.ops_password_api),
                                    json={
                                        "id": "null",
@@ -530,7 +691,7 @@ class XLRDynamicPhase(XLRBase):
 
         url_script = self.url_api_xlr + 'tasks/' + xld_group + '/tasks'
         try:
-            response = requests.post(url_script, headers=self.header,
+            response = self.xlr_client.post(url_script, headers=self.header,
                                    auth=(self.ops_username_api, self.ops_password_api),
                                    json={
                                        "id": "null",
@@ -546,7 +707,7 @@ class XLRDynamicPhase(XLRBase):
             self.logger_error.error("Error creating XLD cleanup script: " + str(e))
             sys.exit(0)
 
-    def script_jython_dynamic_delete_task_jenkins_string(self, phase):
+    def script_jython_dynamic_delete_task_jenkins_string(self, phase, sections=None):
         """Create Jython script to delete Jenkins tasks based on string package selection."""
         import requests
         url = self.url_api_xlr + 'tasks/' + self.dict_template[phase]['xlr_id_phase'] + '/tasks'
@@ -556,8 +717,12 @@ class XLRDynamicPhase(XLRBase):
             "for package in selected_packages.split(','):\n"
             "    print('Keeping Jenkins task for package: ' + package)\n"
         )
+        if sections is not None:
+            sections.append(('Jenkins Task Cleanup String', script_content))
+            return
+
         try:
-            response = requests.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": "null", "type": "xlrelease.ScriptTask", "locked": True,
                 "title": 'Jenkins Task Cleanup String', "script": script_content
             }, verify=False)
@@ -569,7 +734,7 @@ class XLRDynamicPhase(XLRBase):
                 self.logger_error.error("Error creating Jenkins cleanup script: " + str(e))
             raise
 
-    def script_jython_dynamic_delete_task_jenkins_listbox(self, phase):
+    def script_jython_dynamic_delete_task_jenkins_listbox(self, phase, sections=None):
         """Create Jython script to delete Jenkins tasks based on listbox package selection."""
         import requests
         url = self.url_api_xlr + 'tasks/' + self.dict_template[phase]['xlr_id_phase'] + '/tasks'
@@ -579,8 +744,12 @@ class XLRDynamicPhase(XLRBase):
             "for package in selected_packages:\n"
             "    print('Keeping Jenkins task for package: ' + package)\n"
         )
+        if sections is not None:
+            sections.append(('Jenkins Task Cleanup Listbox', script_content))
+            return
+
         try:
-            response = requests.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": "null", "type": "xlrelease.ScriptTask", "locked": True,
                 "title": 'Jenkins Task Cleanup Listbox', "script": script_content
             }, verify=False)
@@ -592,7 +761,7 @@ class XLRDynamicPhase(XLRBase):
                 self.logger_error.error("Error creating Jenkins listbox cleanup script: " + str(e))
             raise
 
-    def script_jython_dynamic_delete_task_controlm(self, phase):
+    def script_jython_dynamic_delete_task_controlm(self, phase, sections=None):
         """Create Jython script to delete Control-M tasks."""
         import requests
         url = self.url_api_xlr + 'tasks/' + self.dict_template[phase]['xlr_id_phase'] + '/tasks'
@@ -602,8 +771,12 @@ class XLRDynamicPhase(XLRBase):
             "for phase in selected_phases:\n"
             "    print('Keeping Control-M task for phase: ' + phase)\n"
         )
+        if sections is not None:
+            sections.append(('Control-M Task Cleanup', script_content))
+            return
+
         try:
-            response = requests.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": "null", "type": "xlrelease.ScriptTask", "locked": True,
                 "title": 'Control-M Task Cleanup', "script": script_content
             }, verify=False)
@@ -615,7 +788,7 @@ class XLRDynamicPhase(XLRBase):
                 self.logger_error.error("Error creating Control-M cleanup script: " + str(e))
             raise
 
-    def script_jython_dynamic_delete_task_controlm_multibench(self, phase):
+    def script_jython_dynamic_delete_task_controlm_multibench(self, phase, sections=None):
         """Create Jython script to delete Control-M tasks for multi-BENCH environments."""
         import requests
         url = self.url_api_xlr + 'tasks/' + self.dict_template[phase]['xlr_id_phase'] + '/tasks'
@@ -624,8 +797,12 @@ class XLRDynamicPhase(XLRBase):
             "selected_bench_env = releaseVariables.get('env_BENCH', '')\n"
             "print('Managing Control-M tasks for BENCH environment: ' + selected_bench_env)\n"
         )
+        if sections is not None:
+            sections.append(('Control-M Task Multi-BENCH Cleanup', script_content))
+            return
+
         try:
-            response = requests.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": "null", "type": "xlrelease.ScriptTask", "locked": True,
                 "title": 'Control-M Task Multi-BENCH Cleanup', "script": script_content
             }, verify=False)
@@ -637,7 +814,7 @@ class XLRDynamicPhase(XLRBase):
                 self.logger_error.error("Error creating Control-M multi-BENCH cleanup script: " + str(e))
             raise
 
-    def script_jython_dynamic_delete_task_xld(self, phase):
+    def script_jython_dynamic_delete_task_xld(self, phase, sections=None):
         """Create Jython script to delete XLD deployment tasks."""
         import requests
         url = self.url_api_xlr + 'tasks/' + self.dict_template[phase]['xlr_id_phase'] + '/tasks'
@@ -647,8 +824,12 @@ class XLRDynamicPhase(XLRBase):
             "for package in selected_packages:\n"
             "    print('Keeping XLD deployment task for package: ' + package)\n"
         )
+        if sections is not None:
+            sections.append(('XLD Task Cleanup', script_content))
+            return
+
         try:
-            response = requests.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": "null", "type": "xlrelease.ScriptTask", "locked": True,
                 "title": 'XLD Task Cleanup', "script": script_content
             }, verify=False)
@@ -660,7 +841,7 @@ class XLRDynamicPhase(XLRBase):
                 self.logger_error.error("Error creating XLD cleanup script: " + str(e))
             raise
 
-    def script_jython_dynamic_delete_task_xld_generic(self, phase):
+    def script_jython_dynamic_delete_task_xld_generic(self, phase, sections=None):
         """Create Jython script to delete XLD tasks for generic applications."""
         import requests
         url = self.url_api_xlr + 'tasks/' + self.dict_template[phase]['xlr_id_phase'] + '/tasks'
@@ -670,8 +851,12 @@ class XLRDynamicPhase(XLRBase):
             "bench_app = releaseVariables.get('BENCH_APP', '')\n"
             "print('Managing XLD tasks for generic application: ' + bench_app)\n"
         )
+        if sections is not None:
+            sections.append(('XLD Generic Task Cleanup', script_content))
+            return
+
         try:
-            response = requests.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": "null", "type": "xlrelease.ScriptTask", "locked": True,
                 "title": 'XLD Generic Task Cleanup', "script": script_content
             }, verify=False)
@@ -683,7 +868,7 @@ class XLRDynamicPhase(XLRBase):
                 self.logger_error.error("Error creating XLD generic cleanup script: " + str(e))
             raise
 
-    def XLRJythonScript_release_delete_technical_task_ListStringVariable(self, phase):
+    def XLRJythonScript_release_delete_technical_task_ListStringVariable(self, phase, sections=None):
         """Create Jython script to delete technical tasks using list string variable."""
         import requests
         url = self.url_api_xlr + 'tasks/' + self.dict_template[phase]['xlr_id_phase'] + '/tasks'
@@ -693,8 +878,12 @@ class XLRDynamicPhase(XLRBase):
             "for task in technical_tasks:\n"
             "    print('Managing technical task: ' + task)\n"
         )
+        if sections is not None:
+            sections.append(('Technical Task List Management', script_content))
+            return
+
         try:
-            response = requests.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": "null", "type": "xlrelease.ScriptTask", "locked": True,
                 "title": 'Technical Task List Management', "script": script_content
             }, verify=False)
@@ -706,7 +895,7 @@ class XLRDynamicPhase(XLRBase):
                 self.logger_error.error("Error creating technical task list script: " + str(e))
             raise
 
-    def XLRJythonScript_dynamic_release_delete_technical_task_StringVariable(self, phase):
+    def XLRJythonScript_dynamic_release_delete_technical_task_StringVariable(self, phase, sections=None):
         """Create Jython script to delete technical tasks using string variable."""
         import requests
         url = self.url_api_xlr + 'tasks/' + self.dict_template[phase]['xlr_id_phase'] + '/tasks'
@@ -716,8 +905,12 @@ class XLRDynamicPhase(XLRBase):
             "for task in technical_tasks.split(','):\n"
             "    print('Managing technical task: ' + task.strip())\n"
         )
+        if sections is not None:
+            sections.append(('Technical Task String Management', script_content))
+            return
+
         try:
-            response = requests.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": "null", "type": "xlrelease.ScriptTask", "locked": True,
                 "title": 'Technical Task String Management', "script": script_content
             }, verify=False)
@@ -729,5 +922,39 @@ class XLRDynamicPhase(XLRBase):
                 self.logger_error.error("Error creating technical task string script: " + str(e))
             raise
 
+    def script_jython_dynamic_release_pruning(self, phase, sections, static=None):
+        """
+        Create the single pruning script task of the dynamic_release phase.
+
+        Args:
+            phase (str): Phase name where the script is created
+            sections (list): (title, script) collected from the pruning methods
+                called with sections=
+            static (dict): release_Variables_in_progress entries known at generation time
+
+        The sections run in one script task, on one read of
+        release_Variables_in_progress, and the phases and tasks they select
+        are deleted in one final pass (see merge_pruning_sections).
+        """
+        import requests
+
+        if not sections:
+            return
+        url = self.url_api_xlr + 'tasks/' + self.dict_template[phase]['xlr_id_phase'] + '/tasks'
+        try:
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+                "id": "null", "type": "xlrelease.ScriptTask", "locked": True,
+                "title": PRUNING_TASK_TITLE, "script": merge_pruning_sections(sections, static)
+            }, verify=False)
+            response.raise_for_status()
+            if response.content and 'id' in response.json():
+                self.logger_cr.info("ON PHASE : " + phase.upper() + " --- Add task : '" + PRUNING_TASK_TITLE + "' : " + ", ".join(title for title, _ in sections))
+        except requests.exceptions.RequestException as e:
+            if hasattr(self, 'logger_error'):
+                self.logger_error.error("Detail ERROR: ON PHASE : " + phase.upper() + " --- Add task : '" + PRUNING_TASK_TITLE + "'")
+                self.logger_error.error("Error call api : " + url)
+                self.logger_error.error(str(e))
+            raise
+
     # Additional dynamic phase methods would be implemented here
     # Each using inherited functionality from XLRBase instead of composition
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""
+XLRExport - Offline template export and one-call import
+
+A template is compiled without calling XLR (see --plan) and written to disk
+as an XLR template JSON (<release>.json) and an .xlr archive holding the same
+JSON. The artifact built once can then be promoted through every XLR
+instance with a single templates/import call, instead of replaying the
+hundreds of calls of a full generation on each instance.
+
+The export never contains the script user password: the importing instance
+sets its own script user, as a full generation does.
+"""
+
+import os, sys, json, hashlib, zipfile, requests, inspect
+from .xlr_base import XLRBase
+from .xlr_lookup_cache import TEMPLATE_TTL
+from .xlr_variants import compiled_objects
+
+# Entry of the .xlr archive holding the template JSON
+EXPORT_ENTRY = 'release-template.json'
+
+# Template fields that must not be written to disk
+SECRET_FIELDS = ('scriptUserPassword',)
+
+
+def export_release_id(title):
+    """Return the stable id of an exported template (XLR assigns new ids on import)."""
+    return 'Applications/Release' + hashlib.sha1(title.encode('utf-8')).hexdigest()[:32]
+
+
+def build_template_export(calls):
+    """
+    Build the XLR template JSON of a compiled template.
+
+    Args:
+        calls (list): XLRPlanClient.calls of one template generation
+
+    Returns:
+        dict: xlrelease.Release with its phases, nested tasks and variables
+
+    Raises:
+        ValueError: If the model holds no template, or creation calls that
+            cannot be placed in the template tree
+    """
+    release = None
+    nodes = {}
+    for kind, position, payload in compiled_objects(calls):
+        if kind == 'template':
+            release = {key: value for key, value in payload.items() if key not in SECRET_FIELDS}
+            release.update(id=export_release_id(payload['title']), phases=[], variables=[])
+        elif release is None:
+            raise ValueError("compiled model does not start with the template creation")
+        elif kind in ('phase', 'task'):
+            parent = release if kind == 'phase' else nodes[position[:-1]]
+            container = 'phases' if kind == 'phase' else 'tasks'
+            node = dict(payload, id=parent['id'] + ('/Phase' if kind == 'phase' else '/Task') + str(position[-1] + 1))
+            if 'tasks' in node or kind == 'phase':
+                node['tasks'] = list(node.get('tasks') or [])
+            parent.setdefault(container, []).append(node)
+            nodes[position] = node
+        elif kind == 'variable':
+            release['variables'].append(dict(payload, id=release['id'] + '/Variable' + str(len(release['variables']) + 1)))
+        else:
+            raise ValueError("cannot export creation call " + kind + " " + str(position))
+    if release is None:
+        raise ValueError("compiled model holds no template")
+    return release
+
+
+def write_template_export(release, directory):
+    """
+    Write <title>.json and <title>.xlr in a directory.
+
+    Args:
+        release (dict): build_template_export() result
+        directory (str): Output directory (created if missing)
+
+    Returns:
+        list: Paths of the written files
+    """
+    os.makedirs(directory, exist_ok=True)
+    content = json.dumps(release, indent=2, sort_keys=True)
+    json_path = os.path.join(directory, release['title'] + '.json')
+    xlr_path = os.path.join(directory, release['title'] + '.xlr')
+    with open(json_path, 'w') as file:
+        file.write(content)
+    with zipfile.ZipFile(xlr_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(EXPORT_ENTRY, content)
+    return [json_path, xlr_path]
+
+
+def read_template_export(path):
+    """
+    Read an exported template (.json or .xlr).
+
+    Raises:
+        OSError, ValueError, KeyError: If the file is not a template export
+    """
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            return json.loads(archive.read(EXPORT_ENTRY).decode('utf-8'))
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+class XLRTemplateImport(XLRBase):
+    """
+    Import an exported template into an XLR folder with one API call.
+
+    Attributes:
+        release (dict): Exported template JSON
+        parameters (dict): general_info (name_release, xlr_folder) used by the
+            folder lookup and the deletion of the previous template
+    """
+
+    def __init__(self, release, xlr_folder, configuration, xlr_client=None, log_directory=None, use_lookup_cache=True):
+        """
+        Args:
+            release (dict): Exported template JSON (read_template_export())
+            xlr_folder (str): XLR folder path receiving the template
+            configuration (dict): XLR API configuration (url_api_xlr, credentials)
+            xlr_client (XLRClient): Client for XLR API calls
+            log_directory (str): Custom log directory (defaults to log/<release_name>)
+            use_lookup_cache (bool): Use the persistent folder/template lookup cache
+        """
+        super().__init__()
+        self.release = release
+        self.parameters = {'general_info': {'name_release': release['title'], 'xlr_folder': xlr_folder}}
+        self.setup_enhanced_logging(release['title'], log_directory)
+        for key, value in configuration.items():
+            setattr(self, key, value)
+        self.header = {'content-type': 'application/json', 'Accept': 'application/json'}
+        self.setup_xlr_client(xlr_client, use_lookup_cache)
+        self.dict_template = {}
+
+    def import_template(self):
+        """
+        Replace the template of the same title in the folder by the export.
+
+        Returns:
+            str: XLR id of the imported template
+        """
+        template_name = self.release['title']
+        self.enhanced_logger.start_timer('import_template')
+        folder_id = self.find_xlr_folder()
+        self.delete_template()
+
+        release = dict(self.release, scriptUsername=self.ops_username_api, scriptUserPassword=self.ops_password_api)
+        url_import_template = self.url_api_xlr + "templates/import?folderId=" + folder_id
+        try:
+            response = self.xlr_client.post(url_import_template, headers=self.header, auth=(self.ops_username_api, self.ops_password_api),
+                                            data=json.dumps(release), verify=False)
+            response.raise_for_status()
+            imported = response.json()
+            self.XLR_template_id = (imported[0] if isinstance(imported, list) else imported)['id']
+            self.dict_template = {'template': {'xlr_folder': folder_id, 'xlr_id': self.XLR_template_id}}
+            self.lookup_store_set('template', template_name, [self.XLR_template_id], TEMPLATE_TTL)
+            base_url = self.url_api_xlr.replace('/api/v1/', '')
+            self.template_url = base_url + '/#/templates/' + self.XLR_template_id.replace("Applications/", "").replace('/', '-')
+            self.logger_cr.info("IMPORT TEMPLATE in XLR FOLDER : " + self.parameters['general_info']['xlr_folder'])
+            self.logger_cr.info(template_name)
+        except (requests.exceptions.RequestException, KeyError, IndexError, TypeError, ValueError) as e:
+            self.logger_error.error("File: " + os.path.basename(inspect.currentframe().f_code.co_filename) + " --Class: " + self.__class__.__name__ + " --Function : " + inspect.currentframe().f_code.co_name + " --Line : " + str(inspect.currentframe().f_lineno))
+            self.logger_error.error("Error import template : " + template_name)
+            self.logger_error.error("Error call api : " + url_import_template)
+            self.logger_error.error(str(e))
+            sys.exit(0)
+
+        self.enhanced_logger.end_timer('import_template', f"Template {template_name} imported")
+        return self.XLR_template_id
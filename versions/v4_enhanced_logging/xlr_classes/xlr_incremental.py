@@ -0,0 +1,120 @@
+"""
+XLRIncremental - Per-phase incremental regeneration (--phases / --only-changed)
+
+Each run with --phases or --only-changed compiles the template without calling
+XLR and stores a fingerprint of it in log/<release>/phase_state.json:
+
+- structure: template payload, phase order, variable keys/types and the
+  dynamic_release phase, i.e. everything shared by all phases
+- phases: one digest per phase title (phase payload and its whole task tree,
+  so the technical tasks a phase references are part of its digest)
+- variables: one digest per template variable
+
+A YAML phase is rebuilt when the digest of the phase or of its
+CREATE_CHANGE_<phase> companion changed; changed variables are updated in
+place. A structure change, or a missing or stale state, needs a full generation.
+"""
+
+import hashlib
+import json
+import os
+
+STATE_FILE = 'phase_state.json'
+
+# Phase rebuilt with every YAML phase of the same name
+COMPANION_PREFIX = 'CREATE_CHANGE_'
+
+# Phase created by the template preamble, never rebuilt on its own
+DYNAMIC_PHASE = 'dynamic_release'
+
+
+def _digest(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def phase_titles(phase):
+    """Titles of the XLR phases built for a YAML phase, in creation order."""
+    if phase in ('BENCH', 'PRODUCTION'):
+        return [COMPANION_PREFIX + phase, phase]
+    return [phase]
+
+
+def template_fingerprint(objects):
+    """
+    Fingerprint a compiled template.
+
+    Args:
+        objects (list): compiled_objects() of the template
+
+    Returns:
+        dict: structure digest, phase_order, {phase title: digest}, {variable key: digest}
+    """
+    titles = {}
+    phase_payloads = {}
+    structure = {'template': None, 'variables': [], 'other': []}
+    variables = {}
+    for kind, position, payload in objects:
+        if kind == 'template':
+            structure['template'] = payload
+        elif kind == 'phase':
+            titles[position[0]] = payload.get('title')
+            phase_payloads.setdefault(position[0], []).append(payload)
+        elif kind == 'task':
+            phase_payloads.setdefault(position[0], []).append([list(position[1:]), payload])
+        elif kind == 'variable':
+            structure['variables'].append([position, payload.get('type')])
+            variables[position] = _digest(payload)
+        else:
+            structure['other'].append([kind, position, payload])
+
+    phases = {titles[index]: _digest(payloads) for index, payloads in phase_payloads.items()}
+    phase_order = [titles[index] for index in sorted(titles)]
+    structure['phases'] = phase_order
+    structure[DYNAMIC_PHASE] = phases.get(DYNAMIC_PHASE)
+    return {'structure': _digest(structure), 'phase_order': phase_order, 'phases': phases, 'variables': variables}
+
+
+def phases_to_rebuild(previous, current, yaml_phases, requested=None, only_changed=False):
+    """
+    Select the YAML phases to rebuild.
+
+    Args:
+        previous (dict): Fingerprint stored by the previous run, or None
+        current (dict): template_fingerprint() of this run
+        yaml_phases (list): general_info.phases
+        requested (list): Phases given with --phases
+        only_changed (bool): Add the phases whose digest changed
+
+    Returns:
+        list: YAML phases to rebuild in template order, or None when a full
+            generation is needed
+    """
+    if not previous or previous.get('structure') != current['structure']:
+        return None
+    selected = set(requested or [])
+    if only_changed:
+        for phase in yaml_phases:
+            if any(previous['phases'].get(title) != current['phases'].get(title) for title in phase_titles(phase)):
+                selected.add(phase)
+    return [phase for phase in yaml_phases if phase in selected]
+
+
+def changed_variables(previous, current):
+    """Keys of the variables whose content changed since the previous run."""
+    return sorted(key for key, digest in current['variables'].items() if previous['variables'].get(key) != digest)
+
+
+def load_phase_state(log_directory):
+    """Return the state saved by the previous run in log_directory, or None."""
+    try:
+        with open(os.path.join(log_directory, STATE_FILE), 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def save_phase_state(log_directory, template_id, fingerprint):
+    """Save the template id and fingerprint of this run."""
+    os.makedirs(log_directory, exist_ok=True)
+    with open(os.path.join(log_directory, STATE_FILE), 'w') as file:
+        json.dump(dict(fingerprint, template_id=template_id), file, indent=2, sort_keys=True)
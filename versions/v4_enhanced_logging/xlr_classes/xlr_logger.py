@@ -70,9 +70,12 @@ class XLRLogger:
     def _setup_loggers(self):
         """Set up multiple specialized loggers with different handlers."""
 
+        # Logger names include the log directory: releases generated in the same
+        # process (--batch, --watch) keep their own files
+
         # Main logger for creation report (compatible with existing CR.log format)
         self.logger_cr = self._create_logger(
-            'LOG_CR',
+            f'LOG_CR[{self.log_dir}]',
             self.log_dir / 'CR.log',
             level=logging.INFO,
             format_type='standard'
@@ -80,7 +83,7 @@ class XLRLogger:
 
         # Detailed logger with JSON structure for monitoring
         self.logger_detail = self._create_logger(
-            'LOG_DETAIL',
+            f'LOG_DETAIL[{self.log_dir}]',
             self.log_dir / 'detail.jsonl',
             level=logging.DEBUG,
             format_type='json'
@@ -88,7 +91,7 @@ class XLRLogger:
 
         # Error logger with enhanced error tracking
         self.logger_error = self._create_logger(
-            'LOG_ERROR',
+            f'LOG_ERROR[{self.log_dir}]',
             self.log_dir / 'error.log',
             level=logging.ERROR,
             format_type='enhanced'
@@ -96,7 +99,7 @@ class XLRLogger:
 
         # Performance logger for timing and metrics
         self.logger_perf = self._create_logger(
-            'LOG_PERFORMANCE',
+            f'LOG_PERFORMANCE[{self.log_dir}]',
             self.log_dir / 'performance.jsonl',
             level=logging.INFO,
             format_type='json'
@@ -225,6 +228,20 @@ class XLRLogger:
             if message:
                 self.info(f"{message} (completed in {duration:.2f}s)")
 
+    def log_api_call(self, endpoint: str, duration: float, status_code: int = None, budget_wait: float = None):
+        """Log the latency of one XLR API call (history used by the --plan estimator)."""
+        self.operation_counters['api_calls'] += 1
+        perf_data = {
+            'operation': 'api_call',
+            'endpoint': endpoint,
+            'status_code': status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'timestamp': datetime.now().isoformat()
+        }
+        if budget_wait is not None:
+            perf_data['budget_wait_ms'] = round(budget_wait * 1000, 2)
+        self.logger_perf.info(f"Performance: api_call {endpoint}", extra=perf_data)
+
     # Counter methods
     def increment_counter(self, counter_name: str, amount: int = 1):
         """Increment operation counter."""
@@ -0,0 +1,114 @@
+"""
+XLRLookupCache - Persistent cache of XLR lookups
+
+Stores the results of the lookups made before each generation in a small
+SQLite database of the user cache directory:
+
+- folder: XLR folder path -> folder id (folders/find?byPath=...)
+- template: template title -> template ids (templates?title=...)
+
+Entries expire after a TTL and are invalidated when XLR answers 404 for a
+cached id. The database is shared by all generator processes of the user,
+so --batch, --watch and successive runs skip the folder lookups; cached
+template ids are deleted directly, the title search still runs for the
+templates created outside this cache.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+ENV_LOOKUP_CACHE = 'XLR_LOOKUP_CACHE'
+
+# Seconds before an entry must be looked up again
+FOLDER_TTL = 7 * 24 * 3600
+TEMPLATE_TTL = 24 * 3600
+
+# Caches opened by XLRLookupCache.default(): path -> instance
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def default_cache_path():
+    """Return $XLR_LOOKUP_CACHE, or lookup.sqlite in the user cache directory."""
+    if os.environ.get(ENV_LOOKUP_CACHE):
+        return os.environ[ENV_LOOKUP_CACHE]
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'xlr_template_generator', 'lookup.sqlite')
+
+
+class XLRLookupCache:
+    """
+    SQLite cache of XLR folder and template lookups, keyed by XLR server.
+
+    Attributes:
+        path (str): SQLite database file
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): SQLite database file (created if missing)
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS lookup ("
+            " server TEXT NOT NULL, kind TEXT NOT NULL, key TEXT NOT NULL,"
+            " value TEXT NOT NULL, expires REAL NOT NULL,"
+            " PRIMARY KEY (server, kind, key))")
+
+    @classmethod
+    def default(cls):
+        """
+        Open the user cache (one connection per process), or return None when
+        it is disabled or unusable.
+
+        XLR_LOOKUP_CACHE=off disables the cache.
+        """
+        path = default_cache_path()
+        if path.lower() in ('off', 'none', '0'):
+            return None
+        with _instances_lock:
+            if path not in _instances:
+                try:
+                    _instances[path] = cls(path)
+                except (OSError, sqlite3.Error):
+                    # A read-only home only loses the cache, never the run
+                    return None
+            return _instances[path]
+
+    def get(self, server, kind, key):
+        """Return the cached value, or None when missing or expired."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires FROM lookup WHERE server = ? AND kind = ? AND key = ?",
+                (server, kind, key)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, server, kind, key, value, ttl):
+        """Store a value for ttl seconds."""
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO lookup (server, kind, key, value, expires) VALUES (?, ?, ?, ?, ?)",
+                (server, kind, key, json.dumps(value), time.time() + ttl))
+
+    def invalidate(self, server, kind, key=None):
+        """Drop one entry, or every entry of a kind."""
+        with self._lock:
+            if key is None:
+                self._connection.execute("DELETE FROM lookup WHERE server = ? AND kind = ?", (server, kind))
+            else:
+                self._connection.execute("DELETE FROM lookup WHERE server = ? AND kind = ? AND key = ?",
+                                         (server, kind, key))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
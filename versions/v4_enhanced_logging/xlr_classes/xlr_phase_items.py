@@ -0,0 +1,675 @@
+"""
+XLRPhaseItems - Registry of YAML phase item kinds and their handlers
+
+This module maps the item kinds found under `Phases.<phase>` in the YAML
+(seq_xldeploy, XLR_task_controlm, controlm_resource, seq_controlmspec,
+launch_script_windows, launch_script_linux) to handler objects.
+
+With general_info.deselected_task_mode: skip, the XLD DEPLOY and CONTROLM
+groups, their Control-M folders (folder_parent) and the XLD tasks get a
+precondition on the package selection (package_precondition), so deselected packages are skipped at
+runtime instead of being deleted by the dynamic_release pruning script.
+
+With general_info.parallel_groups: true, the XLD DEPLOY and CONTROLM groups
+become ParallelGroups when their content splits into independent lanes
+(dependency_lanes); dependent packages keep running in sequence, in a
+SequentialGroup per lane.
+
+With general_info.xld_version_lookup, the versions deployed before the XLD
+deployments are read for the auto_undeploy packages of the phase, by one
+task per package (per_package) or one script task (consolidated, a single
+XLD repository read).
+
+XLRGeneric.parameter_phase_task and XLRSun.parameter_phase_sun resolve each
+phase item once through PHASE_ITEM_REGISTRY and delegate to the handler,
+instead of scanning substring if/elif chains for every item. The generator
+methods the handlers call are resolved once per phase (XLRPhaseContext,
+reached through phase_context(ops, item)).
+
+New task kinds can be added by third parties:
+
+    from xlr_classes.xlr_phase_items import XLRPhaseItemHandler, register_phase_item
+
+    class MyHandler(XLRPhaseItemHandler):
+        kind = 'my_kind'
+
+        def generic(self, ops, phase, item):
+            ...
+
+    register_phase_item(MyHandler())
+"""
+
+
+class XLRPhaseItem:
+    """
+    One item of a phase, resolved once before dispatch.
+
+    Attributes:
+        index (int): Position of the item in Phases.<phase>
+        key (str): YAML key of the item (e.g. 'seq_xldeploy')
+        value: YAML content of the item
+        is_last_of_kind (bool): True when no later item of the phase has the same kind
+        context (XLRPhaseContext): Phase dispatch the item belongs to, None outside dispatch()
+    """
+
+    __slots__ = ('index', 'key', 'value', 'is_last_of_kind', 'context')
+
+    def __init__(self, index, key, value, is_last_of_kind):
+        self.index = index
+        self.key = key
+        self.value = value
+        self.is_last_of_kind = is_last_of_kind
+        self.context = None
+
+
+class XLRPhaseContext:
+    """
+    Generator hooks and package set of one phase, resolved once per dispatch.
+
+    Attributes:
+        list_package (frozenset): Packages of the template
+        hooks (dict): Hook name -> bound method of the generator, None when it lacks it
+    """
+
+    __slots__ = ('ops', 'list_package', 'hooks')
+
+    def __init__(self, ops):
+        self.ops = ops
+        self.list_package = frozenset(getattr(ops, 'list_package', ()))
+        self.hooks = {}
+
+    def hook(self, name):
+        """Return the generator method name (or None), looked up on the first call only."""
+        try:
+            return self.hooks[name]
+        except KeyError:
+            hook = self.hooks[name] = getattr(self.ops, name, None)
+            return hook
+
+
+def phase_context(ops, item):
+    """Context of a dispatched item, or a new one for a handler called directly."""
+    return item.context if item.context is not None else XLRPhaseContext(ops)
+
+
+class XLRPhaseItemHandler:
+    """
+    Base handler for a YAML phase item kind.
+
+    Subclasses set `kind` (the token matched against the YAML item key) and
+    implement `generic` (DEV/UAT/BENCH/PRODUCTION tasks built by XLRGeneric)
+    and/or `sun` (CREATE_CHANGE_<phase> tasks built by XLRSun).
+    """
+
+    kind = None
+
+    def generic(self, ops, phase, item):
+        """Create the item tasks in the deployment phase."""
+
+    def sun(self, ops, phase, item):
+        """Create the item tasks in the CREATE_CHANGE_<phase> phase."""
+
+
+class XLRPhaseItemRegistry:
+    """
+    Registry mapping YAML item kinds to handler objects.
+
+    A YAML key is resolved to the handler whose kind is the longest token
+    contained in the key, so 'controlm_resource' and 'seq_controlmspec' win
+    over 'controlm'. Resolutions are cached per key.
+    """
+
+    def __init__(self):
+        self._handlers = {}
+        self._cache = {}
+
+    def register(self, handler):
+        """
+        Register (or replace) the handler for handler.kind.
+
+        Args:
+            handler (XLRPhaseItemHandler): Handler instance with a non-empty kind
+
+        Returns:
+            XLRPhaseItemHandler: The registered handler
+        """
+        if not handler.kind:
+            raise ValueError("Phase item handler must define a kind")
+        self._handlers[handler.kind] = handler
+        self._cache.clear()
+        return handler
+
+    def unregister(self, kind):
+        """Remove the handler registered for kind, if any."""
+        self._handlers.pop(kind, None)
+        self._cache.clear()
+
+    def kinds(self):
+        """Return the registered kinds."""
+        return list(self._handlers)
+
+    def resolve(self, key):
+        """
+        Find the handler for a YAML item key.
+
+        Args:
+            key (str): YAML item key (e.g. 'XLR_task_controlm')
+
+        Returns:
+            XLRPhaseItemHandler or None
+        """
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+
+        handler = None
+        for kind in sorted(self._handlers, key=len, reverse=True):
+            if kind in key:
+                handler = self._handlers[kind]
+                break
+
+        self._cache[key] = handler
+        return handler
+
+    def resolve_phase(self, items):
+        """
+        Resolve every item of a phase once.
+
+        Args:
+            items (list): Phases.<phase> content from the YAML
+
+        Returns:
+            list: (handler, XLRPhaseItem) tuples, unknown or malformed items skipped
+        """
+        resolved = []
+        for index, task in enumerate(items or []):
+            if not isinstance(task, dict) or not task:
+                continue
+            key = next(iter(task))
+            handler = self.resolve(key)
+            if handler is not None:
+                resolved.append((handler, XLRPhaseItem(index, key, task[key], False)))
+
+        seen_kinds = set()
+        for handler, item in reversed(resolved):
+            if handler.kind not in seen_kinds:
+                item.is_last_of_kind = True
+                seen_kinds.add(handler.kind)
+
+        return resolved
+
+    def dispatch(self, ops, phase, items, target='generic'):
+        """
+        Resolve every item of a phase and run its handler.
+
+        The generator hooks and package set the handlers use are resolved
+        once for the phase (XLRPhaseContext), not per item.
+
+        Args:
+            ops: Generator (XLRGeneric or XLRSun)
+            phase (str): Phase name
+            items (list): Phases.<phase> content from the YAML
+            target (str): 'generic' or 'sun'
+        """
+        context = XLRPhaseContext(ops)
+        for handler, item in self.resolve_phase(items):
+            item.context = context
+            getattr(handler, target)(ops, phase, item)
+
+
+def _controlm_folders(grtp_controlm_value):
+    """Yield (folder_name, cases) for a Control-M group value."""
+    if isinstance(grtp_controlm_value, str):
+        grtp_controlm_value = {grtp_controlm_value: None}
+
+    for sub_item_name, sub_item_value in grtp_controlm_value.items():
+        if sub_item_name == 'type_group':
+            continue
+        if isinstance(sub_item_value, dict) and 'folder' in sub_item_value:
+            sub_item_value = sub_item_value['folder']
+
+        if isinstance(sub_item_value, list):
+            for folder in sub_item_value:
+                if isinstance(folder, str):
+                    yield folder, ''
+                elif isinstance(folder, dict):
+                    folder_name = list(folder.keys())[0]
+                    yield folder_name, (folder[folder_name] or {}).get('case', '')
+
+
+def _controlm_group_title(grtp_controlm):
+    """Return STOP/START/CLEAN for a Control-M group title, or None."""
+    for title_grp in ('STOP', 'START', 'CLEAN'):
+        if title_grp in grtp_controlm:
+            return title_grp
+    return None
+
+
+def skip_deselected(ops):
+    """True when deselected packages are skipped by precondition (general_info.deselected_task_mode: skip)."""
+    return (ops.parameters.get('general_info') or {}).get('deselected_task_mode') == 'skip'
+
+
+def package_precondition(ops, packages):
+    """
+    Precondition running a task only if one of its packages is selected.
+
+    In listbox package mode, a package is selected at release start when
+    its <package>_version variable is set. In string package mode, an
+    unselected package keeps the package_title_choice placeholder in its
+    variable: the selected packages are the list_package_manage list the
+    dynamic_release pruning script computes before any phase runs.
+    A template of a single package has no selection (no list_package_manage,
+    and no <package>_version for a listbox DEV-only template): its tasks
+    always run.
+
+    Args:
+        ops: Generator or delegate (parameters)
+        packages (list): Packages deployed, built or ordered by the task
+
+    Returns:
+        str: Jython precondition, or '' (always run) outside skip mode
+    """
+    packages = [package for package in dict.fromkeys(packages or ()) if package]
+    if not packages or not skip_deselected(ops) or len(ops.parameters['template_liste_package']) < 2:
+        return ''
+    if ops.parameters['general_info'].get('template_package_mode') == 'string':
+        selected = "releaseVariables['release_Variables_in_progress']['list_package_manage'].split(',')"
+        return ' or '.join("'" + package + "' in " + selected for package in packages)
+    return ' or '.join("releaseVariables['" + package + "_version'] != ''" for package in packages)
+
+
+def phase_packages(ops, phase, kind, title_grp=None):
+    """
+    Packages of every item of a kind in a phase (the content of its shared group).
+
+    Args:
+        ops: Generator or delegate (parameters)
+        phase (str): Phase name
+        kind (str): 'xldeploy' or 'controlm'
+        title_grp (str): STOP/START/CLEAN, for the Control-M group of that title
+
+    Returns:
+        list: Packages in YAML order
+    """
+    packages = []
+    for handler, item in PHASE_ITEM_REGISTRY.resolve_phase(ops.parameters['Phases'].get(phase)):
+        if handler.kind != kind or not isinstance(item.value, dict):
+            continue
+        for name, value in item.value.items():
+            if kind == 'xldeploy':
+                packages.extend(value[:1] if isinstance(value, list) else [])
+            elif _controlm_group_title(name) == title_grp:
+                for _, cases in _controlm_folders(value):
+                    packages.extend(cases or [])
+    return packages
+
+
+def parallel_groups(ops):
+    """True when independent tasks are grouped in ParallelGroups (general_info.parallel_groups)."""
+    return (ops.parameters.get('general_info') or {}).get('parallel_groups') is True
+
+
+def package_links(ops):
+    """
+    Packages whose tasks must not run concurrently, by package.
+
+    A package is linked to the packages of its auto_undeploy list (XLD
+    undeploys them when it is deployed), and the controlm_mode: master
+    packages are linked together (one application, one Control-M stop window).
+
+    Returns:
+        dict: package -> set of linked packages
+    """
+    packages = ops.parameters.get('template_liste_package') or {}
+    links = {package: set() for package in packages}
+    masters = {package for package, value in packages.items()
+               if isinstance(value, dict) and value.get('controlm_mode') == 'master'}
+    for package, value in packages.items():
+        undeployed = value.get('auto_undeploy') if isinstance(value, dict) else None
+        for other in undeployed if isinstance(undeployed, list) else ():
+            links[package].add(other)
+            links.setdefault(other, set()).add(package)
+        if package in masters:
+            links[package] |= masters - {package}
+    return links
+
+
+def dependency_lanes(ops, units):
+    """
+    Split the content of a group into lanes that can run in parallel.
+
+    Two units are in the same lane when they share a package or when one of
+    their packages is linked to the other's (package_links). A unit without
+    known packages depends on every other unit.
+
+    Args:
+        ops: Generator or delegate (parameters)
+        units (list): (key, packages) in YAML order
+
+    Returns:
+        list: Lanes, each the keys of its units in YAML order
+    """
+    links = package_links(ops)
+    roots = list(range(len(units)))
+
+    def root(index):
+        while roots[index] != index:
+            roots[index] = roots[roots[index]]
+            index = roots[index]
+        return index
+
+    for index, (_, packages) in enumerate(units):
+        related = set(packages).union(*(links.get(package, set()) for package in packages))
+        for previous in range(index):
+            other = units[previous][1]
+            if not packages or not other or related & set(other):
+                roots[root(index)] = root(previous)
+
+    lanes = {}
+    for index, (key, _) in enumerate(units):
+        lanes.setdefault(root(index), []).append(key)
+    return list(lanes.values())
+
+
+def create_lane_group(ops, parent_id, title_group, units, precondition):
+    """
+    Create the group of an XLD or Control-M group title.
+
+    Outside parallel mode, or when every unit depends on the others, the
+    group is a SequentialGroup as before. Otherwise it is a ParallelGroup
+    and its lanes are recorded in ops.xlr_group_lanes (see lane_parent).
+
+    Args:
+        ops: Generator or delegate (XLR_group_task, xlr_group_lanes)
+        parent_id (str): Phase ID
+        title_group (str): Group title
+        units (list): (key, packages) of the group content in YAML order
+        precondition (str): Group precondition
+
+    Returns:
+        str: Group ID
+    """
+    lanes = dependency_lanes(ops, units) if parallel_groups(ops) else []
+    type_group = 'ParallelGroup' if len(lanes) > 1 else 'SequentialGroup'
+    group_id = ops.XLR_group_task(ID_XLR_task=parent_id, type_group=type_group,
+                                  title_group=title_group, precondition=precondition)
+    if type_group == 'ParallelGroup':
+        ops.xlr_group_lanes[group_id] = {'title': title_group, 'lanes': lanes, 'groups': {},
+                                         'packages': dict(units)}
+    return group_id
+
+
+def lane_parent(ops, group_id, key):
+    """
+    Container of a unit of a group.
+
+    Returns:
+        str: The group itself, or the SequentialGroup of the unit's lane in a
+            ParallelGroup, created with the lane's first task
+    """
+    layout = ops.xlr_group_lanes.get(group_id)
+    lane = next((lane for lane in layout['lanes'] if key in lane), None) if layout else None
+    if lane is None or len(lane) == 1:
+        return group_id
+    lane_key = tuple(lane)
+    if lane_key not in layout['groups']:
+        packages = [package for unit in lane for package in layout['packages'][unit]]
+        layout['groups'][lane_key] = ops.XLR_group_task(
+            ID_XLR_task=group_id, type_group='SequentialGroup',
+            title_group=layout['title'] + ' : ' + ', '.join(dict.fromkeys(packages)),
+            precondition=package_precondition(ops, packages))
+    return layout['groups'][lane_key]
+
+
+def folder_parent(ops, parent_id, folder_name, cases, group_precondition):
+    """
+    Container of a Control-M folder in skip mode.
+
+    Args:
+        ops: Generator or delegate (XLR_group_task)
+        parent_id (str): Group (or lane) of the folder
+        folder_name (str): Control-M folder, title of its group
+        cases (list): Packages of the folder
+        group_precondition (str): Precondition of the enclosing group, None if unknown
+
+    Returns:
+        str: parent_id, or a SequentialGroup with the precondition of the
+            folder packages when it differs from the group's
+    """
+    precondition = package_precondition(ops, cases if isinstance(cases, list) else [cases])
+    if not precondition or precondition == group_precondition:
+        return parent_id
+    return ops.XLR_group_task(ID_XLR_task=parent_id, type_group='SequentialGroup',
+                              title_group=folder_name, precondition=precondition)
+
+
+def phase_units(ops, phase, kind, title_grp=None):
+    """
+    Content of the shared group of a kind in a phase, as dependency_lanes units.
+
+    Returns:
+        list: (package, [package]) per XLD package, (folder, cases) per Control-M folder
+    """
+    if kind == 'xldeploy':
+        return [(package, [package]) for package in dict.fromkeys(phase_packages(ops, phase, kind))]
+    units = []
+    for handler, item in PHASE_ITEM_REGISTRY.resolve_phase(ops.parameters['Phases'].get(phase)):
+        if handler.kind != kind or not isinstance(item.value, dict):
+            continue
+        for name, value in item.value.items():
+            if _controlm_group_title(name) == title_grp:
+                units.extend((folder_name, list(cases or [])) for folder_name, cases in _controlm_folders(value))
+    return units
+
+
+def version_lookup_packages(ops, phase):
+    """
+    Packages whose deployed version is read before the XLD deployments of a phase.
+
+    Only with general_info.xld_version_lookup (per_package or consolidated):
+    the packages of the phase declaring auto_undeploy, in YAML order.
+    """
+    if not (ops.parameters.get('general_info') or {}).get('xld_version_lookup'):
+        return []
+    packages = ops.parameters.get('template_liste_package') or {}
+    return [package for package in dict.fromkeys(phase_packages(ops, phase, 'xldeploy'))
+            if isinstance(packages.get(package), dict) and packages[package].get('auto_undeploy')]
+
+
+class XLDeployHandler(XLRPhaseItemHandler):
+    """seq_xldeploy: XL Deploy deployments grouped under 'XLD DEPLOY'."""
+
+    kind = 'xldeploy'
+
+    def generic(self, ops, phase, item):
+        ops.creation_technical_task(phase, 'before_deployment')
+        ops.creation_technical_task(phase, 'before_xldeploy')
+
+        context = phase_context(ops, item)
+        add_xld_version_lookup = context.hook('add_xld_version_lookup')
+        if add_xld_version_lookup is not None and f'xld_version_lookup_{phase}' not in ops.xlr_group_task_done:
+            ops.xlr_group_task_done.add(f'xld_version_lookup_{phase}')
+            packages = version_lookup_packages(ops, phase)
+            if packages:
+                add_xld_version_lookup(phase, packages, 'BEFORE')
+
+        if f'xld_XLR_grp_{phase}' not in ops.xlr_group_task_done:
+            ops.xld_ID_XLR_group_task_grp = create_lane_group(
+                ops, ops.dict_template[phase]['xlr_id_phase'], 'XLD DEPLOY',
+                phase_units(ops, phase, 'xldeploy'),
+                package_precondition(ops, phase_packages(ops, phase, 'xldeploy'))
+            )
+            ops.xlr_group_task_done.add(f'xld_XLR_grp_{phase}')
+
+        add_task_xldeploy = context.hook('add_task_xldeploy')
+        if add_task_xldeploy is not None:
+            for demand_xld, xld_value in item.value.items():
+                if xld_value[0] in context.list_package:
+                    add_task_xldeploy(xld_value, phase, package_precondition(ops, xld_value[:1]),
+                                      lane_parent(ops, ops.xld_ID_XLR_group_task_grp, xld_value[0]))
+
+        if item.is_last_of_kind:
+            ops.creation_technical_task(phase, 'after_xldeploy')
+
+    def sun(self, ops, phase, item):
+        context = phase_context(ops, item)
+        ops.XLRSun_creation_technical_task(phase, 'before_deployment')
+        ops.XLRSun_creation_technical_task(phase, 'before_xldeploy')
+
+        if f'sunxld_XLR_grp_{phase}' not in ops.xlr_group_task_done:
+            ops.xld_ID_XLR_group_task_grp = create_lane_group(
+                ops, ops.dict_template['CREATE_CHANGE_' + phase]['xlr_id_phase'], 'XLD DEPLOY',
+                phase_units(ops, phase, 'xldeploy'),
+                package_precondition(ops, phase_packages(ops, phase, 'xldeploy'))
+            )
+            ops.xlr_group_task_done.add(f'sunxld_XLR_grp_{phase}')
+
+        add_task_sun_xldeploy = context.hook('add_task_sun_xldeploy')
+        if add_task_sun_xldeploy is not None:
+            for demand_xld, xld_value in item.value.items():
+                if xld_value[0] in context.list_package:
+                    add_task_sun_xldeploy(xld_value, phase, package_precondition(ops, xld_value[:1]),
+                                          lane_parent(ops, ops.xld_ID_XLR_group_task_grp, xld_value[0]))
+
+        if item.is_last_of_kind:
+            ops.XLRSun_creation_technical_task(phase, 'after_xldeploy')
+
+
+class _ScriptHandler(XLRPhaseItemHandler):
+    """Shared logic for launch_script_windows / launch_script_linux."""
+
+    generic_method = None
+    sun_method = None
+
+    def _add_scripts(self, ops, method_name, phase, item):
+        add_task = phase_context(ops, item).hook(method_name)
+        if add_task is None:
+            return
+        for group_task in item.value:
+            if isinstance(group_task, dict):
+                for index, script_item in enumerate(group_task.get(list(group_task.keys())[0], [])):
+                    add_task(script_item, phase, index)
+
+    def generic(self, ops, phase, item):
+        self._add_scripts(ops, self.generic_method, phase, item)
+
+    def sun(self, ops, phase, item):
+        self._add_scripts(ops, self.sun_method, phase, item)
+
+
+class ScriptWindowsHandler(_ScriptHandler):
+    """launch_script_windows: Windows script tasks."""
+
+    kind = 'launch_script_windows'
+    generic_method = 'add_task_launch_script_windows'
+    sun_method = 'add_task_sun_launch_script_windows'
+
+
+class ScriptLinuxHandler(_ScriptHandler):
+    """launch_script_linux: Linux script tasks."""
+
+    kind = 'launch_script_linux'
+    generic_method = 'add_task_launch_script_linux'
+    sun_method = 'add_task_sun_launch_script_linux'
+
+
+class ControlmResourceHandler(XLRPhaseItemHandler):
+    """controlm_resource: Control-M resource changes."""
+
+    kind = 'controlm_resource'
+
+    def generic(self, ops, phase, item):
+        add_task = phase_context(ops, item).hook('add_task_controlm_resource')
+        if add_task is not None:
+            add_task(phase, item.value.items(), '')
+
+    def sun(self, ops, phase, item):
+        add_task = phase_context(ops, item).hook('add_task_sun_controlm_resource')
+        if add_task is not None:
+            add_task(phase, item.value.items(), '')
+
+
+class ControlmHandler(XLRPhaseItemHandler):
+    """XLR_task_controlm: Control-M folder orders grouped by STOP/START/CLEAN."""
+
+    kind = 'controlm'
+
+    def generic(self, ops, phase, item):
+        ops.creation_technical_task(phase, 'before_deployment')
+        self._add_folders(ops, phase, item, phase_context(ops, item).hook('add_task_controlm'),
+                          ops.dict_template[phase]['xlr_id_phase'], 'CONTROLM_XLR_grp', 'CONTROLM_ID_XLR_group_task_grp')
+
+    def sun(self, ops, phase, item):
+        ops.XLRSun_creation_technical_task(phase, 'before_deployment')
+        self._add_folders(ops, phase, item, phase_context(ops, item).hook('add_task_sun_controlm'),
+                          ops.dict_template['CREATE_CHANGE_' + phase]['xlr_id_phase'], 'SUN_XLR_grp', 'SUN_ID_XLR_group_task_grp')
+
+    def _add_folders(self, ops, phase, item, add_task, phase_id, group_key_prefix, group_attribute):
+        """
+        Create the STOP/START/CLEAN group once per phase, then the folders of the item.
+
+        In skip mode a folder gets its own SequentialGroup with the
+        precondition of its packages (folder_parent), so the folder of a
+        deselected package is skipped even when its group runs for others.
+        """
+        for grtp_controlm, grtp_controlm_value in item.value.items():
+            title_grp = _controlm_group_title(grtp_controlm)
+            group_precondition = None
+            if title_grp is not None:
+                group_precondition = package_precondition(ops, phase_packages(ops, phase, 'controlm', title_grp))
+                group_key = f'{group_key_prefix}_{title_grp}_{phase}'
+                if group_key not in ops.xlr_group_task_done:
+                    setattr(ops, group_attribute, create_lane_group(
+                        ops, phase_id, f'CONTROLM : {title_grp}',
+                        phase_units(ops, phase, 'controlm', title_grp), group_precondition))
+                    ops.xlr_group_task_done.add(group_key)
+
+            skip = skip_deselected(ops)
+            if add_task is None and not skip:
+                continue
+            group_id = getattr(ops, group_attribute, None)
+            for folder_name, cases in _controlm_folders(grtp_controlm_value):
+                parent_id = lane_parent(ops, group_id, folder_name) if group_id else group_id
+                if skip and parent_id:
+                    parent_id = folder_parent(ops, parent_id, folder_name, cases, group_precondition)
+                if add_task is not None:
+                    add_task(phase, item.key, folder_name, cases, parent_id)
+
+
+class ControlmSpecHandler(XLRPhaseItemHandler):
+    """seq_controlmspec: Control-M spec demand (profil or free mode)."""
+
+    kind = 'controlmspec'
+
+    def generic(self, ops, phase, item):
+        ops.creation_technical_task(phase, 'before_deployment')
+        self._spec(ops, phase, item, 'add_task_controlm_spec_profil')
+
+    def sun(self, ops, phase, item):
+        ops.XLRSun_creation_technical_task(phase, 'before_deployment')
+        self._spec(ops, phase, item, 'add_task_sun_controlm_spec_profil')
+
+    def _spec(self, ops, phase, item, profil_method):
+        if not isinstance(item.value, dict) or item.value.get('mode') is None:
+            return
+        if item.value['mode'] == 'profil':
+            add_task = phase_context(ops, item).hook(profil_method)
+            if add_task is not None:
+                add_task(phase, item.value)
+        elif item.value['mode'] == 'free':
+            ops.template_create_variable('CONTROLM_DEMAND', 'StringVariable', 'CONTROLM DEMAND', '',
+                                         item.value.get('render', ''), False, True, True)
+
+
+PHASE_ITEM_REGISTRY = XLRPhaseItemRegistry()
+
+for _handler in (XLDeployHandler(), ScriptWindowsHandler(), ScriptLinuxHandler(),
+                 ControlmResourceHandler(), ControlmHandler(), ControlmSpecHandler()):
+    PHASE_ITEM_REGISTRY.register(_handler)
+
+
+def register_phase_item(handler):
+    """Register a handler for a new (or overridden) YAML phase item kind."""
+    return PHASE_ITEM_REGISTRY.register(handler)
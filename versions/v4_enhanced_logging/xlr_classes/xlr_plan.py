@@ -0,0 +1,115 @@
+"""
+XLRPlan - API cost estimate of a template generation (--plan)
+
+Summarizes the calls recorded by XLRPlanClient: calls per endpoint type and
+per phase, variables, tasks and Jython scripts created, payload bytes, and an
+estimated wall time based on the api_call latencies that XLRClient writes to
+log/<release>/performance.jsonl.
+"""
+
+import glob
+import json
+import os
+from collections import Counter, defaultdict
+
+# Seconds per call when no latency history exists for an endpoint
+DEFAULT_LATENCY = 0.25
+
+
+def load_latency_history(log_root='log'):
+    """
+    Mean latency per endpoint from the api_call records of all release logs.
+
+    Args:
+        log_root (str): Directory containing the log/<release>/ folders
+
+    Returns:
+        tuple: ({endpoint: mean seconds}, number of samples read)
+    """
+    durations = defaultdict(list)
+    for path in glob.glob(os.path.join(log_root, '*', 'performance.jsonl*')):
+        try:
+            with open(path, 'r') as file:
+                for line in file:
+                    if '"api_call"' not in line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get('operation') == 'api_call' and 'endpoint' in record:
+                        durations[record['endpoint']].append(record.get('duration_ms', 0) / 1000.0)
+        except OSError:
+            continue
+
+    latency = {endpoint: sum(values) / len(values) for endpoint, values in durations.items()}
+    return latency, sum(len(values) for values in durations.values())
+
+
+def summarize_plan(calls, latency=None, default_latency=DEFAULT_LATENCY):
+    """
+    Build the plan summary of recorded calls.
+
+    Args:
+        calls (list): XLRPlanClient.calls
+        latency (dict): Mean seconds per endpoint (see load_latency_history)
+        default_latency (float): Seconds used for endpoints without history
+
+    Returns:
+        dict: calls_per_type, calls_per_phase, total_calls, variables, tasks,
+            scripts, script_bytes, payload_bytes, estimated_seconds, estimated_from_history
+    """
+    latency = latency or {}
+    fallback = sum(latency.values()) / len(latency) if latency else default_latency
+
+    calls_per_type = Counter()
+    calls_per_phase = Counter()
+    summary = {'variables': 0, 'tasks': 0, 'scripts': 0, 'script_bytes': 0, 'payload_bytes': 0,
+               'estimated_seconds': 0.0, 'estimated_from_history': 0}
+
+    for call in calls:
+        endpoint = call['endpoint']
+        calls_per_type[endpoint + (' [' + call['task_type'] + ']' if call.get('task_type') else '')] += 1
+        calls_per_phase[call['section']] += 1
+        summary['payload_bytes'] += call['bytes']
+
+        if endpoint == 'POST variables':
+            summary['variables'] += 1
+        elif endpoint == 'POST tasks':
+            summary['tasks'] += 1
+            payload = call.get('payload') or {}
+            if 'script' in payload:
+                summary['scripts'] += 1
+                summary['script_bytes'] += len(payload['script'] or '')
+
+        if endpoint in latency:
+            summary['estimated_seconds'] += latency[endpoint]
+            summary['estimated_from_history'] += 1
+        else:
+            summary['estimated_seconds'] += fallback
+
+    summary['calls_per_type'] = dict(calls_per_type.most_common())
+    summary['calls_per_phase'] = dict(calls_per_phase)
+    summary['total_calls'] = len(calls)
+    return summary
+
+
+def format_plan(summary, release_name, samples=0):
+    """Render a plan summary as printable lines."""
+    lines = [f"PLAN for {release_name} (no XLR call made)",
+             f"  XLR API calls : {summary['total_calls']}",
+             "  Calls per type :"]
+    lines += [f"    {count:>5}  {endpoint}" for endpoint, count in summary['calls_per_type'].items()]
+    lines.append("  Calls per phase :")
+    lines += [f"    {count:>5}  {section}" for section, count in summary['calls_per_phase'].items()]
+    lines += [f"  Variables : {summary['variables']}",
+              f"  Tasks : {summary['tasks']}",
+              f"  Jython scripts : {summary['scripts']} ({summary['script_bytes']} bytes)",
+              f"  Payload : {summary['payload_bytes']} bytes"]
+    if samples:
+        source = (f"{summary['estimated_from_history']}/{summary['total_calls']} calls priced "
+                  f"from {samples} logged api_call samples")
+    else:
+        source = f"no latency history, {DEFAULT_LATENCY}s per call"
+    lines.append(f"  Estimated wall time : {summary['estimated_seconds']:.1f}s ({source})")
+    return lines
@@ -0,0 +1,285 @@
+"""
+XLRScriptBench - Release-start cost of the generated Jython scripts (--bench)
+
+Every ScriptTask of a compiled template is run under CPython against an
+in-memory release built from the same compiled model (see xlr_export):
+
+- releaseVariables holds the template variables, every package selected
+  (<package>_version set) and every phase selected (env_<phase> set)
+- releaseApi, phaseApi and taskApi count their calls and add a simulated
+  latency per call; searches and deletions act on the in-memory release
+- ${variable} placeholders are replaced as XLR does before running a script
+
+Each script reports its API calls, its CPU time and the simulated API time.
+Synthetic YAML configurations with N packages and M phases are built from a
+base configuration, so the cost can be followed as templates grow.
+"""
+
+import copy
+import io
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from .xlr_incremental import COMPANION_PREFIX, phase_titles
+
+# Simulated seconds per releaseApi/phaseApi/taskApi call
+DEFAULT_API_LATENCY = 0.05
+
+# Phase order of a synthetic template (general_info.phases)
+SYNTHETIC_PHASES = ['DEV', 'UAT', 'BENCH', 'PRODUCTION']
+
+# Jython 2 idioms without CPython 3 equivalent: byte strings are str in Jython
+JYTHON_REWRITES = ((".encode('utf-8')", ""),)
+
+_PLACEHOLDER = re.compile(r"\$\{([\w.]+)\}")
+
+
+class FakeNode:
+    """Release, phase or task of the in-memory release (id, title, type, phases/tasks)."""
+
+    def __init__(self, node, children='tasks'):
+        self.id = node.get('id')
+        self.title = node.get('title')
+        self.type = node.get('type')
+        # Release level: password values keyed by placeholder, as in XLR
+        self.passwordVariableValues = {'${' + variable['key'] + '}': variable.get('value', '')
+                                       for variable in node.get('variables', [])
+                                       if variable.get('type') == 'xlrelease.PasswordStringVariable'}
+        self.phases = [FakeNode(phase) for phase in node.get('phases', [])] if children == 'phases' else []
+        self.tasks = [FakeNode(task) for task in node.get('tasks') or []]
+
+    def walk(self):
+        """Yield every phase and task below this node."""
+        for child in self.phases + self.tasks:
+            yield child
+            yield from child.walk()
+
+    def remove(self, object_id):
+        """Remove the phase or task object_id from this subtree."""
+        self.phases = [phase for phase in self.phases if phase.id != object_id]
+        self.tasks = [task for task in self.tasks if task.id != object_id]
+        for child in self.phases + self.tasks:
+            child.remove(object_id)
+
+
+class FakeApi:
+    """
+    XLR script API (releaseApi, phaseApi, taskApi) over the in-memory release.
+
+    Every call is counted as '<api>.<method>' and adds latency seconds to
+    the simulated API time. Methods without an in-memory behaviour return None.
+    """
+
+    def __init__(self, name, release, counter, latency):
+        self._name = name
+        self._release = release
+        self._counter = counter
+        self._latency = latency
+        self.simulated_seconds = 0.0
+
+    def __getattr__(self, method):
+        def call(*args):
+            self._counter[self._name + '.' + method] += 1
+            self.simulated_seconds += self._latency
+            behaviour = getattr(self, '_' + method, None)
+            return behaviour(*args) if behaviour is not None else None
+        return call
+
+    def _getRelease(self, release_id):
+        return self._release
+
+    def _searchPhasesByTitle(self, title, release_id=None):
+        return [phase for phase in self._release.phases if phase.title == title]
+
+    def _searchTasksByTitle(self, title, phase_title=None, release_id=None):
+        phases = [phase for phase in self._release.phases if phase_title is None or phase.title == phase_title]
+        return [task for phase in phases for task in phase.walk() if task.title == title]
+
+    def _deletePhase(self, phase_id):
+        self._release.remove(phase_id)
+
+    def _delete(self, task_id):
+        self._release.remove(task_id)
+
+
+def release_variables(release, parameters):
+    """
+    Variables of a release started from the template, everything selected.
+
+    Args:
+        release (dict): build_template_export() of the compiled template
+        parameters (dict): YAML configuration of the template
+
+    Returns:
+        dict: releaseVariables
+    """
+    variables = {variable['key']: copy.deepcopy(variable.get('value', '')) for variable in release.get('variables', [])}
+    phases = parameters['general_info']['phases']
+    for package in parameters['template_liste_package']:
+        variables[package + '_version'] = '1.0.0'
+    for phase in phases:
+        environments = parameters.get('XLD_ENV_' + phase) or [phase]
+        variables['env_' + phase] = environments[0].split(';')[0]
+    variables.setdefault('Choice_ENV', list(phases))
+    return variables
+
+
+def substitute_placeholders(script, variables):
+    """
+    Replace ${variable} as XLR does before running a script.
+
+    Lists and maps are written as literals, other values as their text;
+    unknown variables are left in place (the script then fails to compile,
+    as it would in XLR).
+    """
+    def value(match):
+        if match.group(1) not in variables:
+            return match.group(0)
+        variable = variables[match.group(1)]
+        return repr(variable) if isinstance(variable, (list, dict)) else str(variable)
+    return _PLACEHOLDER.sub(value, script)
+
+
+def script_tasks(release):
+    """Return (phase title, task title, script) of every ScriptTask of an exported template."""
+    found = []
+
+    def walk(phase_title, tasks):
+        for task in tasks or []:
+            if task.get('type') == 'xlrelease.ScriptTask' and task.get('script') is not None:
+                found.append((phase_title, task['title'], task['script']))
+            walk(phase_title, task.get('tasks'))
+
+    for phase in release.get('phases', []):
+        walk(phase['title'], phase.get('tasks'))
+    return found
+
+
+def run_script(script, variables, release, latency=DEFAULT_API_LATENCY, extra_globals=None, modules=None):
+    """
+    Run one script body against the in-memory release.
+
+    Args:
+        script (str): ScriptTask body
+        variables (dict): releaseVariables (updated in place)
+        release (FakeNode): In-memory release (updated by deletions)
+        latency (float): Simulated seconds per API call
+        extra_globals (dict): Further script globals (configurationApi, ...)
+        modules (dict): Modules imported by the script in place of the real ones (urllib2, ...)
+
+    Returns:
+        dict: calls (Counter), api_calls, cpu_seconds, simulated_seconds, status ('OK' or the error)
+    """
+    counter = Counter()
+    apis = {name: FakeApi(name, release, counter, latency) for name in ('releaseApi', 'phaseApi', 'taskApi')}
+    source = substitute_placeholders(script, variables)
+    for jython, cpython in JYTHON_REWRITES:
+        source = source.replace(jython, cpython)
+    namespace = dict(apis, releaseVariables=variables, getCurrentRelease=lambda: release, **(extra_globals or {}))
+
+    status = 'OK'
+    start = time.perf_counter()
+    try:
+        with redirect_stdout(io.StringIO()), patch.dict(sys.modules, modules or {}):
+            exec(compile(source, '<script>', 'exec'), namespace)
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            status = 'exit ' + str(e.code)
+    except Exception as e:
+        status = type(e).__name__ + ': ' + str(e)
+    cpu_seconds = time.perf_counter() - start
+
+    return {'calls': counter, 'api_calls': sum(counter.values()), 'cpu_seconds': cpu_seconds,
+            'simulated_seconds': sum(api.simulated_seconds for api in apis.values()), 'status': status}
+
+
+def bench_release(release, parameters, latency=DEFAULT_API_LATENCY):
+    """
+    Run every ScriptTask of an exported template, in template order.
+
+    Scripts share releaseVariables and the in-memory release, as they do in
+    a started release. Scripts of phases deleted by an earlier script are not run.
+
+    Returns:
+        list: run_script() results with phase and title
+    """
+    variables = release_variables(release, parameters)
+    fake_release = FakeNode(release, children='phases')
+    results = []
+    for phase_title, title, script in script_tasks(release):
+        if phase_title not in {phase.title for phase in fake_release.phases}:
+            continue
+        result = run_script(script, variables, fake_release, latency)
+        result.update(phase=phase_title, title=title)
+        results.append(result)
+    return results
+
+
+def synthetic_parameters(base, packages, phases):
+    """
+    Scale a YAML configuration to N packages and M phases.
+
+    Every package is a copy of the first package of base (no
+    name_from_jenkins mode), deployed by one seq_xldeploy item in every
+    phase; BENCH and PRODUCTION also stop and start all packages through
+    Control-M.
+
+    Args:
+        base (dict): YAML configuration used as model
+        packages (int): Number of packages
+        phases (int): Number of phases (1 to len(SYNTHETIC_PHASES))
+
+    Returns:
+        dict: YAML configuration of the synthetic template
+    """
+    if not 1 <= phases <= len(SYNTHETIC_PHASES) or packages < 1:
+        raise ValueError(f"synthetic template needs 1-{len(SYNTHETIC_PHASES)} phases and at least 1 package")
+    parameters = copy.deepcopy(base)
+    names = ['PKG%02d' % index for index in range(1, packages + 1)]
+    model = dict(next(iter(base['template_liste_package'].values())))
+    model.pop('mode', None)
+    model['auto_undeploy'] = False
+
+    parameters['general_info']['phases'] = SYNTHETIC_PHASES[:phases]
+    parameters['general_info']['name_release'] = f"{base['general_info']['name_release']}_BENCH_{packages}x{phases}"
+    parameters['template_liste_package'] = {name: dict(model) for name in names}
+    if parameters.get('jenkins'):
+        job = dict(next(iter(parameters['jenkins'].get('jenkinsjob', {}).values()), {}))
+        parameters['jenkins']['jenkinsjob'] = {name: dict(job, parameters=['BRANCH_NAME=${' + name + '_version}']) for name in names}
+
+    parameters['Phases'] = {}
+    for phase in parameters['general_info']['phases']:
+        items = [{'seq_xldeploy': {'XLD ' + name: [name]}} for name in names]
+        if COMPANION_PREFIX + phase in phase_titles(phase):
+            folder = {'type_group': 'SequentialGroup', 'folder': [{'FOLDER_' + phase + '_XLR': {'hold': False, 'case': list(names)}}]}
+            items = ([{'XLR_task_controlm': {'STOP APPLICATION': folder}}] + items
+                     + [{'XLR_task_controlm': {'START APPLICATION': copy.deepcopy(folder)}}])
+        parameters['Phases'][phase] = items
+    return parameters
+
+
+def summarize_bench(results):
+    """Totals of bench_release() results: scripts, api_calls, cpu_seconds, simulated_seconds, failed."""
+    return {'scripts': len(results),
+            'api_calls': sum(result['api_calls'] for result in results),
+            'cpu_seconds': sum(result['cpu_seconds'] for result in results),
+            'simulated_seconds': sum(result['simulated_seconds'] for result in results),
+            'failed': sum(result['status'] != 'OK' for result in results)}
+
+
+def format_bench(results, label, latency=DEFAULT_API_LATENCY):
+    """Render bench_release() results as printable lines."""
+    total = summarize_bench(results)
+    lines = [f"SCRIPT BENCH {label} ({latency}s simulated per API call)"]
+    for result in results:
+        calls = ', '.join(f"{name} x{count}" for name, count in sorted(result['calls'].items())) or 'no API call'
+        lines.append(f"  {result['phase']} / {result['title']} : {result['api_calls']} call(s), "
+                     f"{result['cpu_seconds'] * 1000:.1f} ms + {result['simulated_seconds']:.2f}s API ({calls})"
+                     + ("" if result['status'] == 'OK' else f" FAILED {result['status']}"))
+    lines.append(f"  TOTAL : {total['scripts']} script(s), {total['api_calls']} API call(s), "
+                 f"{total['cpu_seconds'] * 1000:.1f} ms + {total['simulated_seconds']:.2f}s API, {total['failed']} failed")
+    return lines
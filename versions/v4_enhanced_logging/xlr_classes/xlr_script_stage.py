@@ -0,0 +1,174 @@
+"""
+XLRScriptStage - Last generation stage of the embedded Jython scripts
+
+Every ScriptTask payload sent through the XLRClient of a template passes
+through its XLRScriptStage before leaving the generator:
+
+- the script is dedented (scripts written inside indented triple-quoted
+  strings) and, unless general_info.script_minify is false, its comments,
+  ##script_* banners, blank lines and repeated top-level imports are removed
+- its size before and after the stage is counted, as well as the top-level
+  helper functions (def ...) that more than one script of the template defines
+
+report() compares the script bytes of the template with the budget of
+general_info.script_bytes_budget; the generation logs a warning above it.
+"""
+
+import hashlib
+import io
+import re
+import textwrap
+import tokenize
+from collections import defaultdict
+
+# Script bytes per template above which the generation warns
+DEFAULT_SCRIPT_BUDGET = 65536
+
+_CODING_LINE = re.compile(r"^#.*coding[:=]")
+_TOP_LEVEL_IMPORT = re.compile(r"^(import|from)\s")
+_TOP_LEVEL_DEF = re.compile(r"^def\s+(\w+)\s*\(")
+
+
+def _scan(script):
+    """
+    Comment columns and string-protected lines of a script.
+
+    Returns:
+        tuple: ({row: comment column}, set of rows inside multi-line strings),
+            None when the script does not tokenize
+    """
+    # ${variable} placeholders are not Python: '_{' keeps the columns unchanged
+    readline = io.StringIO(script.replace('${', '_{')).readline
+    comments, protected = {}, set()
+    try:
+        for token in tokenize.generate_tokens(readline):
+            if token.type == tokenize.COMMENT:
+                comments[token.start[0]] = token.start[1]
+            elif token.type == tokenize.STRING and token.end[0] > token.start[0]:
+                protected.update(range(token.start[0] + 1, token.end[0] + 1))
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return None
+    return comments, protected
+
+
+def minify_script(script):
+    """
+    Remove what Jython does not need from a script.
+
+    Comments (except a coding declaration), blank lines, trailing spaces and
+    repeated top-level imports are removed; multi-line strings are kept as
+    they are. A script that does not tokenize is only dedented.
+
+    Args:
+        script (str): Jython script
+
+    Returns:
+        str: Minified script
+    """
+    script = textwrap.dedent(script).strip('\n')
+    scan = _scan(script)
+    if scan is None:
+        return script + '\n'
+    comments, protected = scan
+
+    lines, imports = [], set()
+    for row, line in enumerate(script.split('\n'), start=1):
+        if row in protected:
+            lines.append(line)
+            continue
+        if row in comments and not (row <= 2 and _CODING_LINE.match(line)):
+            line = line[:comments[row]]
+        line = line.rstrip()
+        if not line.strip():
+            continue
+        if _TOP_LEVEL_IMPORT.match(line):
+            if line in imports:
+                continue
+            imports.add(line)
+        lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+
+def top_level_helpers(script):
+    """Return {name: digest of the source} of the top-level functions of a dedented script."""
+    helpers, name, body = {}, None, []
+    for line in script.split('\n') + ['']:
+        if name is not None and line.strip() and not line[0].isspace():
+            helpers[name] = hashlib.sha256('\n'.join(body).encode('utf-8')).hexdigest()
+            name = None
+        match = _TOP_LEVEL_DEF.match(line)
+        if match:
+            name, body = match.group(1), []
+        if name is not None:
+            body.append(line.rstrip())
+    return helpers
+
+
+class XLRScriptStage:
+    """
+    Minification and size accounting of the ScriptTask payloads of one template.
+
+    Attributes:
+        minify (bool): Remove comments, blank lines and repeated imports
+        budget (int): Script bytes allowed per template
+        scripts (list): (title, bytes received, bytes sent) per script
+        helpers (dict): (helper name, source digest) -> titles of the scripts defining it
+    """
+
+    def __init__(self, minify=True, budget=DEFAULT_SCRIPT_BUDGET):
+        self.minify = minify
+        self.budget = budget
+        self.scripts = []
+        self.helpers = defaultdict(list)
+
+    @classmethod
+    def from_parameters(cls, parameters):
+        """Stage configured by general_info.script_minify and general_info.script_bytes_budget."""
+        general_info = (parameters or {}).get('general_info', {})
+        return cls(minify=general_info.get('script_minify', True),
+                   budget=general_info.get('script_bytes_budget', DEFAULT_SCRIPT_BUDGET))
+
+    def prepare(self, payload):
+        """
+        Pass one payload through the stage.
+
+        Args:
+            payload: JSON body of an XLR call
+
+        Returns:
+            The payload, a copy with the prepared script for a ScriptTask
+        """
+        if not isinstance(payload, dict) or payload.get('type') != 'xlrelease.ScriptTask' or not payload.get('script'):
+            return payload
+        script = minify_script(payload['script']) if self.minify else textwrap.dedent(payload['script'])
+        title = payload.get('title', '')
+        self.scripts.append((title, len(payload['script'].encode('utf-8')), len(script.encode('utf-8'))))
+        for helper in top_level_helpers(script).items():
+            self.helpers[helper].append(title)
+        return dict(payload, script=script)
+
+    def report(self):
+        """
+        Script size of the template.
+
+        Returns:
+            dict: scripts, raw_bytes, script_bytes, budget, over_budget and
+                duplicated_helpers ({helper name: script titles})
+        """
+        script_bytes = sum(sent for _, _, sent in self.scripts)
+        return {'scripts': len(self.scripts),
+                'raw_bytes': sum(raw for _, raw, _ in self.scripts),
+                'script_bytes': script_bytes,
+                'budget': self.budget,
+                'over_budget': bool(self.budget) and script_bytes > self.budget,
+                'duplicated_helpers': {name: titles for (name, _), titles in self.helpers.items() if len(titles) > 1}}
+
+
+def format_script_report(report):
+    """Render XLRScriptStage.report() as printable lines."""
+    lines = [f"SCRIPTS : {report['scripts']} script(s), {report['script_bytes']} bytes "
+             f"({report['raw_bytes']} before the script stage), budget {report['budget'] or 'none'}"
+             + (" : OVER BUDGET" if report['over_budget'] else "")]
+    lines += [f"  HELPER {name} DEFINED IN {len(titles)} SCRIPTS : {', '.join(titles)}"
+              for name, titles in sorted(report['duplicated_helpers'].items())]
+    return lines
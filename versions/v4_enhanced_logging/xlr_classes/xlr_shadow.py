@@ -0,0 +1,117 @@
+"""
+XLRTemplateShadow - Local model of the template being generated
+
+XLRClient feeds every successful create and delete response of the template
+endpoints into a shadow of the template's server-side state: its phases,
+tasks and variables. Existence checks, such as "is the default 'New Phase'
+still there", are then answered locally; XLR is only searched for what the
+shadow has never seen.
+"""
+
+from urllib.parse import urlsplit, parse_qs
+
+# Endpoints (see xlr_client.endpoint_of) whose responses update the shadow
+OBSERVED_ENDPOINTS = ('POST templates', 'POST phases', 'POST tasks', 'POST variables',
+                      'DELETE templates', 'DELETE phases', 'DELETE tasks', 'GET phases/search')
+
+
+def object_path(object_id):
+    """Return the phase-relative part of an XLR id ('Phase3/Task7')."""
+    segments = (object_id or '').split('/')
+    for index, segment in enumerate(segments):
+        if segment.startswith('Phase'):
+            return '/'.join(segments[index:])
+    return object_id
+
+
+def _api_path(url):
+    path = urlsplit(url).path
+    return path.split('api/v1/', 1)[1] if 'api/v1/' in path else path.lstrip('/')
+
+
+class XLRTemplateShadow:
+    """
+    Phases, tasks and variables of the template, as known from XLR responses.
+
+    Attributes:
+        template_id (str): XLR id of the template, None before its creation
+        phases (dict): Phase path -> title
+        tasks (dict): Task path -> (parent path, title)
+        variables (dict): Variable key -> XLR id
+        existing_variables (set): Keys of the variables the template had before this run
+        complete (bool): True when the phase list came with the template creation
+            response, so a phase absent from the shadow does not exist
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self, template_id=None, phases=None, variables=None):
+        """
+        Start the shadow of a template.
+
+        Args:
+            template_id (str): XLR id of the template
+            phases (list): Phases of the creation response or of GET templates/<id>, if known
+            variables (list): Variables already on the server (existing template)
+        """
+        self.template_id = template_id
+        self.phases = {}
+        self.tasks = {}
+        self.variables = {variable['key']: variable.get('id') for variable in variables or []}
+        self.existing_variables = set(self.variables)
+        self.complete = phases is not None
+        self.known_phase_titles = set()
+        for phase in phases or []:
+            self.phases[object_path(phase['id'])] = phase.get('title')
+
+    def observe(self, method, url, endpoint, payload, data):
+        """
+        Update the shadow with a successful XLR response.
+
+        Args:
+            method (str): HTTP method
+            url (str): Full XLR API URL
+            endpoint (str): endpoint_of(method, url)
+            payload (dict): JSON body sent
+            data: JSON body received
+        """
+        segments = _api_path(url).split('/')
+        if endpoint == 'POST templates':
+            # Creation, copy or import: the response is the new template
+            if isinstance(data, dict) and 'id' in data:
+                self.reset(data['id'], data.get('phases'))
+        elif endpoint == 'POST phases' and isinstance(data, dict) and 'id' in data:
+            self.phases[object_path(data['id'])] = data.get('title', (payload or {}).get('title'))
+        elif endpoint == 'POST tasks' and isinstance(data, dict) and 'id' in data:
+            parent = '/'.join(segments[1:-1])
+            self.tasks[object_path(data['id'])] = (object_path(parent), data.get('title', (payload or {}).get('title')))
+        elif endpoint == 'POST variables' and isinstance(data, dict):
+            key = data.get('key', (payload or {}).get('key'))
+            if key is not None:
+                self.variables[key] = data.get('id')
+        elif endpoint == 'DELETE templates':
+            if '/'.join(segments[1:]) == self.template_id:
+                self.reset()
+        elif endpoint in ('DELETE phases', 'DELETE tasks'):
+            removed = object_path('/'.join(segments[1:]))
+            self.phases.pop(removed, None)
+            for path in [path for path in self.tasks if path == removed or path.startswith(removed + '/')]:
+                del self.tasks[path]
+        elif endpoint == 'GET phases/search' and isinstance(data, list):
+            query = parse_qs(urlsplit(url).query)
+            for phase in data:
+                self.phases[object_path(phase['id'])] = phase.get('title', query.get('phaseTitle', [None])[0])
+            if 'phaseTitle' in query:
+                self.known_phase_titles.add(query['phaseTitle'][0])
+
+    def phase_ids(self, title):
+        """
+        Phases of the template with a title.
+
+        Returns:
+            list: Phase paths, or None when the shadow cannot tell (search XLR)
+        """
+        if not self.complete and title not in self.known_phase_titles:
+            return None
+        return [path for path, phase_title in self.phases.items() if phase_title == title]
@@ -6,6 +6,7 @@ for ServiceNow integration functionality.
 """
 
 from .xlr_base import XLRBase
+from .xlr_phase_items import PHASE_ITEM_REGISTRY, phase_packages
 
 class XLRSun(XLRBase):
     """
@@ -44,6 +45,8 @@ class XLRSun(XLRBase):
 
         Sets up the necessary variables and configuration for ServiceNow
         integration in production environments requiring approval workflows.
+        With option_latest, the versions deployed of the XLD packages of the
+        phase are read in CREATE_CHANGE_<phase> (XLRBase.add_xld_version_lookup).
 
         Uses inherited template_create_variable method from XLRBase.
         """
@@ -53,28 +56,12 @@ class XLRSun(XLRBase):
              self.parameters.get('general_info', {}).get('option_latest')) or
             (hasattr(self, 'parameters') and self.parameters.get('general_info', {}).get('option_latest'))):
 
-            id_task = self.dict_template['CREATE_CHANGE_' + phase]['xlr_id_phase']
-
-            # Check if username variable exists, if not add user input task
-            username_exists = False
-            if hasattr(self, 'dict_template') and 'CREATE_CHANGE_' + phase in self.dict_template:
-                username_exists = any(phase + '_username_xldeploy' in str(d) for d in self.dict_template['CREATE_CHANGE_' + phase])
-
-            if not username_exists:
-                self.add_task_user_input('CREATE_CHANGE_' + phase, 'xldeploy',
-                                       self.dict_template['template']['xlr_id'] + '/' +
-                                       self.dict_template['CREATE_CHANGE_' + phase]['xlr_id_phase'])
-
-            # Process XLD deploy tasks for this phase
+            # Versions currently deployed of the XLD packages of this phase, read in CREATE_CHANGE
             if hasattr(self, 'parameters') and 'Phases' in self.parameters and phase in self.parameters['Phases']:
-                for numtask, task in enumerate(self.parameters['Phases'][phase]):
-                    if isinstance(task, dict) and 'xldeploy' in list(task.keys())[0]:
-                        for demand_xld, xld_value in task[list(task.keys())[0]].items():
-                            if (hasattr(self, 'dict_value_for_template') and
-                                'package' in self.dict_value_for_template and
-                                xld_value[0] in self.dict_value_for_template['package']):
-                                if hasattr(self, 'add_task_xldeploy_get_last_version'):
-                                    self.add_task_xldeploy_get_last_version(demand_xld, xld_value, 'CREATE_CHANGE_' + phase, id_task)
+                packages = [package for package in dict.fromkeys(phase_packages(self, phase, 'xldeploy'))
+                            if package in self.parameters['template_liste_package']]
+                if packages:
+                    self.add_xld_version_lookup(phase, packages, 'CHANGE', 'CREATE_CHANGE_' + phase)
 
         # Create SUN-related variables using inherited methods
         self.template_create_variable('controlm_today', 'StringVariable', 'date controlm demand', '', '', False, False, False)
@@ -144,125 +131,9 @@ class XLRSun(XLRBase):
             if hasattr(self, 'add_task_sun_change'):
                 self.add_task_sun_change(phase, None)
 
-        # Process phase tasks for SUN integration
+        # Process phase tasks for SUN integration through the registered handlers
         if hasattr(self, 'parameters') and 'Phases' in self.parameters and phase in self.parameters['Phases']:
-            for numtask, task in enumerate(self.parameters['Phases'][phase]):
-                if isinstance(task, dict) and 'xldeploy' in list(task.keys())[0]:
-                    # Create technical tasks before deployment
-                    self.XLRSun_creation_technical_task(phase, 'before_deployment')
-                    self.XLRSun_creation_technical_task(phase, 'before_xldeploy')
-
-                    # Create XLD group if not already done
-                    if f'sunxld_XLR_grp_{phase}' not in getattr(self, 'list_xlr_group_task_done', []):
-                        if not hasattr(self, 'list_xlr_group_task_done'):
-                            self.list_xlr_group_task_done = []
-
-                        self.xld_ID_XLR_group_task_grp = self.XLR_group_task(
-                            ID_XLR_task=self.dict_template['CREATE_CHANGE_' + phase]['xlr_id_phase'],
-                            type_group='SequentialGroup',
-                            title_group='XLD DEPLOY',
-                            precondition=''
-                        )
-                        self.list_xlr_group_task_done.append(f'sunxld_XLR_grp_{phase}')
-
-                    # Process XLD deployment tasks
-                    for demand_xld, xld_value in task[list(task.keys())[0]].items():
-                        if hasattr(self, 'list_package') and xld_value[0] in self.list_package:
-                            precondition = ''
-                            if hasattr(self, 'add_task_sun_xldeploy'):
-                                self.add_task_sun_xldeploy(xld_value, phase, precondition, self.xld_ID_XLR_group_task_grp)
-
-                    # Check if this is the last xldeploy task
-                    list_remaining = []
-                    for num, dictionnaire in enumerate(self.parameters['Phases'][phase]):
-                        if num > numtask and isinstance(dictionnaire, dict) and 'xldeploy' in list(dictionnaire.keys())[0]:
-                            list_remaining.append(num)
-
-                    if len(list_remaining) == 0:
-                        self.XLRSun_creation_technical_task(phase, 'after_xldeploy')
-
-                # Handle other task types
-                elif isinstance(task, dict):
-                    task_key = list(task.keys())[0]
-
-                    if 'launch_script_windows' in task_key:
-                        for group_win_task in task:
-                            for index, script_windows_item in enumerate(group_win_task[list(group_win_task.keys())[0]]):
-                                if hasattr(self, 'add_task_sun_launch_script_windows'):
-                                    self.add_task_sun_launch_script_windows(script_windows_item, phase, index)
-
-                    elif 'launch_script_linux' in task_key:
-                        for group_linux_task in task.items():
-                            for index, script_linux_item in enumerate(group_linux_task[list(group_linux_task.keys())[0]]):
-                                if hasattr(self, 'add_task_sun_launch_script_linux'):
-                                    self.add_task_sun_launch_script_linux(script_linux_item, phase, index)
-
-                    elif 'controlm_resource' in task_key:
-                        if hasattr(self, 'add_task_sun_controlm_resource'):
-                            self.add_task_sun_controlm_resource(phase, task[task_key].items(), '')
-
-                    elif 'controlm' in task_key:
-                        self.XLRSun_creation_technical_task(phase, 'before_deployment')
-
-                        for grtp_controlm, grtp_controlm_value in task[task_key].items():
-                            if isinstance(grtp_controlm_value, str):
-                                controlm_value_tempo = {grtp_controlm_value: None}
-                                grtp_controlm_value = controlm_value_tempo
-
-                            grtp_controlm_value_notype_group = grtp_controlm_value.copy()
-                            grtp_controlm_value_notype_group.pop('type_group', None)
-                            ctrl_group = False
-
-                            # Handle STOP/START/CLEAN operations
-                            if any(op in grtp_controlm for op in ['STOP', 'START', 'CLEAN']):
-                                if 'STOP' in grtp_controlm:
-                                    title_grp = 'STOP'
-                                elif 'START' in grtp_controlm:
-                                    title_grp = 'START'
-                                elif 'CLEAN' in grtp_controlm:
-                                    title_grp = 'CLEAN'
-
-                                group_key = f'SUN_XLR_grp_{title_grp}_{phase}'
-                                if group_key not in getattr(self, 'list_xlr_group_task_done', []):
-                                    if not hasattr(self, 'list_xlr_group_task_done'):
-                                        self.list_xlr_group_task_done = []
-
-                                    self.SUN_ID_XLR_group_task_grp = self.XLR_group_task(
-                                        ID_XLR_task=self.dict_template['CREATE_CHANGE_' + phase]['xlr_id_phase'],
-                                        type_group='SequentialGroup',
-                                        title_group=f'CONTROLM : {title_grp}',
-                                        precondition=''
-                                    )
-                                    self.list_xlr_group_task_done.append(group_key)
-                                ctrl_group = True
-
-                            for sub_item_name, sub_item_value in grtp_controlm_value_notype_group.items():
-                                if isinstance(sub_item_value, dict) and 'folder' in sub_item_value:
-                                    sub_item_value = sub_item_value['folder']
-
-                                if isinstance(sub_item_value, list):
-                                    for folder in sub_item_value:
-                                        if isinstance(folder, str):
-                                            folder_name = folder
-                                            cases = ''
-                                        elif isinstance(folder, dict):
-                                            folder_name = list(folder.keys())[0]
-                                            cases = folder[folder_name].get('case', '')
-
-                                        if hasattr(self, 'add_task_sun_controlm'):
-                                            self.add_task_sun_controlm(phase, task_key, folder_name, cases,
-                                                                     getattr(self, 'SUN_ID_XLR_group_task_grp', None))
-
-                    elif 'controlmspec' in task_key:
-                        self.XLRSun_creation_technical_task(phase, 'before_deployment')
-
-                        if task[task_key].get('mode') is not None:
-                            if task[task_key]['mode'] == 'profil':
-                                if hasattr(self, 'add_task_sun_controlm_spec_profil'):
-                                    self.add_task_sun_controlm_spec_profil(phase, task[task_key])
-                            elif task[task_key]['mode'] == 'free':
-                                self.template_create_variable('CONTROLM_DEMAND', 'StringVariable', 'CONTROLM DEMAND', '',
-                                                            task[task_key].get('render', ''), False, True, True)
+            PHASE_ITEM_REGISTRY.dispatch(self, phase, self.parameters['Phases'][phase], 'sun')
 
         self.logger_cr.info("SUN parameters configured for phase: " + phase)
 
@@ -279,8 +150,10 @@ class XLRSun(XLRBase):
         import requests
 
         url = self.url_api_xlr + 'phases/' + self.dict_template['template']['xlr_id'] + '/phase'
+        if 'CREATE_CHANGE_' + phase in self.phase_positions:
+            url += '?position=' + str(self.phase_positions['CREATE_CHANGE_' + phase])
         try:
-            response = requests.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": None,
                 "type": "xlrelease.Phase",
                 "flagStatus": "OK",
@@ -348,7 +221,7 @@ class XLRSun(XLRBase):
         url = self.url_api_xlr + 'tasks/' + self.dict_template['CREATE_CHANGE_' + phase]['xlr_id_phase'] + '/tasks'
         try:
             variables_date_sun.sort(key=lambda x: x != phase + '_sun_start_date')
-            response = requests.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": "null",
                 "type": "xlrelease.UserInputTask",
                 "title": "Please enter dates for ServiceNow change - " + phase,
@@ -390,7 +263,7 @@ class XLRSun(XLRBase):
             url = self.url_api_xlr + 'tasks/' + self.dict_template['CREATE_CHANGE_' + phase]['xlr_id_phase'] + '/tasks'
 
         try:
-            response = requests.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+            response = self.xlr_client.post(url, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
                 "id": None,
                 "type": "xlrelease.CustomScriptTask",
                 "title": f"wait state SUN {phase} APPROVAL CHG: ${{{phase}.sun.id}}",
@@ -545,8 +418,20 @@ class XLRSun(XLRBase):
         Creates technical tasks that are integrated with ServiceNow
         change management for tracking and approval purposes.
 
-        Uses inherited task creation methods from XLRBase.
+        Uses inherited task creation methods from XLRBase. Tasks are read from
+        the precomputed technical_task_index and each (phase, category) is
+        emitted once, tracked in the technical_sun_task_done set; a category
+        without task gets no group.
         """
+        done_key = cat_technicaltask + '_done_' + phase
+        if done_key in self.technical_sun_task_done:
+            return
+        self.technical_sun_task_done.add(done_key)
+
+        technical_tasks = self.technical_task_index.get((phase, cat_technicaltask), ())
+        if not technical_tasks:
+            return
+
         tech_task_group = self.XLR_group_task(
             self.dict_template['CREATE_CHANGE_' + phase]['xlr_id_phase'],
             'SequentialGroup',
@@ -555,6 +440,9 @@ class XLRSun(XLRBase):
         )
 
         self.logger_cr.info("Creating SUN technical tasks for phase: " + phase + ", category: " + cat_technicaltask)
+        for technical_task in technical_tasks:
+            self.logger_cr.info("SUN technical task: " + technical_task['sun_title'] +
+                                " - variable : " + technical_task['xlr_sun_task_variable_name'])
 
     # Additional SUN methods would be implemented here
     # Each using inherited functionality from XLRBase instead of composition
\ No newline at end of file
@@ -5,6 +5,7 @@ This module contains the enhanced XLRTaskScript class that inherits from XLRBase
 for custom script generation functionality.
 """
 
+import sys
 from .xlr_base import XLRBase
 
 class XLRTaskScript(XLRBase):
@@ -79,7 +80,7 @@ class XLRTaskScript(XLRBase):
         """
 
         try:
-            response = requests.post(url_user_script, headers=self.header,
+            response = self.xlr_client.post(url_user_script, headers=self.header,
                                    auth=(self.ops_username_api, self.ops_password_api),
                                    json={
                                        "id": "null",
@@ -142,7 +143,7 @@ class XLRTaskScript(XLRBase):
 
         url_script = self.url_api_xlr + 'tasks/' + version_group + '/tasks'
         try:
-            response = requests.post(url_script, headers=self.header,
+            response = self.xlr_client.post(url_script, headers=self.header,
                                    auth=(self.ops_username_api, self.ops_password_api),
                                    json={
                                        "id": "null",
@@ -200,7 +201,7 @@ class XLRTaskScript(XLRBase):
 
         url_script = self.url_api_xlr + 'tasks/' + variable_group + '/tasks'
         try:
-            response = requests.post(url_script, headers=self.header,
+            response = self.xlr_client.post(url_script, headers=self.header,
                                    auth=(self.ops_username_api, self.ops_password_api),
                                    json={
                                        "id": "null",
@@ -263,7 +264,7 @@ class XLRTaskScript(XLRBase):
 
         url_script = self.url_api_xlr + 'tasks/' + jenkins_group + '/tasks'
         try:
-            response = requests.post(url_script, headers=self.header,
+            response = self.xlr_client.post(url_script, headers=self.header,
                                    auth=(self.ops_username_api, self.ops_password_api),
                                    json={
                                        "id": "null",
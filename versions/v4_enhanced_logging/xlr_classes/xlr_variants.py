@@ -0,0 +1,201 @@
+"""
+XLRVariants - Template variants cloned from a canonical template
+
+Templates of a family (YAML files that only differ by values: name_release,
+iua, XLD_ENV_* lists, package paths...) compile to the same structure of
+phases, tasks and variables. The first template of a family is built as
+usual; every other one is copied server-side from it and only the variables
+and tasks whose content differs are patched.
+
+The structure and the differences are computed from the compiled models of
+the templates, i.e. the calls recorded by XLRPlanClient (see --plan).
+"""
+
+import os, sys, requests, inspect
+from urllib.parse import urlsplit
+from .xlr_base import XLRBase
+from .xlr_lookup_cache import TEMPLATE_TTL
+from .xlr_shadow import object_path
+
+
+def compiled_objects(calls):
+    """
+    List the objects created by a compiled template.
+
+    Args:
+        calls (list): XLRPlanClient.calls of one template generation
+
+    Returns:
+        list: (kind, position, payload) in creation order. kind is 'template',
+            'phase', 'task', 'variable' or the endpoint of any other creation call;
+            position is the index path in the template tree ((phase,), (phase, task, ...))
+            for phases and tasks, the key for variables.
+    """
+    positions = {}
+    children = {}
+    objects = []
+    for call in calls:
+        if call['method'] != 'POST':
+            continue
+        endpoint = call['endpoint']
+        payload = call['payload'] or {}
+        if endpoint == 'POST templates':
+            objects.append(('template', (), payload))
+        elif endpoint == 'POST phases':
+            position = (children.get((), 0),)
+            children[()] = position[0] + 1
+            positions[object_path(call['response_id'])] = position
+            objects.append(('phase', position, payload))
+        elif endpoint == 'POST tasks':
+            parent = urlsplit(call['url']).path.split('tasks/', 1)[1].rsplit('/tasks', 1)[0]
+            parent_position = positions.get(object_path(parent))
+            if parent_position is None:
+                objects.append((endpoint, call['url'], payload))
+                continue
+            position = parent_position + (children.get(parent_position, 0),)
+            children[parent_position] = position[-1] + 1
+            positions[object_path(call['response_id'])] = position
+            objects.append(('task', position, payload))
+        elif endpoint == 'POST variables':
+            objects.append(('variable', payload.get('key'), payload))
+        else:
+            objects.append((endpoint, call['url'], payload))
+    return objects
+
+
+def template_signature(objects):
+    """
+    Structure of a compiled template, without the values.
+
+    Two templates with the same signature can be cloned from one another.
+    """
+    signature = []
+    for kind, position, payload in objects:
+        if kind == 'phase':
+            signature.append((kind, position, payload.get('type'), payload.get('title')))
+        elif kind in ('template', 'task', 'variable'):
+            signature.append((kind, position, payload.get('type')))
+        else:
+            # Creation calls that cannot be located in the tree must be identical
+            signature.append((kind, repr(sorted(payload.items()))))
+    return tuple(signature)
+
+
+def variant_patches(canonical_objects, variant_objects):
+    """
+    Differences between a canonical template and a variant.
+
+    Args:
+        canonical_objects (list): compiled_objects() of the canonical template
+        variant_objects (list): compiled_objects() of the variant
+
+    Returns:
+        list: (kind, position, variant payload) of the phases, tasks and variables
+            to patch after the copy, or None when the structures differ
+    """
+    if template_signature(canonical_objects) != template_signature(variant_objects):
+        return None
+    return [(kind, position, variant_payload)
+            for (kind, position, canonical_payload), (_, _, variant_payload) in zip(canonical_objects, variant_objects)
+            if kind in ('phase', 'task', 'variable') and canonical_payload != variant_payload]
+
+
+class XLRVariants(XLRBase):
+    """
+    Create a template as a server-side copy of a canonical template.
+
+    Attributes:
+        parameters (dict): YAML configuration of the variant
+        dict_template (dict): Template metadata and IDs of the variant
+    """
+
+    def __init__(self, parameters, configuration, xlr_client=None, log_directory=None, use_lookup_cache=True):
+        """
+        Args:
+            parameters (dict): YAML configuration of the variant
+            configuration (dict): XLR API configuration (url_api_xlr, credentials)
+            xlr_client (XLRClient): Client for XLR API calls
+            log_directory (str): Custom log directory (defaults to log/<release_name>)
+            use_lookup_cache (bool): Use the persistent folder/template lookup cache
+        """
+        super().__init__()
+        self.parameters = parameters
+        self.setup_enhanced_logging(parameters['general_info']['name_release'], log_directory)
+        for key, value in configuration.items():
+            setattr(self, key, value)
+        self.header = {'content-type': 'application/json', 'Accept': 'application/json'}
+        self.setup_xlr_client(xlr_client, use_lookup_cache)
+        self.dict_template = {}
+
+    def _tree_ids(self, template):
+        """Map tree positions of a template (GET templates/<id>) to phase and task ids."""
+        ids = {}
+
+        def walk(tasks, parent_position):
+            for index, task in enumerate(tasks or []):
+                position = parent_position + (index,)
+                ids[position] = task['id']
+                walk(task.get('tasks'), position)
+
+        for index, phase in enumerate(template.get('phases', [])):
+            ids[(index,)] = phase['id']
+            walk(phase.get('tasks'), (index,))
+        return ids
+
+    def clone_template(self, canonical_template_id, patches):
+        """
+        Copy the canonical template under name_release and patch the differences.
+
+        Args:
+            canonical_template_id (str): XLR id of the canonical template
+            patches (list): variant_patches() of this variant
+
+        Returns:
+            str: XLR id of the variant template
+
+        Any existing template named name_release is deleted first, as for a full build.
+        """
+        template_name = self.parameters['general_info']['name_release']
+        self.enhanced_logger.start_timer('clone_template')
+        # Variants live in the folder of their canonical template
+        self.find_xlr_folder()
+        self.delete_template()
+
+        url_copy_template = self.url_api_xlr + "templates/" + canonical_template_id + "/copy"
+        try:
+            response = self.xlr_client.post(url_copy_template, headers=self.header, auth=(self.ops_username_api, self.ops_password_api), json={
+                "title": template_name,
+                "description": ""
+            }, verify=False)
+            response.raise_for_status()
+            self.XLR_template_id = response.json()['id']
+            self.dict_template = {'template': {'xlr_id': self.XLR_template_id}}
+            self.lookup_store_set('template', template_name, [self.XLR_template_id], TEMPLATE_TTL)
+            base_url = self.url_api_xlr.replace('/api/v1/', '')
+            self.template_url = base_url + '/#/templates/' + self.XLR_template_id.replace("Applications/", "").replace('/', '-')
+            self.logger_cr.info("COPY TEMPLATE : " + canonical_template_id + " --> " + template_name)
+
+            template = self.get_template(self.XLR_template_id)
+            tree_ids = self._tree_ids(template)
+            variable_ids = {variable['key']: variable['id'] for variable in template.get('variables', [])}
+
+            for kind, position, payload in patches:
+                if kind == 'variable':
+                    object_id = variable_ids[position]
+                    url_patch = self.url_api_xlr + "templates/" + self.XLR_template_id + "/variables/" + object_id
+                    self.logger_cr.info("PATCH VARIABLE : " + position)
+                else:
+                    object_id = tree_ids[position]
+                    url_patch = self.url_api_xlr + ("phases/" if kind == 'phase' else "tasks/") + object_id
+                    self.logger_cr.info("PATCH " + kind.upper() + " : " + str(payload.get('title', object_id)))
+                response = self.xlr_client.put(url_patch, headers=self.header, auth=(self.ops_username_api, self.ops_password_api),
+                                               json=dict(payload, id=object_id), verify=False)
+                response.raise_for_status()
+        except (requests.exceptions.RequestException, KeyError) as e:
+            self.logger_error.error("File: " + os.path.basename(inspect.currentframe().f_code.co_filename) + " --Class: " + self.__class__.__name__ + " --Function : " + inspect.currentframe().f_code.co_name + " --Line : " + str(inspect.currentframe().f_lineno))
+            self.logger_error.error("Error clone template : " + template_name + " from " + canonical_template_id)
+            self.logger_error.error(str(e))
+            sys.exit(0)
+
+        self.enhanced_logger.end_timer('clone_template', f"Template {template_name} cloned with {len(patches)} patch(es)")
+        return self.XLR_template_id
@@ -0,0 +1,104 @@
+"""
+XLRVerify - Post-build check of a template against its compiled model (--verify)
+
+After a generation, the finished template is fetched with one GET
+templates/<id> and compared with the template JSON compiled without calling
+XLR (see xlr_export.build_template_export):
+
+- phase order
+- number of tasks of each phase and group
+- variable keys and types
+- sha256 of the Jython script of each ScriptTask
+
+Every difference is reported as one drift record, so silent server-side
+rewrites are caught once at the end of the run.
+"""
+
+import hashlib
+
+
+def _task_paths(tasks, parent_path):
+    """Yield (path, task) for a task tree; same-title siblings are numbered."""
+    seen = {}
+    for task in tasks or []:
+        title = task.get('title', '')
+        seen[title] = seen.get(title, 0) + 1
+        path = parent_path + ' > ' + title + (' [' + str(seen[title]) + ']' if seen[title] > 1 else '')
+        yield path, task
+        yield from _task_paths(task.get('tasks'), path)
+
+
+def template_outline(release):
+    """
+    Reduce a template JSON to the facts checked by --verify.
+
+    Args:
+        release (dict): Template JSON (GET templates/<id> or build_template_export())
+
+    Returns:
+        dict: phases (titles in order), groups ({path: number of tasks}),
+            variables ({key: type}), scripts ({path: sha256 of the script})
+    """
+    outline = {'phases': [], 'groups': {}, 'variables': {}, 'scripts': {}}
+    for phase in release.get('phases', []):
+        outline['phases'].append(phase.get('title'))
+        outline['groups'][phase.get('title')] = len(phase.get('tasks') or [])
+        for path, task in _task_paths(phase.get('tasks'), phase.get('title')):
+            if 'tasks' in task:
+                outline['groups'][path] = len(task.get('tasks') or [])
+            if task.get('script') is not None:
+                outline['scripts'][path] = hashlib.sha256(task['script'].encode('utf-8')).hexdigest()
+    for variable in release.get('variables', []):
+        outline['variables'][variable.get('key')] = variable.get('type')
+    return outline
+
+
+def _diff_mapping(kind, expected, actual):
+    drift = []
+    for key in expected:
+        if key not in actual:
+            drift.append({'kind': kind, 'path': key, 'expected': expected[key], 'actual': None})
+        elif expected[key] != actual[key]:
+            drift.append({'kind': kind, 'path': key, 'expected': expected[key], 'actual': actual[key]})
+    for key in actual:
+        if key not in expected:
+            drift.append({'kind': kind, 'path': key, 'expected': None, 'actual': actual[key]})
+    return drift
+
+
+def template_drift(expected_release, actual_release):
+    """
+    Compare a template fetched from XLR with its compiled model.
+
+    Args:
+        expected_release (dict): Compiled template JSON
+        actual_release (dict): Template JSON returned by XLR
+
+    Returns:
+        list: Drift records {'kind', 'path', 'expected', 'actual'}; kind is
+            'phases', 'groups', 'variables' or 'scripts'. Empty when the template matches.
+    """
+    expected = template_outline(expected_release)
+    actual = template_outline(actual_release)
+    drift = []
+    if expected['phases'] != actual['phases']:
+        drift.append({'kind': 'phases', 'path': '', 'expected': expected['phases'], 'actual': actual['phases']})
+    for kind in ('groups', 'variables', 'scripts'):
+        drift.extend(_diff_mapping(kind, expected[kind], actual[kind]))
+    return drift
+
+
+def format_drift(drift, release_name):
+    """Render drift records as printable lines."""
+    if not drift:
+        return [f"VERIFY TEMPLATE : {release_name} OK"]
+    lines = [f"VERIFY TEMPLATE : {release_name} {len(drift)} difference(s) with the compiled model"]
+    for record in drift:
+        if record['expected'] is None:
+            change = f"unexpected ({record['actual']})"
+        elif record['actual'] is None:
+            change = f"missing ({record['expected']})"
+        else:
+            change = f"expected {record['expected']}, got {record['actual']}"
+        lines.append(f"  DRIFT {record['kind']:<9} {record['path'] or '-'} : {change}")
+    return lines